@@ -0,0 +1,8 @@
+"""
+Bilibili APP 自动化测试检验脚本
+
+eval_N.py 对应 检验逻辑.md 中的指令N, 共享 runtime 模块提供的adb访问能力
+批量执行: python -m AutoTest run --tasks 1-30 --devices ... (见cli.py)
+"""
+from .adb import AdbError, AdbTimeout, find_adb
+from .runtime import Device, Runtime, connect_device, get_runtime
@@ -0,0 +1,402 @@
+"""
+adb访问层
+
+提供两种与adb交互的方式:
+1. AdbWireClient: 直接通过TCP与adb server通信(host协议), 使用预热连接池, 避免每次调用都fork/exec一个adb进程
+2. AdbSubprocessClient: 原有的subprocess方式, 作为找不到adb server时的回退方案
+
+两者对外接口一致: version() / devices() / run(serial, command) / open_stream(serial, command)
+"""
+import collections
+import os
+import shutil
+import socket
+import subprocess
+import threading
+
+from .spans import span
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5037
+DEFAULT_TIMEOUT = 10
+
+
+class AdbError(Exception):
+    """adb调用失败"""
+
+
+class AdbTimeout(AdbError, TimeoutError):
+    """adb调用超时"""
+
+
+def find_adb():
+    """查找adb命令路径"""
+    with span('find_adb'):
+        return _find_adb()
+
+
+def _find_adb():
+    # 首先检查adb是否在PATH中
+    adb_path = shutil.which('adb')
+    if adb_path:
+        return adb_path
+
+    # 如果不在PATH中，尝试常见的Android SDK路径
+    possible_paths = [
+        r'C:\Users\%USERNAME%\AppData\Local\Android\Sdk\platform-tools\adb.exe',
+        r'C:\Android\sdk\platform-tools\adb.exe',
+        r'D:\Android\sdk\platform-tools\adb.exe',
+        r'%LOCALAPPDATA%\Android\Sdk\platform-tools\adb.exe',
+    ]
+
+    for path in possible_paths:
+        expanded_path = os.path.expandvars(path)
+        if os.path.exists(expanded_path):
+            return expanded_path
+
+    return None
+
+
+def server_address():
+    """
+    解析adb server地址
+    与adb客户端保持一致: 优先ADB_SERVER_SOCKET(tcp:host:port), 其次ANDROID_ADB_SERVER_PORT
+    """
+    server_socket = os.environ.get('ADB_SERVER_SOCKET', '')
+    if server_socket.startswith('tcp:'):
+        host, _, port = server_socket[4:].rpartition(':')
+        return host or DEFAULT_HOST, int(port)
+
+    port = os.environ.get('ANDROID_ADB_SERVER_PORT')
+    return DEFAULT_HOST, int(port) if port else DEFAULT_PORT
+
+
+def _encode_request(request):
+    payload = request.encode('utf-8')
+    return b'%04x' % len(payload) + payload
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise AdbError("adb server提前关闭了连接")
+        data += chunk
+    return bytes(data)
+
+
+def _recv_all(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+
+
+def _read_status(sock):
+    """读取OKAY/FAIL状态, FAIL时抛出AdbError"""
+    status = _recv_exact(sock, 4)
+    if status == b'OKAY':
+        return
+    if status == b'FAIL':
+        length = int(_recv_exact(sock, 4), 16)
+        raise AdbError(_recv_exact(sock, length).decode('utf-8', 'replace'))
+    raise AdbError(f"无法识别的adb响应: {status!r}")
+
+
+def _read_length_prefixed(sock):
+    length = int(_recv_exact(sock, 4), 16)
+    return _recv_exact(sock, length)
+
+
+class AdbStream:
+    """一个正在进行中的adb服务输出流(如logcat跟随), 逐块读取原始字节"""
+
+    def __init__(self, sock=None, process=None, crlf=False):
+        self._sock = sock
+        self._process = process
+        self._crlf = crlf
+
+    def read(self, size=65536):
+        """读取一块数据, 返回b''表示流已结束"""
+        if self._sock is not None:
+            try:
+                data = self._sock.recv(size)
+            except socket.timeout:
+                raise AdbTimeout("读取adb输出超时")
+        else:
+            data = self._process.stdout.read1(size)
+        if self._crlf:
+            data = data.replace(b'\r\n', b'\n')
+        return data
+
+    def settimeout(self, timeout):
+        if self._sock is not None:
+            self._sock.settimeout(timeout)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                # shutdown会唤醒其他线程中阻塞的recv, 仅close不会
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AdbConnectionPool:
+    """
+    adb server连接池
+
+    adb server的transport服务(shell:/exec:)每个连接只能使用一次, 因此这里池化的是
+    "已建立TCP连接并完成host:transport切换"的预热连接。取走一个后由后台线程补充,
+    使TCP握手和transport切换不落在检验的关键路径上。
+    """
+
+    def __init__(self, host, port, size=2, timeout=DEFAULT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self._idle = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+        self._wanted = set()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._filler = None
+
+    def connect(self):
+        """建立一个新的到adb server的连接"""
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except socket.timeout:
+            raise AdbTimeout("连接adb server超时")
+        except OSError as e:
+            raise AdbError(f"无法连接adb server {self.host}:{self.port}: {e}")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _open_transport(self, serial):
+        sock = self.connect()
+        try:
+            request = f'host:transport:{serial}' if serial else 'host:transport-any'
+            sock.sendall(_encode_request(request))
+            _read_status(sock)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def _alive(sock):
+        """空闲连接是否仍然有效(对端未关闭)"""
+        try:
+            sock.setblocking(False)
+            try:
+                return sock.recv(1, socket.MSG_PEEK) != b''
+            except (BlockingIOError, InterruptedError):
+                return True
+            finally:
+                sock.setblocking(True)
+        except OSError:
+            return False
+
+    def acquire(self, serial):
+        """取出一个已切换到指定设备的连接(调用方负责关闭)"""
+        sock = None
+        with self._lock:
+            idle = self._idle[serial]
+            while idle:
+                candidate = idle.popleft()
+                if self._alive(candidate):
+                    sock = candidate
+                    break
+                candidate.close()
+            self._wanted.add(serial)
+            self._schedule_refill()
+        if sock is None:
+            sock = self._open_transport(serial)
+        sock.settimeout(self.timeout)
+        return sock
+
+    def _schedule_refill(self):
+        if self.size <= 0 or self._closed:
+            return
+        if self._filler is None or not self._filler.is_alive():
+            self._filler = threading.Thread(target=self._refill_loop, name='adb-pool-refill', daemon=True)
+            self._filler.start()
+        self._wakeup.set()
+
+    def _refill_loop(self):
+        while not self._closed:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                missing = [(serial, self.size - len(self._idle[serial])) for serial in self._wanted]
+            for serial, count in missing:
+                for _ in range(count):
+                    if self._closed:
+                        return
+                    try:
+                        sock = self._open_transport(serial)
+                    except AdbError:
+                        # 设备离线等情况下不补充, 下次acquire时同步建立连接并报告错误
+                        break
+                    with self._lock:
+                        if self._closed:
+                            sock.close()
+                            return
+                        self._idle[serial].append(sock)
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        with self._lock:
+            for idle in self._idle.values():
+                while idle:
+                    idle.popleft().close()
+
+
+class AdbWireClient:
+    """直接使用adb host协议与adb server通信的客户端"""
+
+    kind = 'wire'
+
+    def __init__(self, host=None, port=None, pool_size=2, timeout=DEFAULT_TIMEOUT):
+        default_host, default_port = server_address()
+        self.host = host or default_host
+        self.port = port or default_port
+        self.timeout = timeout
+        self.pool = AdbConnectionPool(self.host, self.port, size=pool_size, timeout=timeout)
+        # 设备不支持exec:服务时回退到shell:, 按设备记住结果
+        self._exec_unsupported = set()
+
+    def describe(self):
+        return f"adb server {self.host}:{self.port}"
+
+    def _host_query(self, request):
+        sock = self.pool.connect()
+        try:
+            sock.sendall(_encode_request(request))
+            _read_status(sock)
+            return _read_length_prefixed(sock)
+        except socket.timeout:
+            raise AdbTimeout(f"adb请求超时: {request}")
+        finally:
+            sock.close()
+
+    def version(self):
+        return int(self._host_query('host:version'), 16)
+
+    def devices(self):
+        """返回[(serial, state), ...]"""
+        output = self._host_query('host:devices').decode('utf-8', 'replace')
+        devices = []
+        for line in output.splitlines():
+            if '\t' in line:
+                serial, state = line.split('\t', 1)
+                devices.append((serial, state))
+        return devices
+
+    def _open_service(self, serial, command):
+        """
+        打开设备上的服务连接
+        优先使用exec:(不经过pty, 输出不会被转换为CRLF), 设备不支持时回退到shell:
+        """
+        services = ['shell'] if serial in self._exec_unsupported else ['exec', 'shell']
+        for service in services:
+            sock = self.pool.acquire(serial)
+            try:
+                sock.sendall(_encode_request(f'{service}:{command}'))
+                _read_status(sock)
+                return sock, service == 'shell'
+            except AdbError:
+                sock.close()
+                if service == 'shell':
+                    raise
+                self._exec_unsupported.add(serial)
+            except socket.timeout:
+                sock.close()
+                raise AdbTimeout(f"adb请求超时: {command}")
+        raise AdbError(f"无法打开adb服务: {command}")
+
+    def run(self, serial, command, timeout=DEFAULT_TIMEOUT):
+        """执行命令并返回完整输出(bytes)"""
+        sock, crlf = self._open_service(serial, command)
+        try:
+            sock.settimeout(timeout)
+            output = _recv_all(sock)
+        except socket.timeout:
+            raise AdbTimeout(f"adb命令超时: {command}")
+        finally:
+            sock.close()
+        return output.replace(b'\r\n', b'\n') if crlf else output
+
+    def open_stream(self, serial, command):
+        """打开长时间运行的命令输出流"""
+        sock, crlf = self._open_service(serial, command)
+        sock.settimeout(None)
+        return AdbStream(sock=sock, crlf=crlf)
+
+    def close(self):
+        self.pool.close()
+
+
+class AdbSubprocessClient:
+    """通过adb命令行(subprocess)调用adb, 作为回退方案"""
+
+    kind = 'subprocess'
+
+    def __init__(self, adb_cmd):
+        # adb_cmd既可以是路径, 也可以是命令前缀列表(如基准测试中的模拟adb客户端)
+        self.adb_cmd = [adb_cmd] if isinstance(adb_cmd, str) else list(adb_cmd)
+
+    def describe(self):
+        return f"adb路径: {' '.join(self.adb_cmd)}"
+
+    def _args(self, serial, args):
+        prefix = self.adb_cmd + (['-s', serial] if serial else [])
+        return prefix + list(args)
+
+    def version(self):
+        result = subprocess.run(self.adb_cmd + ['version'], capture_output=True, timeout=DEFAULT_TIMEOUT)
+        return result.stdout.decode('utf-8', 'replace')
+
+    def devices(self):
+        result = subprocess.run(self.adb_cmd + ['devices'], capture_output=True, timeout=DEFAULT_TIMEOUT)
+        devices = []
+        for line in result.stdout.decode('utf-8', 'replace').splitlines():
+            if '\t' in line:
+                serial, state = line.split('\t', 1)
+                devices.append((serial, state.strip()))
+        return devices
+
+    def run(self, serial, command, timeout=DEFAULT_TIMEOUT):
+        try:
+            result = subprocess.run(self._args(serial, ['exec-out', command]),
+                                    capture_output=True,
+                                    timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise AdbTimeout(f"adb命令超时: {command}")
+        return result.stdout
+
+    def open_stream(self, serial, command):
+        process = subprocess.Popen(self._args(serial, ['exec-out', command]),
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL)
+        return AdbStream(process=process)
+
+    def close(self):
+        pass
+
@@ -0,0 +1,486 @@
+"""
+asyncio检验核心
+
+一个事件循环同时驱动数十台设备的检验, 不再为每台设备占用一个线程:
+    check = get_check(5)
+    verdict = await check.evaluate(device)
+
+- AsyncAdbClient 直接以asyncio流与adb server通信(host协议, exec:不支持时回退到shell:)
+- AsyncSubprocessClient 以asyncio子进程调用adb命令行(adb exec-out), 作为找不到adb server时的回退方案
+- AsyncThreadClient 在线程中调用同步客户端(如回放录制日志的ReplayClient)
+- AsyncDevice 与runtime.Device对应: 记录检验起点(sentinel / time / clear), 读取或跟随BilibiliAutoTest日志
+- AsyncCheck.evaluate() 按检验规格给出Verdict: follow模式下日志流按块交给CheckEngine, 所需标记全部出现即返回;
+  只保留当前块和未完成的一行, 每台设备占用的内存与日志总量无关
+- evaluate_all() 以信号量限制同时进行的检验数, 各阶段耗时按任务记录(spans在asyncio任务中同样有效)
+
+同步包装 AsyncCheck.run(serial) 在新的事件循环中执行一次检验, 返回是否通过并按原格式输出结论,
+与原有的 CheckXxx(serial) 调用方式相同。
+
+用法:
+    python -m AutoTest run --async --tasks 1-30 --devices emulator-5554,...
+"""
+import asyncio
+import collections
+import os
+import time
+import uuid
+
+from .adb import DEFAULT_TIMEOUT, AdbError, AdbTimeout, _encode_request, find_adb, server_address
+from .checkspec import CheckEngine, load_spec, print_verdict, step_hits
+from .logcat import after_line
+from .markers import LOG_TAG, SESSION_MARKER
+from .runtime import (
+    BUILD_COMMAND,
+    CLEAR_COMMAND,
+    CLOCK_COMMAND,
+    DEFAULT_FOLLOW_TIMEOUT,
+    DUMP_COMMAND,
+    FOLLOW_COMMAND,
+    PROMPT,
+    WATERMARKS,
+    parse_apk_build,
+)
+from .scheduler import EvalResult
+from .spans import note, recording, span
+
+CHUNK_SIZE = 65536
+ASYNC_MODES = ('follow', 'batch', 'interactive')
+
+
+class AsyncStream:
+    """asyncio版的AdbStream, 逐块读取原始字节"""
+
+    def __init__(self, reader, writer=None, process=None, crlf=False):
+        self._reader = reader
+        self._writer = writer
+        self._process = process
+        self._crlf = crlf
+
+    async def read(self, size=CHUNK_SIZE):
+        """读取一块数据, 返回b''表示流已结束"""
+        data = await self._reader.read(size)
+        if self._crlf:
+            data = data.replace(b'\r\n', b'\n')
+        return data
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+
+
+async def _read_status(reader):
+    status = await reader.readexactly(4)
+    if status == b'OKAY':
+        return
+    if status == b'FAIL':
+        length = int(await reader.readexactly(4), 16)
+        raise AdbError((await reader.readexactly(length)).decode('utf-8', 'replace'))
+    raise AdbError(f"无法识别的adb响应: {status!r}")
+
+
+class AsyncAdbClient:
+    """以asyncio流直接使用adb host协议的客户端"""
+
+    kind = 'wire'
+
+    def __init__(self, host=None, port=None, timeout=DEFAULT_TIMEOUT):
+        default_host, default_port = server_address()
+        self.host = host or default_host
+        self.port = port or default_port
+        self.timeout = timeout
+        self._exec_unsupported = set()
+
+    def describe(self):
+        return f"adb server {self.host}:{self.port} (asyncio)"
+
+    async def _connect(self):
+        try:
+            return await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        except asyncio.TimeoutError:
+            raise AdbTimeout("连接adb server超时")
+        except OSError as e:
+            raise AdbError(f"无法连接adb server {self.host}:{self.port}: {e}")
+
+    async def _host_query(self, request):
+        reader, writer = await self._connect()
+        try:
+            writer.write(_encode_request(request))
+            await _read_status(reader)
+            length = int(await reader.readexactly(4), 16)
+            return await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise AdbError("adb server提前关闭了连接")
+        finally:
+            writer.close()
+
+    async def version(self):
+        return int(await self._host_query('host:version'), 16)
+
+    async def devices(self):
+        output = (await self._host_query('host:devices')).decode('utf-8', 'replace')
+        return [tuple(line.split('\t', 1)) for line in output.splitlines() if '\t' in line]
+
+    async def _open_service(self, serial, command):
+        services = ['shell'] if serial in self._exec_unsupported else ['exec', 'shell']
+        for service in services:
+            reader, writer = await self._connect()
+            try:
+                transport = f'host:transport:{serial}' if serial else 'host:transport-any'
+                writer.write(_encode_request(transport))
+                await asyncio.wait_for(_read_status(reader), self.timeout)
+                writer.write(_encode_request(f'{service}:{command}'))
+                await asyncio.wait_for(_read_status(reader), self.timeout)
+                return reader, writer, service == 'shell'
+            except AdbError:
+                writer.close()
+                if service == 'shell':
+                    raise
+                self._exec_unsupported.add(serial)
+            except asyncio.IncompleteReadError:
+                writer.close()
+                raise AdbError("adb server提前关闭了连接")
+            except asyncio.TimeoutError:
+                writer.close()
+                raise AdbTimeout(f"adb请求超时: {command}")
+        raise AdbError(f"无法打开adb服务: {command}")
+
+    async def run(self, serial, command, timeout=DEFAULT_TIMEOUT):
+        """执行命令并返回完整输出(bytes)"""
+        reader, writer, crlf = await self._open_service(serial, command)
+        try:
+            output = await asyncio.wait_for(reader.read(), timeout)
+        except asyncio.TimeoutError:
+            raise AdbTimeout(f"adb命令超时: {command}")
+        finally:
+            writer.close()
+        return output.replace(b'\r\n', b'\n') if crlf else output
+
+    async def open_stream(self, serial, command):
+        reader, writer, crlf = await self._open_service(serial, command)
+        return AsyncStream(reader, writer, crlf=crlf)
+
+    async def close(self):
+        pass
+
+
+class AsyncSubprocessClient:
+    """以asyncio子进程调用adb命令行, 作为回退方案"""
+
+    kind = 'subprocess'
+
+    def __init__(self, adb_cmd):
+        self.adb_cmd = [adb_cmd] if isinstance(adb_cmd, str) else list(adb_cmd)
+
+    def describe(self):
+        return f"adb路径: {' '.join(self.adb_cmd)} (asyncio)"
+
+    def _args(self, serial, command):
+        return self.adb_cmd + (['-s', serial] if serial else []) + ['exec-out', command]
+
+    async def run(self, serial, command, timeout=DEFAULT_TIMEOUT):
+        process = await asyncio.create_subprocess_exec(*self._args(serial, command),
+                                                       stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.DEVNULL)
+        try:
+            output, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise AdbTimeout(f"adb命令超时: {command}")
+        return output
+
+    async def open_stream(self, serial, command):
+        process = await asyncio.create_subprocess_exec(*self._args(serial, command),
+                                                       stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.DEVNULL)
+        return AsyncStream(process.stdout, process=process)
+
+    async def close(self):
+        pass
+
+
+class _ThreadStream:
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def read(self, size=CHUNK_SIZE):
+        return await asyncio.to_thread(self._stream.read, size)
+
+    async def close(self):
+        await asyncio.to_thread(self._stream.close)
+
+
+class AsyncThreadClient:
+    """在线程中调用同步客户端(adb.AdbWireClient / replay.ReplayClient等), 每个读取占用线程池中的一个线程"""
+
+    def __init__(self, client):
+        self.client = client
+        self.kind = client.kind
+
+    def describe(self):
+        return self.client.describe()
+
+    async def run(self, serial, command, timeout=DEFAULT_TIMEOUT):
+        return await asyncio.to_thread(self.client.run, serial, command, timeout)
+
+    async def open_stream(self, serial, command):
+        return _ThreadStream(await asyncio.to_thread(self.client.open_stream, serial, command))
+
+    async def close(self):
+        self.client.close()
+
+
+async def create_async_client(backend=None):
+    """按配置创建asyncio客户端, 与runtime.create_client的选择方式一致"""
+    backend = backend or os.environ.get('AUTOTEST_BACKEND', 'auto')
+    if backend == 'replay':
+        from .runtime import create_client
+
+        return AsyncThreadClient(create_client('replay'))
+    if backend not in ('auto', 'wire', 'subprocess'):
+        raise AdbError(f"未知的AUTOTEST_BACKEND: {backend}")
+    if backend in ('auto', 'wire'):
+        client = AsyncAdbClient()
+        try:
+            await client.version()
+            return client
+        except AdbError:
+            if backend == 'wire':
+                raise
+    adb_cmd = find_adb()
+    if not adb_cmd:
+        raise AdbError("找不到adb命令")
+    return AsyncSubprocessClient(adb_cmd)
+
+
+class AsyncDevice:
+    """asyncio版的runtime.Device"""
+
+    def __init__(self, client, serial=None, watermark=None):
+        self.client = client
+        self.serial = serial
+        replay = client.kind == 'replay'
+        self.watermark = watermark or os.environ.get('AUTOTEST_WATERMARK', 'clear' if replay else 'sentinel')
+        if self.watermark not in WATERMARKS:
+            raise AdbError(f"未知的AUTOTEST_WATERMARK: {self.watermark}")
+
+    def describe(self):
+        if self.serial:
+            return f"{self.client.describe()} (设备: {self.serial})"
+        return self.client.describe()
+
+    async def clear_logcat(self):
+        with span('logcat_clear'):
+            await self.client.run(self.serial, CLEAR_COMMAND)
+
+    async def write_sentinel(self):
+        token = f'{SESSION_MARKER}: {uuid.uuid4().hex}'
+        with span('logcat_mark'):
+            await self.client.run(self.serial, f'log -t {LOG_TAG} {token}')
+        return token.encode('ascii')
+
+    async def clock(self):
+        with span('logcat_mark'):
+            output = (await self.client.run(self.serial, CLOCK_COMMAND)).decode('ascii', errors='ignore').strip()
+        seconds, _, fraction = output.partition('.')
+        fraction = fraction[:3] if fraction.isdigit() else ''
+        try:
+            return float(f'{seconds}.{fraction or 0}')
+        except ValueError:
+            raise AdbError(f"无法读取设备时间: {output}")
+
+    async def apk_build(self):
+        return parse_apk_build(await self.client.run(self.serial, BUILD_COMMAND))
+
+    async def mark(self):
+        """记录检验起点, 返回(起始时间, 起点标记)"""
+        if self.watermark == 'sentinel':
+            return None, await self.write_sentinel()
+        if self.watermark == 'time':
+            return await self.clock(), None
+        await self.clear_logcat()
+        return None, None
+
+    async def dump_logcat(self, since=None, timeout=DEFAULT_TIMEOUT):
+        command = DUMP_COMMAND if since is None else f'{DUMP_COMMAND} -T {since:.3f}'
+        with span('logcat_dump'):
+            return await self.client.run(self.serial, command, timeout=timeout)
+
+    async def follow_logcat(self, since=None):
+        command = FOLLOW_COMMAND if since is None else f'{FOLLOW_COMMAND} -T {since:.3f}'
+        return await self.client.open_stream(self.serial, command)
+
+
+class AsyncCheck:
+    """一个指令的检验规格的asyncio执行方式"""
+
+    def __init__(self, spec):
+        self.spec = load_spec(spec) if isinstance(spec, str) else spec
+
+    async def evaluate(self, device, mode='follow', timeout=None, log=None, progress=None):
+        """
+        在设备上执行一次检验, 返回Verdict
+        follow: 跟随日志流直到所需标记全部出现(最长timeout秒); batch: 立即读取日志; interactive: 等待人工按回车后读取
+        log为bytearray时追加本次检验的日志(默认不保留); progress(engine)在follow模式下每处理一块日志后调用
+        """
+        if mode not in ASYNC_MODES:
+            raise AdbError(f"未知的检验方式: {mode}")
+        engine = CheckEngine([self.spec])
+        with span('clear'):
+            if mode == 'follow' and device.watermark == 'sentinel':
+                # 写入起点标记与打开日志流同时进行, 日志流中起点标记之前的部分会被跳过
+                marked, stream = await asyncio.gather(device.mark(), device.follow_logcat(), return_exceptions=True)
+                for failed in (marked, stream):
+                    if isinstance(failed, BaseException):
+                        if not isinstance(stream, BaseException):
+                            await stream.close()
+                        raise failed
+                since, sentinel = marked
+            else:
+                since, sentinel = await device.mark()
+                stream = await device.follow_logcat(since) if mode == 'follow' else None
+        with span('collect'):
+            if stream is not None:
+                timeout = DEFAULT_FOLLOW_TIMEOUT if timeout is None else timeout
+                await self._follow(stream, engine, sentinel, timeout, log, progress)
+            else:
+                if mode == 'interactive':
+                    await asyncio.get_running_loop().run_in_executor(None, input, PROMPT)
+                data = await device.dump_logcat(since)
+                if sentinel is not None:
+                    data = after_line(data, sentinel)
+                if log is not None:
+                    log += data
+                with span('scan'):
+                    engine.feed_text(data)
+        with span('verdict'):
+            verdict = engine.verdicts()[0]
+            note(failure=None if verdict.passed else verdict.failure.fail, values=verdict.values,
+                 hits=step_hits(verdict))
+        return verdict
+
+    @staticmethod
+    async def _follow(stream, engine, sentinel, timeout, log=None, progress=None):
+        """按块读取日志流交给引擎, 只保留未完成的一行"""
+        deadline = time.monotonic() + timeout
+        pending = b''
+        try:
+            with span('follow'):
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    try:
+                        chunk = await asyncio.wait_for(stream.read(), remaining)
+                    except asyncio.TimeoutError:
+                        return False
+                    if not chunk:
+                        return False
+                    pending += chunk
+                    cut = pending.rfind(b'\n') + 1
+                    if not cut:
+                        continue
+                    complete, pending = pending[:cut], pending[cut:]
+                    if sentinel is not None:
+                        if sentinel not in complete:
+                            continue
+                        complete = after_line(complete, sentinel)
+                        sentinel = None
+                    if log is not None:
+                        log += complete
+                    done = engine.feed_text(complete)
+                    if progress is not None:
+                        progress(engine)
+                    if done:
+                        return True
+        finally:
+            await stream.close()
+
+    def run(self, serial=None, backend=None, mode=None, timeout=None):
+        """同步包装: 执行一次检验并按原格式输出结论, 返回是否通过"""
+
+        log = bytearray()
+
+        async def main():
+            client = await create_async_client(backend)
+            try:
+                device = AsyncDevice(client, serial or os.environ.get('ANDROID_SERIAL') or None)
+                print(f"使用{device.describe()}")
+                default_mode = 'batch' if client.kind == 'replay' else 'interactive'
+                keep = log if self.spec.echo_log or self.spec.show_log else None
+                return await self.evaluate(device, mode or os.environ.get('AUTOTEST_MODE', default_mode), timeout, keep)
+            finally:
+                await client.close()
+
+        try:
+            verdict = asyncio.run(main())
+        except TimeoutError:
+            print("验证失败: 读取日志超时")
+            return False
+        except Exception as e:
+            print(f"检查{self.spec.subject}时发生错误: {str(e)}")
+            return False
+        return print_verdict(verdict, log)
+
+
+def get_check(task):
+    """指令编号对应的AsyncCheck"""
+    return AsyncCheck(load_spec(f'eval_{task}'))
+
+
+async def run_check(check, device, mode='follow', timeout=None, collector=None, progress=None):
+    """执行一次检验并记录各阶段耗时, 返回scheduler.EvalResult(超时和错误记录在结果中, 不抛出)"""
+    task = check.spec.task
+    started = time.time()
+    start = time.perf_counter()
+    passed = False
+    with recording(task, device.serial, collector) as record:
+        try:
+            verdict = await check.evaluate(device, mode, timeout, progress=progress)
+            passed = verdict.passed
+        except TimeoutError:
+            record['failure'] = "读取日志超时"
+        except Exception as e:
+            # 与Scheduler._evaluate一致: 单个检验出错(adb错误、spec或oracle错误)只记录在结果中, 不中断整批检验
+            record['error'] = f"{type(e).__name__}: {e}"
+    return EvalResult(task, device.serial, passed, time.perf_counter() - start, started, '',
+                      record['error'], record['failure'], record['steps'], record['hits'])
+
+
+async def evaluate_all(jobs, client, mode='follow', timeout=None, watermark=None, concurrency=64, per_device=1,
+                       collector=None, on_result=None):
+    """
+    在一个事件循环中执行[(指令, serial), ...], 每台设备同时进行per_device个检验(clear方式时只能为1), 不同设备之间并发
+    concurrency限制全部设备同时进行的检验数; 返回scheduler.EvalResult列表(按完成顺序)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    by_device = collections.defaultdict(list)
+    for task, serial in jobs:
+        by_device[serial].append(task)
+    devices = {serial: AsyncDevice(client, serial, watermark) for serial in by_device}
+    if per_device > 1 and any(device.watermark == 'clear' for device in devices.values()):
+        raise AdbError("clear方式会清除同一设备上其他检验的日志, 每台设备只能同时进行一个检验")
+    results = []
+
+    async def device_worker(device, tasks):
+        while tasks:
+            task = tasks.popleft()
+            async with semaphore:
+                result = await run_check(get_check(task), device, mode, timeout, collector)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    workers = []
+    for serial, tasks in by_device.items():
+        queue = collections.deque(tasks)
+        workers.extend(device_worker(devices[serial], queue) for _ in range(per_device))
+    await asyncio.gather(*workers)
+    return results
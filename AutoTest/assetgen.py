@@ -0,0 +1,364 @@
+"""
+合成assets数据生成器
+
+APP内置的assets/data文件很小(videos.json约16KB), 无法体现数据规模增长时APP各Presenter(Gson解析)
+以及检验端assets索引和oracle的表现。本模块生成与内置数据字段一致、但规模可达千万条的数据文件:
+- videos.json / upmasters.json / comments.json(一级评论, 回复嵌套在replyList中) / danmaku.json /
+  watch_history.json / livestreams.json, 字段和取值范围与内置数据及model/*.kt一致
+- 引用一致: 视频的upMasterId/upMasterName对应upmasters.json中的UP主, UP主的videoList即其全部视频,
+  评论、弹幕、观看历史和直播引用的videoId/upMasterId都存在; 视频ID为vid001起的连续编号,
+  首页视频(oracle.HOME_VIDEOS)和直播推荐(oracle.RECOMMENDED_LIVES)引用的ID总是存在
+- 流式输出: 逐条生成并写出, 内存中只保留各UP主的视频编号范围(与UP主数量成正比), 与视频、评论和弹幕数量无关
+- 每个UP主的视频数服从长尾分布; 同样的参数和seed生成同样的数据
+
+输出为每行一条记录的JSON数组(Gson和json.load均可直接读取)。
+
+用法:
+    python -m AutoTest.assetgen -o /tmp/assets --videos 100000
+    python -m AutoTest.assetgen -o /tmp/assets --videos 1000000 --comments-per-video 4 --danmaku-per-video 4
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import time
+from array import array
+
+from .oracle import RECOMMENDED_LIVES
+
+EPOCH_MS = 1729526100000
+DAY_MS = 86400000
+
+TOPICS = ('罗翔说刑法', '原神', '星际穿越解析', '快速排序', '二叉树', 'MVVM架构', '打铁花', '灵笼', '探店', '修仙',
+          'iPhone评测', '5G', '假面骑士', 'DIY手工', '美食制作', '游戏解说', '鬼畜', '纪录片', '考研数学', '摄影入门')
+PREFIXES = ('【合集】', '【4K】', '【干货】', '', '', '')
+SUFFIXES = ('深度解析', '入门教程', '全流程', '名场面', '第{n}期', '实况', '看完这个就懂了', '')
+NAME_WORDS = ('影视', '木鱼', '程序员', '老番茄', '何同学', '逍遥', '传统工艺', '民俗', '科技', '美食', '游戏', '数码',
+              '小灰', '阿伟', '散人', '飓风', '水心', '芳斯塔芙')
+TAGS = ('把兴趣玩出名堂', '动画', '国创', '科幻', '影视', '知识', '科技', '游戏', '美食', '生活', '音乐', '鬼畜',
+        '传统文化', '数码', '原神', '开放世界', 'Android开发', '探店', '修仙', 'DIY')
+COMMENTS = ('前排！', '讲得太好了', '三连了', '法外狂徒张三的故事已经深入人心了🤣', '第一次看到这么清楚的讲解',
+            '催更催更', '这期质量好高', '笑死我了哈哈哈', '收藏了慢慢看', 'UP主辛苦了')
+DANMAKU = ('前排！', '来了来了', '哈哈哈哈', '名场面', '钱包准备好了', '泪目', '高能预警', '打卡', 'awsl', '？？？')
+COLORS = ('#FFFFFF', '#FFFFFF', '#FFFFFF', '#FF0000', '#FFD700', '#00FF00', '#00FFFF', '#FF69B4', '#FFA500', '#FFFF00')
+FONT_SIZES = (25, 25, 25, 28, 30, 32)
+DANMAKU_TYPES = ('SCROLL', 'SCROLL', 'SCROLL', 'TOP', 'BOTTOM')
+USER_NAMES = ('小明同学', '法学小白', '法律爱好者', '刑法学渣', '数码爱好者', '路过的网友', '夜猫子', '学习使我快乐')
+CATEGORIES = (('购物', ('购物', '双十一')), ('游戏', ('游戏', '电竞')), ('娱乐', ('音乐', '点唱')),
+              ('生活', ('美食', '探店')), ('知识', ('科普', '学习')))
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def _pick(words, index, salt):
+    """由编号确定地选择一个词(同一编号在不同文件中得到相同的名称)"""
+    return words[(index * 2654435761 + salt * 40503) % 4294967296 % len(words)]
+
+
+def video_id(index):
+    return f'vid{index + 1:03d}'
+
+
+def video_title(index):
+    topic = _pick(TOPICS, index, 1)
+    suffix = _pick(SUFFIXES, index, 2).format(n=index // len(TOPICS) + 1)
+    return f'{_pick(PREFIXES, index, 3)}{topic}{" " + suffix if suffix else ""}'
+
+
+def upmaster_id(index):
+    return f'up{index + 1:03d}'
+
+
+def upmaster_name(index):
+    return f'{_pick(NAME_WORDS, index, 4)}{_pick(NAME_WORDS, index, 5)}{index + 1}'
+
+
+class _ArrayWriter:
+    """流式写出JSON数组, 每行一条记录"""
+
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8', newline='\n')
+        self._file.write('[\n')
+        self._first = True
+        self._batch = []
+        self.count = 0
+
+    def write(self, record):
+        self._batch.append(_encode(record) if self._first else ',\n' + _encode(record))
+        self._first = False
+        self.count += 1
+        if len(self._batch) >= 4096:
+            self._file.write(''.join(self._batch))
+            self._batch.clear()
+
+    def close(self):
+        self._file.write(''.join(self._batch) + '\n]\n')
+        self._file.close()
+
+
+class AssetGenerator:
+    """按规模参数生成一组引用一致的assets数据文件"""
+
+    def __init__(self, videos=10000, upmasters=None, comments_per_video=8.0, reply_ratio=0.3, danmaku_per_video=20.0,
+                 history=None, livestreams=None, seed=0):
+        self.videos = videos
+        if not upmasters:
+            # 默认值不超过视频数, 小规模数据也能直接生成; 只有显式指定的UP主数量才会报错
+            self.upmasters = min(videos, max(15, videos // 20))
+        elif upmasters > videos:
+            raise ValueError("UP主数量不能多于视频数量")
+        else:
+            self.upmasters = upmasters
+        self.comments_per_video = comments_per_video
+        self.reply_ratio = reply_ratio
+        self.danmaku_per_video = danmaku_per_video
+        self.history = videos // 10 if history is None else history
+        self.livestreams = livestreams or max(len(RECOMMENDED_LIVES) + 1, self.upmasters // 50)
+        self.seed = seed
+        self._starts = self._allocate()
+
+    def _allocate(self):
+        """各UP主视频编号范围的起点(长尾分布, 每个UP主至少一个视频)"""
+        rng = random.Random(self.seed)
+        weights = [rng.paretovariate(1.2) for _ in range(self.upmasters)]
+        spare = self.videos - self.upmasters
+        total = sum(weights)
+        sizes = [1 + int(spare * weight / total) for weight in weights]
+        # 取整的余数分给前面的UP主
+        for index in range(self.videos - sum(sizes)):
+            sizes[index % self.upmasters] += 1
+        starts = array('q', [0])
+        for size in sizes[:-1]:
+            starts.append(starts[-1] + size)
+        return starts
+
+    def owner(self, video):
+        """视频所属UP主的编号"""
+        return bisect.bisect_right(self._starts, video) - 1
+
+    def _videos_of(self, upmaster):
+        end = self._starts[upmaster + 1] if upmaster + 1 < self.upmasters else self.videos
+        return range(self._starts[upmaster], end)
+
+    def _rng(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def generate(self, directory):
+        """写出全部数据文件, 返回 {文件名: 记录数}"""
+        os.makedirs(directory, exist_ok=True)
+        counts = {}
+        for name, method in (('upmasters.json', self._write_upmasters), ('videos.json', self._write_videos),
+                             ('comments.json', self._write_comments), ('danmaku.json', self._write_danmaku),
+                             ('watch_history.json', self._write_history),
+                             ('livestreams.json', self._write_livestreams)):
+            writer = _ArrayWriter(os.path.join(directory, name))
+            try:
+                method(writer, self._rng(name))
+            finally:
+                writer.close()
+            counts[name] = writer.count
+        return counts
+
+    def _write_upmasters(self, writer, rng):
+        for index in range(self.upmasters):
+            videos = self._videos_of(index)
+            followed = rng.random() < 0.2
+            writer.write({
+                'upMasterId': upmaster_id(index),
+                'name': upmaster_name(index),
+                'avatarUrl': f'avatar/{index % 12}.jpg',
+                'description': f'{_pick(TOPICS, index, 6)}区UP主',
+                'isFollowed': followed,
+                'fansCount': _long_tail(rng, 0.9, 5000, 500000000),
+                'videoCount': len(videos),
+                'videoList': [video_id(video) for video in videos],
+                'followTime': EPOCH_MS - rng.randrange(365) * DAY_MS if followed else None,
+                'lastUpdateTime': EPOCH_MS - rng.randrange(30) * DAY_MS,
+            })
+
+    def _write_videos(self, writer, rng):
+        for index in range(self.videos):
+            owner = self.owner(index)
+            views = _long_tail(rng, 1.1, 2000, 1000000000)
+            likes = int(views * rng.uniform(0.01, 0.1))
+            created = EPOCH_MS - rng.randrange(3 * 365) * DAY_MS
+            writer.write({
+                'videoId': video_id(index),
+                'title': video_title(index),
+                'coverImage': f'video/L{index % 12 + 1}.png',
+                'videoPath': f'video/{index % 12 + 1}.mp4',
+                'upMasterId': upmaster_id(owner),
+                'upMasterName': upmaster_name(owner),
+                'isLiked': rng.random() < 0.1,
+                'isFavorited': rng.random() < 0.05,
+                'isShared': False,
+                'likeCount': likes,
+                'dislikeCount': 0,
+                'coinCount': int(likes * rng.uniform(0.1, 0.4)),
+                'favoriteCount': int(likes * rng.uniform(0.05, 0.3)),
+                'shareCount': int(likes * rng.uniform(0.01, 0.05)),
+                'viewCount': views,
+                'commentCount': int(views * rng.uniform(0.001, 0.01)),
+                'onlineViewers': rng.randrange(1, 1000),
+                'tags': rng.sample(TAGS, rng.randrange(1, 4)),
+                'danmakuList': [],
+                'commentList': [],
+                'createdTime': created,
+                'lastUpdateTime': created + rng.randrange(30) * DAY_MS,
+            })
+
+    def _comment(self, rng, number, video, parent=None):
+        author = rng.randrange(100000)
+        return {
+            'commentId': f'cmt{number:03d}',
+            'videoId': video,
+            'content': rng.choice(COMMENTS),
+            'authorId': f'user{author:03d}',
+            'authorName': rng.choice(USER_NAMES),
+            'publishTime': EPOCH_MS - rng.randrange(90 * DAY_MS),
+            'likeCount': _long_tail(rng, 1.3, 10, 1000000) if parent is None else rng.randrange(300),
+            'parentCommentId': parent,
+            'replyList': [],
+            'isLiked': rng.random() < 0.05,
+        }
+
+    def _write_comments(self, writer, rng):
+        # comments_per_video为包括回复在内的平均条数
+        top_level = self.comments_per_video / (1 + self.reply_ratio)
+        number = 1
+        for index in range(self.videos):
+            video = video_id(index)
+            for _ in range(_poisson(rng, top_level)):
+                comment = self._comment(rng, number, video)
+                number += 1
+                for _ in range(_poisson(rng, self.reply_ratio)):
+                    comment['replyList'].append(self._comment(rng, number, video, comment['commentId']))
+                    number += 1
+                writer.write(comment)
+
+    def _write_danmaku(self, writer, rng):
+        number = 1
+        for index in range(self.videos):
+            video = video_id(index)
+            duration = rng.uniform(60, 1800)
+            for _ in range(_poisson(rng, self.danmaku_per_video)):
+                sender = rng.randrange(100000)
+                writer.write({
+                    'danmakuId': f'dm{number:03d}',
+                    'videoId': video,
+                    'content': rng.choice(DANMAKU),
+                    'senderId': f'user{sender:03d}',
+                    'senderName': rng.choice(USER_NAMES),
+                    'sendTime': EPOCH_MS - rng.randrange(30 * DAY_MS),
+                    'videoTime': round(rng.uniform(0, duration), 1),
+                    'color': rng.choice(COLORS),
+                    'fontSize': rng.choice(FONT_SIZES),
+                    'type': rng.choice(DANMAKU_TYPES),
+                })
+                number += 1
+
+    def _write_history(self, writer, rng):
+        # 按观看时间从新到旧, 与内置数据一致
+        watched = EPOCH_MS + DAY_MS
+        for index in range(self.history):
+            video = rng.randrange(self.videos)
+            owner = self.owner(video)
+            watched -= rng.randrange(60000, 6 * 3600000)
+            length = rng.randrange(60, 1800) * 1000
+            progress = round(rng.random(), 2)
+            writer.write({
+                'historyId': f'hist{index + 1:03d}',
+                'videoId': video_id(video),
+                'videoTitle': video_title(video),
+                'upMasterId': upmaster_id(owner),
+                'upMasterName': upmaster_name(owner),
+                'watchTime': watched,
+                'watchProgress': progress,
+                'watchDuration': int(length * progress),
+                'lastWatchPosition': int(length * progress),
+                'isFinished': progress >= 0.95,
+            })
+
+    def _write_livestreams(self, writer, rng):
+        for index in range(self.livestreams):
+            owner = rng.randrange(self.upmasters)
+            category, tags = rng.choice(CATEGORIES)
+            writer.write({
+                'liveId': f'live{index + 1:03d}',
+                'title': f'{upmaster_name(owner)}的{category}直播',
+                'coverImage': f'video/Live{index % 4 + 1}.jpg',
+                'upMasterId': upmaster_id(owner),
+                'upMasterName': upmaster_name(owner),
+                'upMasterAvatar': f'avatar/{owner % 12}.jpg',
+                'viewerCount': _long_tail(rng, 1.0, 1000, 10000000),
+                'tags': list(tags),
+                'isLive': rng.random() < 0.8,
+                'category': category,
+                'startTime': EPOCH_MS - rng.randrange(8 * 3600000),
+            })
+
+
+def _long_tail(rng, alpha, scale, cap):
+    """长尾分布的计数, 不超过cap(model中的计数字段为Kotlin Int)"""
+    return min(int(rng.paretovariate(alpha) * scale), cap)
+
+
+def _poisson(rng, mean):
+    """泊松分布的随机整数(均值较大时用正态近似)"""
+    if mean <= 0:
+        return 0
+    if mean > 30:
+        return max(0, round(rng.gauss(mean, mean ** 0.5)))
+    limit = 2.718281828459045 ** -mean
+    count, product = 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成合成assets数据')
+    parser.add_argument('-o', '--output', required=True, help='输出目录')
+    parser.add_argument('--videos', type=int, default=10000, help='视频数')
+    parser.add_argument('--upmasters', type=int, help='UP主数 (默认视频数/20)')
+    parser.add_argument('--comments-per-video', type=float, default=8.0, help='每个视频的平均评论数(含回复)')
+    parser.add_argument('--reply-ratio', type=float, default=0.3, help='每条一级评论的平均回复数')
+    parser.add_argument('--danmaku-per-video', type=float, default=20.0, help='每个视频的平均弹幕数')
+    parser.add_argument('--history', type=int, help='观看历史条数 (默认视频数/10)')
+    parser.add_argument('--livestreams', type=int, help='直播数 (默认UP主数/50)')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    args = parser.parse_args(argv)
+
+    try:
+        generator = AssetGenerator(args.videos, args.upmasters, args.comments_per_video, args.reply_ratio,
+                                   args.danmaku_per_video, args.history, args.livestreams, args.seed)
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    counts = generator.generate(args.output)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    for name, count in counts.items():
+        size = os.path.getsize(os.path.join(args.output, name))
+        print(f"{name:<20}{count:>12,}条{size / 1024 / 1024:>10.1f}MB")
+    peak = _peak_rss_mb()
+    print(f"共{total:,}条, 耗时{elapsed:.1f}s ({total / elapsed:,.0f}条/秒)"
+          + (f", 峰值RSS {peak:.0f}MB" if peak else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
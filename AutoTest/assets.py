@@ -0,0 +1,288 @@
+"""
+assets数据索引
+
+检验中需要与APP内置数据(app/src/main/assets/data/*.json)对比时, 统一通过 AssetIndex 访问:
+- 每个文件只解析一次, 同时预先计算条目数和按ID的索引
+- 访问时比较文件的mtime和大小(同一文件每revalidate秒最多检查一次), 变化后再比较内容哈希, 内容确实改变时才重新解析
+- 派生数据(如收藏视频 = videos.json中isFavorited的视频, 与CollectPresenter一致)随源文件一起失效
+- 进程内共享一个索引(get_index), 批量检验时所有检验共用
+- 超过stream_above字节的大文件(如assetgen生成的数据)不整体解析: 流式计算条目数和内容哈希, 不保留数据本身,
+  需要逐条处理时用 records() / iter_records() 流式读取, 内存占用与文件大小无关
+
+index = get_index()
+index.count('watch_history.json')      # 观看历史条数
+index.count('favorites')               # 收藏视频数
+index.get('videos.json', 'vid001')     # 按ID查找
+for video in index.records('videos.json', fields=('videoId', 'likeCount')):   # 流式读取, 只保留所需字段
+    ...
+"""
+import codecs
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'app', 'src', 'main', 'assets', 'data')
+
+# 各数据文件中条目的ID字段
+ID_FIELDS = {
+    'cache_videos.json': 'cacheId',
+    'comments.json': 'commentId',
+    'danmaku.json': 'danmakuId',
+    'hot_searches.json': 'id',
+    'livestreams.json': 'liveId',
+    'posts.json': 'postId',
+    'products.json': 'productId',
+    'search_discoveries.json': 'id',
+    'search_history.json': 'id',
+    'upmasters.json': 'upMasterId',
+    'videos.json': 'videoId',
+    'watch_history.json': 'historyId',
+}
+
+# 派生数据: 名称 -> (源文件, 计算函数), 与APP中对应Presenter的筛选条件一致
+DERIVED = {
+    'favorites': ('videos.json', lambda videos: [video for video in videos if video.get('isFavorited')]),
+    'liked_videos': ('videos.json', lambda videos: [video for video in videos if video.get('isLiked')]),
+    'followed_upmasters': ('upmasters.json', lambda upmasters: [up for up in upmasters if up.get('isFollowed')]),
+    'live_now': ('livestreams.json', lambda streams: [stream for stream in streams if stream.get('isLive')]),
+}
+
+AssetEntry = collections.namedtuple('AssetEntry', 'name stamp digest data count by_id')
+
+CHUNK_SIZE = 1 << 20
+# 超过此大小的文件流式处理
+STREAM_ABOVE = 64 << 20
+# 单条记录的最大长度, 超过时认为文件格式错误
+MAX_RECORD = 64 << 20
+_WHITESPACE = ' \t\n\r'
+
+
+def _project(record, fields):
+    """只保留fields中的字段, 嵌套的replyList(评论的回复)同样处理"""
+    if fields is None or not isinstance(record, dict):
+        return record
+    projected = {field: record[field] for field in fields if field in record}
+    replies = projected.get('replyList')
+    if replies:
+        projected['replyList'] = [_project(reply, fields) for reply in replies]
+    return projected
+
+
+def iter_records(path, fields=None, chunk_size=CHUNK_SIZE, hasher=None):
+    """
+    逐条读取JSON文件顶层数组中的记录(顶层为对象时产出该对象本身), 内存中只保留当前一块数据和当前记录
+    fields为字段名序列时每条记录只保留这些字段; hasher(如hashlib.sha1())按读取的原始字节更新
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        buffer = ''
+        position = 0
+        eof = False
+        in_array = None
+
+        def fill():
+            # 丢弃已处理的部分, 再读取一块
+            nonlocal buffer, position, eof
+            raw = f.read(chunk_size)
+            if hasher is not None:
+                hasher.update(raw)
+            eof = not raw
+            buffer = buffer[position:] + text.decode(raw, final=eof)
+            position = 0
+            if len(buffer) > MAX_RECORD:
+                raise ValueError(f"{path}: 记录过大或格式错误")
+
+        while True:
+            skip = _WHITESPACE + ',' if in_array else _WHITESPACE + '\ufeff'
+            while position < len(buffer) and buffer[position] in skip:
+                position += 1
+            if position >= len(buffer):
+                if eof:
+                    if in_array:
+                        raise ValueError(f"{path}: JSON数组不完整")
+                    return
+                fill()
+                continue
+            if in_array is None and buffer[position] == '[':
+                in_array = True
+                position += 1
+                continue
+            if in_array and buffer[position] == ']':
+                # 数组之后的内容不再解析, 但内容哈希需要包括整个文件
+                while hasher is not None and not eof:
+                    raw = f.read(chunk_size)
+                    hasher.update(raw)
+                    eof = not raw
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if not eof and (end == len(buffer) or buffer[end] not in _WHITESPACE + ',]'):
+                # 数值可能被截断在块的末尾(如"2.5e"), 读取更多数据后重新解析
+                fill()
+                continue
+            position = end
+            yield _project(record, fields)
+            if not in_array:
+                return
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _scan(name, path, stamp):
+    """流式处理大文件: 只计算内容哈希和条目数, 不保留数据"""
+    hasher = hashlib.sha1()
+    count = sum(1 for _ in iter_records(path, fields=(), hasher=hasher))
+    with open(path, 'rb') as f:
+        # 与_build一致, 顶层不是数组时条目数为0
+        is_array = f.read(64).decode('utf-8', 'ignore').lstrip('\ufeff' + _WHITESPACE).startswith('[')
+    return AssetEntry(name, stamp, hasher.hexdigest(), None, count if is_array else 0, {})
+
+
+def _build(name, raw, stamp, digest):
+    data = json.loads(raw.decode('utf-8'))
+    count = len(data) if isinstance(data, list) else 0
+    by_id = {}
+    field = ID_FIELDS.get(name)
+    if field and isinstance(data, list):
+        by_id = {item[field]: item for item in data if isinstance(item, dict) and field in item}
+    return AssetEntry(name, stamp, digest, data, count, by_id)
+
+
+class AssetIndex:
+    """assets数据的缓存索引"""
+
+    def __init__(self, directory=ASSETS_DIR, revalidate=1.0, stream_above=STREAM_ABOVE):
+        self.directory = directory
+        self.revalidate = revalidate
+        self.stream_above = stream_above
+        self._entries = {}
+        self._checked = {}
+        self._derived = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def names(self):
+        """目录下的全部数据文件名"""
+        return sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+
+    def entry(self, name):
+        """数据文件的缓存条目, 文件不存在时返回None"""
+        now = time.monotonic()
+        cached = self._entries.get(name)
+        if cached is not None and now - self._checked.get(name, float('-inf')) < self.revalidate:
+            return cached
+
+        path = os.path.join(self.directory, name)
+        try:
+            stamp = _stamp(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(name, None)
+            return None
+        self._checked[name] = now
+        if cached is not None and cached.stamp == stamp:
+            return cached
+
+        with self._lock:
+            cached = self._entries.get(name)
+            if cached is not None and cached.stamp == stamp:
+                return cached
+            if self.stream_above is not None and stamp[1] > self.stream_above:
+                entry = _scan(name, path, stamp)
+                if cached is not None and cached.digest == entry.digest and cached.data is None:
+                    entry = cached._replace(stamp=stamp)
+                else:
+                    self.loads += 1
+                self._entries[name] = entry
+                return entry
+            with open(path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()
+            if cached is not None and cached.digest == digest:
+                # 只是mtime变化(如重新检出), 内容相同时不重新解析
+                entry = cached._replace(stamp=stamp)
+            else:
+                entry = _build(name, raw, stamp, digest)
+                self.loads += 1
+            self._entries[name] = entry
+            return entry
+
+    def data(self, name, default=None):
+        """解析后的数据, name可以是文件名或派生数据名; 流式处理的大文件没有整体数据, 返回default"""
+        if name in DERIVED:
+            return self._derive(name)
+        entry = self.entry(name)
+        return default if entry is None or entry.data is None else entry.data
+
+    def records(self, name, fields=None):
+        """
+        逐条产出数据文件中的记录, 文件不存在时不产出
+        流式处理的大文件每次重新从文件读取, fields见iter_records; 已整体解析的文件直接产出缓存的记录(不复制, 忽略fields),
+        调用方不能修改产出的记录
+        """
+        entry = self.entry(name)
+        if entry is None:
+            return iter(())
+        if entry.data is None:
+            return iter_records(os.path.join(self.directory, name), fields)
+        return iter(entry.data if isinstance(entry.data, list) else [entry.data])
+
+    def count(self, name):
+        """条目数, 数据不存在时返回None"""
+        if name in DERIVED:
+            items = self._derive(name)
+            return None if items is None else len(items)
+        entry = self.entry(name)
+        return None if entry is None else entry.count
+
+    def by_id(self, name):
+        entry = self.entry(name)
+        return {} if entry is None else entry.by_id
+
+    def get(self, name, item_id, default=None):
+        """按ID查找条目"""
+        return self.by_id(name).get(item_id, default)
+
+    def _derive(self, name):
+        source, compute = DERIVED[name]
+        entry = self.entry(source)
+        if entry is None:
+            return None
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == entry.digest:
+            return cached[1]
+        items = compute(self.records(source) if entry.data is None else entry.data)
+        self._derived[name] = (entry.digest, items)
+        return items
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._checked.clear()
+            self._derived.clear()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """获取进程内共享的assets索引"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AssetIndex()
+        return _index
@@ -0,0 +1,3 @@
+"""
+检验运行时的基准测试脚本, 在仓库根目录下以 python -m AutoTest.benchmarks.<名称> 运行
+"""
@@ -0,0 +1,82 @@
+"""
+adb访问方式基准测试
+
+在本地模拟adb server上比较每次检验(logcat -c + logcat -d)的耗时:
+- subprocess: 原有方式, 每次调用启动一个adb命令行进程(默认使用fakeadb的命令行替身, 可用--adb指定)
+- wire: 直连adb server, 不使用预热连接
+- wire+pool: 直连adb server, 使用预热连接池
+
+用法: python -m AutoTest.benchmarks.bench_adb [--iterations 50] [--lines 200]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from AutoTest.adb import AdbSubprocessClient, AdbWireClient
+from AutoTest.fakeadb import FakeAdbServer, FakeDevice
+from AutoTest.runtime import Runtime
+
+MARKERS = ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED: vid001', 'LIKE_BUTTON_CLICKED', 'LIKE_STATUS_CHANGED: liked']
+
+
+def run_check(device, device_log, lines):
+    """模拟一次检验: 清除日志, 由APP写入日志, 读取并扫描日志"""
+    device.clear_logcat()
+    for index in range(lines):
+        device_log.log(MARKERS[index % len(MARKERS)])
+    log_content = device.dump_logcat()
+    return 'LIKE_STATUS_CHANGED' in log_content
+
+
+def measure(name, client, device_log, iterations, lines):
+    device = Runtime(client).device(device_log.serial)
+    # 预热(建立连接池/页缓存等)
+    run_check(device, device_log, lines)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        assert run_check(device, device_log, lines)
+        samples.append((time.perf_counter() - start) * 1000)
+    client.close()
+    samples.sort()
+    return {
+        'name': name,
+        'mean': statistics.fmean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='adb访问方式基准测试')
+    parser.add_argument('--iterations', type=int, default=50, help='每种方式执行的检验次数')
+    parser.add_argument('--lines', type=int, default=200, help='每次检验产生的日志行数')
+    parser.add_argument('--adb', help='subprocess方式使用的adb路径(默认使用fakeadb命令行替身)')
+    args = parser.parse_args(argv)
+
+    device_log = FakeDevice('emulator-5554')
+    with FakeAdbServer(devices=[device_log]) as server:
+        if args.adb:
+            adb_cmd = [args.adb, '-P', str(server.port)]
+        else:
+            adb_cmd = [sys.executable, '-m', 'AutoTest.fakeadb', '-P', str(server.port)]
+
+        results = [
+            measure('subprocess', AdbSubprocessClient(adb_cmd), device_log, args.iterations, args.lines),
+            measure('wire', AdbWireClient(server.host, server.port, pool_size=0), device_log,
+                    args.iterations, args.lines),
+            measure('wire+pool', AdbWireClient(server.host, server.port, pool_size=2), device_log,
+                    args.iterations, args.lines),
+        ]
+
+    baseline = results[0]['mean']
+    print(f"每次检验耗时(ms), {args.iterations}次, 每次{args.lines}行日志")
+    print(f"{'方式':<12}{'mean':>10}{'p50':>10}{'p95':>10}{'加速比':>10}")
+    for result in results:
+        print(f"{result['name']:<12}{result['mean']:>10.2f}{result['p50']:>10.2f}{result['p95']:>10.2f}"
+              f"{baseline / result['mean']:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
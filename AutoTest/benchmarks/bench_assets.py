@@ -0,0 +1,73 @@
+"""
+assets数据规模基准测试
+
+用assetgen生成不同规模的数据, 在独立的子进程中测量检验端读取数据的耗时和峰值RSS:
+- 索引: AssetIndex加载全部数据文件(解析JSON并建立按ID的索引)
+- oracle: 在已加载的数据上计算全部期望值表
+- 流式: AssetIndex(stream_above=0)不整体解析任何文件, Oracle.build()一遍流式读取源文件计算全部期望值表
+
+用法: python -m AutoTest.benchmarks.bench_assets [--videos 1000,10000,100000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from AutoTest.assetgen import AssetGenerator
+from AutoTest.benchmarks.bench_load import _peak_rss_mb
+
+
+def worker(directory, stream=False):
+    from AutoTest.assets import AssetIndex
+    from AutoTest.oracle import TABLES, Oracle
+
+    if stream:
+        oracle = Oracle(AssetIndex(directory, stream_above=0))
+        start = time.perf_counter()
+        oracle.build()
+        print(json.dumps({'stream': time.perf_counter() - start, 'peak_rss_mb': _peak_rss_mb()}))
+        return
+    index = AssetIndex(directory)
+    start = time.perf_counter()
+    for name in index.names():
+        index.entry(name)
+    loaded = time.perf_counter() - start
+    oracle = Oracle(index)
+    start = time.perf_counter()
+    for name in TABLES:
+        oracle.table(name)
+    built = time.perf_counter() - start
+    print(json.dumps({'index': loaded, 'oracle': built, 'peak_rss_mb': _peak_rss_mb()}))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--worker']:
+        return worker(argv[1], argv[2:] == ['--stream'])
+
+    parser = argparse.ArgumentParser(description='assets数据规模基准测试')
+    parser.add_argument('--videos', default='1000,10000,100000', help='逗号分隔的视频数量')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    args = parser.parse_args(argv)
+
+    print(f"{'视频数':>10}{'记录数':>12}{'大小(MB)':>10}{'生成(s)':>9}{'索引(s)':>9}{'oracle(s)':>11}{'RSS(MB)':>10}"
+          f"{'流式(s)':>9}{'流式RSS(MB)':>13}")
+    for videos in (int(count) for count in args.videos.split(',')):
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            counts = AssetGenerator(videos, seed=args.seed).generate(directory)
+            generated = time.perf_counter() - start
+            size = sum(os.path.getsize(os.path.join(directory, name)) for name in counts)
+            result, streamed = (json.loads(subprocess.run(
+                [sys.executable, '-m', 'AutoTest.benchmarks.bench_assets', '--worker', directory, *mode],
+                capture_output=True, check=True, text=True).stdout) for mode in ((), ('--stream',)))
+            print(f"{videos:>10}{sum(counts.values()):>12}{size / 1024 / 1024:>10.1f}{generated:>9.1f}"
+                  f"{result['index']:>9.2f}{result['oracle']:>11.3f}{result['peak_rss_mb'] or 0:>10.0f}"
+                  f"{streamed['stream']:>9.2f}{streamed['peak_rss_mb'] or 0:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+asyncio检验核心基准测试
+
+模拟adb server(ScriptedDevice, 每次检验开始后按--rate写出该指令的日志标记)在独立进程中运行,
+比较两种方式驱动N台设备各执行一遍指令的吞吐量、线程数和峰值RSS:
+- 线程: scheduler.Scheduler, 每台设备一个工作线程, 每个follow检验另有一个日志跟随线程
+- asyncio: aio.evaluate_all, 一个事件循环
+
+每种方式在独立的子进程中执行, 峰值RSS只包含检验一方。
+
+用法: python -m AutoTest.benchmarks.bench_async [--devices 10,50,100] [--tasks 1-30] [--rate 50]
+"""
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from AutoTest.benchmarks.bench_load import _peak_rss_mb
+from AutoTest.scheduler import parse_tasks
+
+MODES = ('线程', 'asyncio')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker(mode, port, serials, tasks):
+    from AutoTest.adb import AdbWireClient
+    from AutoTest.runtime import Runtime
+    from AutoTest.scheduler import Scheduler
+
+    jobs = [(task, serial) for task in tasks for serial in serials]
+    threads = 0
+
+    def sample(_result):
+        nonlocal threads
+        threads = max(threads, threading.active_count())
+
+    start = time.perf_counter()
+    if mode == '线程':
+        runtime = Runtime(AdbWireClient('127.0.0.1', port, pool_size=1, timeout=30), mode='follow', timeout=30)
+        results = Scheduler(serials, runtime=runtime).run(jobs, sample)
+        runtime.close()
+    else:
+        from AutoTest.aio import AsyncAdbClient, evaluate_all
+
+        client = AsyncAdbClient('127.0.0.1', port, timeout=30)
+        results = asyncio.run(evaluate_all(jobs, client, timeout=30, watermark='sentinel', concurrency=1000,
+                                           on_result=sample))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'elapsed': elapsed, 'checks': len(results), 'failed': sum(not r.passed for r in results),
+                      'threads': threads, 'peak_rss_mb': _peak_rss_mb()}))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--worker']:
+        mode, port, serials, tasks = argv[1:]
+        return worker(mode, int(port), serials.split(','), parse_tasks(tasks))
+
+    parser = argparse.ArgumentParser(description='asyncio检验核心基准测试')
+    parser.add_argument('--devices', default='10,50,100', help='逗号分隔的设备数量')
+    parser.add_argument('--tasks', default='1-30', help='每台设备依次执行的指令')
+    parser.add_argument('--rate', type=float, default=50, help='每台设备每秒写出的日志标记数')
+    args = parser.parse_args(argv)
+
+    print(f"{'设备数':<8}{'方式':<10}{'检验数':>8}{'耗时(s)':>10}{'检验/秒':>10}{'线程数':>8}{'RSS(MB)':>10}{'失败':>6}")
+    for device_count in (int(count) for count in args.devices.split(',')):
+        port = _free_port()
+        server = subprocess.Popen([sys.executable, '-m', 'AutoTest.fakeadb', '-P', str(port),
+                                   '--devices', str(device_count), '--tasks', args.tasks, '--per-session', 'cycle',
+                                   '--rate', str(args.rate), 'serve'],
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            server.stdout.readline()
+            serials = ','.join(f'emulator-{5554 + 2 * index}' for index in range(device_count))
+            for mode in MODES:
+                output = subprocess.run([sys.executable, '-m', 'AutoTest.benchmarks.bench_async', '--worker',
+                                         mode, str(port), serials, args.tasks],
+                                        capture_output=True, check=True, text=True).stdout
+                result = json.loads(output.splitlines()[-1])
+                print(f"{device_count:<8}{mode:<10}{result['checks']:>8}{result['elapsed']:>10.2f}"
+                      f"{result['checks'] / result['elapsed']:>10.1f}{result['threads']:>8}"
+                      f"{result['peak_rss_mb'] or 0:>10.1f}{result['failed']:>6}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+检验结论对照测试
+
+以 fakeadb.TASK_TRACES 为基础生成一批日志(完整录制、逐条缺少某个标记、去掉参数、混入不以标记开头的日志行),
+比较原有检验的 'X' in log_content 判断与检验规格(checkspec)给出的结论, 二者必须一致, 同时比较耗时。
+只对照原有检验仅由字符串包含决定结论的指令; 结论还取决于日志参数与assets数据的指令(1/11/19/24/27/28/30)不在对照之列。
+
+用法: python -m AutoTest.benchmarks.bench_baseline [--repeat 20]
+"""
+import argparse
+import time
+
+from AutoTest.checkspec import evaluate_log, load_specs
+from AutoTest.fakeadb import TASK_TRACES
+
+# 原有检验(eval_N.py)的判断: 每组至少包含其一, 全部组都满足才通过
+BASELINE_CHECKS = {
+    2: [['VIP_STATUS_VIEWED'], ['VIP_DATA_LOADED']],
+    3: [['SEARCH_INPUT'], ['游戏解说'], ['SEARCH_BUTTON_CLICKED'], ['GAME_SEARCH_PAGE_LOADED']],
+    4: [['ANIMATION_CHANNEL_CLICKED'], ['ANIMATION_CHANNEL_PAGE_ENTERED'], ['ANIMATION_CHANNEL_DATA_LOADED']],
+    5: [['VIDEO_PLAYER_OPENED'], ['LIKE_BUTTON_CLICKED'], ['LIKE_STATUS_CHANGED'], ['liked']],
+    6: [['FAVORITE_TAB_CLICKED', 'FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED']],
+    7: [['VIDEO_PLAYER_OPENED', 'FAVORITE_BUTTON_CLICKED']],
+    8: [['VIDEO_PLAYER_OPENED', 'VIDEO_PLAYBACK_STARTED']],
+    9: [['PersonTab']],
+    10: [['FULLSCREEN_MODE_ENTERED', 'FULLSCREEN_BUTTON_CLICKED']],
+    12: [['OFFLINE_CACHE_PAGE_ENTERED', 'CACHE_LIST_LOADED']],
+    13: [['PAUSE_BUTTON_CLICKED', 'VIDEO_PAUSED']],
+    14: [['FIRST_DYNAMIC_CLICKED', 'DYNAMIC_DETAIL_OPENED']],
+    15: [['FOLLOW_PAGE_ENTERED', 'FollowPage', 'follow_page', '关注页']],
+    16: [['COMMENT_PAGE_ENTERED', 'REPLY_BUTTON_CLICKED'], ['COMMENT_INPUT_TEXT', '谢谢分享！'],
+         ['SEND_BUTTON_CLICKED', 'COMMENT_SENT_SUCCESS']],
+    17: [['VIDEO_PLAYER_OPENED', 'FOLLOW_BUTTON_CLICKED']],
+    18: [['FOLLOW_LIST_ENTERED', 'UPLOADER_FOUND', 'UPLOADER_PAGE_ENTERED', 'UPLOADER_DATA_LOADED']],
+    20: [['SEARCH_INPUT'], ['游戏解说'], ['SEARCH_BUTTON_CLICKED'], ['GAME_SEARCH_PAGE_LOADED']],
+    21: [['PAUSE_ACTION_TRIGGERED', 'VIDEO_PAUSED']],
+    22: [['SEARCH_COMPLETED', 'VIDEO_PLAYER_OPENED', 'LIKE_BUTTON_CLICKED']],
+    23: [['FAVORITE_PAGE_ENTERED'], ['FAVORITE_DATA_LOADED']],
+    25: [['VIDEO_PLAYER_OPENED'], ['DANMAKU_SWITCH_CLICKED'], ['DANMAKU_STATUS_CHANGED']],
+    26: [['VIP_PAGE_ENTERED']],
+    29: [['SETTINGS_PAGE_ENTERED', 'TIMER_SHUTDOWN_OPTION_FOUND', 'TIMER_SHUTDOWN_CLICKED',
+          'TIMER_SHUTDOWN_STATUS_LOADED']],
+}
+
+# 不以标记开头、但包含原有检验所查文字的日志行
+PLAIN_LINES = ['FollowPage onResume', '进入关注页', '评论内容: 谢谢分享！', 'liked', '搜索: 游戏解说']
+
+
+def baseline_verdict(log_content, task):
+    return all(any(text in log_content for text in group) for group in BASELINE_CHECKS[task])
+
+
+def variants():
+    """各指令的录制及其变体, 每个都是BilibiliAutoTest标签下的日志内容列表"""
+    for task, trace in TASK_TRACES.items():
+        yield f'eval_{task}', trace
+        for index in range(len(trace)):
+            yield f'eval_{task} 缺少第{index}条', trace[:index] + trace[index + 1:]
+        yield f'eval_{task} 无参数', [message.partition(':')[0] for message in trace]
+        for index in range(len(trace)):
+            marker = trace[index].partition(':')[0]
+            for plain in PLAIN_LINES:
+                yield f'eval_{task} 第{index}条改为"{plain}"', [
+                    *(message for message in trace if message.partition(':')[0] != marker), plain]
+
+
+def format_log(messages):
+    """logcat -d -s BilibiliAutoTest:D 的输出"""
+    return ''.join(f'10-18 12:00:{second % 60:02d}.000  4321  4321 D BilibiliAutoTest: {message}\n'
+                   for second, message in enumerate(messages))
+
+
+def compare(logs, specs):
+    """返回结论不一致的(录制, 指令, 原有结论, 规格结论)列表"""
+    mismatches = []
+    for name, log_content in logs:
+        verdicts = {verdict.spec.task: verdict.passed for verdict in evaluate_log(log_content, specs)}
+        for task in BASELINE_CHECKS:
+            old = baseline_verdict(log_content, task)
+            if old != verdicts[task]:
+                mismatches.append((name, task, old, verdicts[task]))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='检验结论对照测试')
+    parser.add_argument('--repeat', type=int, default=20, help='计时重复次数')
+    args = parser.parse_args(argv)
+
+    specs = load_specs()
+    logs = [(name, format_log(messages)) for name, messages in variants()]
+    mismatches = compare(logs, specs)
+    for name, task, old, new in mismatches:
+        print(f"不一致: {name} eval_{task} 原有检验={'通过' if old else '未通过'} 规格={'通过' if new else '未通过'}")
+    passed = sum(baseline_verdict(log_content, task) for _, log_content in logs for task in BASELINE_CHECKS)
+    print(f"{len(logs)}个日志 x {len(BASELINE_CHECKS)}个指令, 原有检验通过{passed}次, 结论不一致{len(mismatches)}次")
+    assert not mismatches
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, log_content in logs:
+            for task in BASELINE_CHECKS:
+                baseline_verdict(log_content, task)
+    old = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, log_content in logs:
+            evaluate_log(log_content, specs)
+    new = time.perf_counter() - start
+    print(f"原有检验: {old * 1000:.1f}ms, 检验规格(全部{len(specs)}个): {new * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
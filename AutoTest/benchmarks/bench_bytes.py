@@ -0,0 +1,130 @@
+"""
+原始字节日志解析基准测试
+
+在含中文参数的大段logcat输出上比较两种解析方式的耗时与峰值内存(tracemalloc, 不含输入数据本身):
+- 先解码: 整段 bytes.decode() 为str后再扫描/逐行解析(原有方式)
+- 原始字节: 直接在bytes上匹配, 只解码提取出的标签、标记和参数片段
+
+分别测量 logcat -d 整段检验(30个规格) 与 follow模式的逐块事件解析。
+
+用法: python -m AutoTest.benchmarks.bench_bytes [--size-mb 16]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from AutoTest.benchmarks.bench_scheduler import AGENT_TRACE
+from AutoTest.checkspec import evaluate_log, load_specs
+from AutoTest.logcat import parse_line, parse_lines
+
+CHUNK_SIZE = 65536
+PAYLOADS = ('谢谢分享！', '游戏解说', '逍遥散人', '罗翔说刑法', 'vid001', '1.2万', '')
+
+
+def generate_capture(size_bytes, seed=0):
+    """生成logcat -v threadtime输出, 检验所需的标记分散在大量中文参数的日志之间"""
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    second = 0
+    trace = iter(AGENT_TRACE)
+    while size < size_bytes:
+        second += 1
+        if second % 500 == 0:
+            message = next(trace, 'HOME_PAGE_ACTIVE')
+        else:
+            payload = rng.choice(PAYLOADS)
+            message = f'VIDEO_PLAYER_OPENED: {payload}' if payload else 'HOME_PAGE_ACTIVE'
+        line = (f'10-18 12:{second // 60 % 60:02d}:{second % 60:02d}.{second % 1000:03d}  4321  4321 D '
+                f'BilibiliAutoTest: {message}\n').encode('utf-8')
+        lines.append(line)
+        size += len(line)
+    for message in trace:
+        lines.append(f'10-18 13:00:00.000  4321  4321 D BilibiliAutoTest: {message}\n'.encode('utf-8'))
+    return b''.join(lines)
+
+
+def dump_decoded(data, specs):
+    return evaluate_log(data.decode('utf-8', errors='ignore'), specs)
+
+
+def dump_raw(data, specs):
+    return evaluate_log(data, specs)
+
+
+def follow_decoded(data):
+    """原有的follow解析: 每块按行拆分, 逐行解码后用str正则解析"""
+    events = []
+    pending = b''
+    for start in range(0, len(data), CHUNK_SIZE):
+        pending += data[start:start + CHUNK_SIZE]
+        *complete, pending = pending.split(b'\n')
+        lines = [raw.decode('utf-8', errors='ignore').rstrip('\r') for raw in complete]
+        events.extend(event for event in map(parse_line, lines) if event is not None)
+    return events
+
+
+def follow_raw(data):
+    """字节级follow解析: 每块的完整行一次性匹配"""
+    events = []
+    view = memoryview(data)
+    pending = b''
+    for start in range(0, len(data), CHUNK_SIZE):
+        pending += view[start:start + CHUNK_SIZE]
+        cut = pending.rfind(b'\n') + 1
+        events.extend(parse_lines(memoryview(pending)[:cut]))
+        pending = pending[cut:]
+    return events
+
+
+def measure(func, *args, repeat=3):
+    """返回(最短耗时, 峰值内存字节, 结果)"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='原始字节日志解析基准测试')
+    parser.add_argument('--size-mb', type=float, default=16, help='生成的日志大小(MB)')
+    args = parser.parse_args(argv)
+
+    data = generate_capture(int(args.size_mb * 1024 * 1024))
+    size_mb = len(data) / 1024 / 1024
+    specs = load_specs()
+    line_count = data.count(b'\n')
+    print(f"日志大小: {size_mb:.1f}MB, {line_count}行")
+    print(f"{'方式':<22}{'耗时(ms)':>10}{'MB/s':>8}{'峰值内存(MB)':>14}")
+
+    rows = [
+        ('logcat -d 先解码', dump_decoded, (data, specs)),
+        ('logcat -d 原始字节', dump_raw, (data, specs)),
+        ('follow 逐行解码', follow_decoded, (data,)),
+        ('follow 原始字节', follow_raw, (data,)),
+    ]
+    results = {}
+    for name, func, func_args in rows:
+        elapsed, peak, result = measure(func, *func_args)
+        results[name] = result
+        print(f"{name:<22}{elapsed * 1000:>10.1f}{size_mb / elapsed:>8.0f}{peak / 1024 / 1024:>14.1f}")
+
+    decoded, raw = results['logcat -d 先解码'], results['logcat -d 原始字节']
+    assert [v.passed for v in decoded] == [v.passed for v in raw] and all(v.passed for v in raw)
+    assert [(e.marker, e.payload) for e in results['follow 逐行解码']] == \
+           [(e.marker, e.payload) for e in results['follow 原始字节']]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+评论索引基准测试
+
+用assetgen生成评论数据(少数视频, 每个视频大量评论, 模拟热门视频的评论区), 测量:
+- 构建: 流式读取comments.json并展开评论树(oracle的comment_index表)
+- 增量: 随机交替 点赞/取消点赞、发表回复、查询点赞最高和最新的评论, CommentIndex的单次操作耗时
+- 重新计算: 同样的查询每次遍历该视频的全部一级评论取最大值(更新评论后重新计算期望值的做法)
+
+用法: python -m AutoTest.benchmarks.bench_comments [--videos 100] [--comments-per-video 10000] [--operations 100000]
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from AutoTest.assetgen import AssetGenerator
+from AutoTest.assets import AssetIndex
+from AutoTest.benchmarks.bench_load import _peak_rss_mb
+from AutoTest.oracle import Oracle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='评论索引基准测试')
+    parser.add_argument('--videos', type=int, default=100, help='视频数')
+    parser.add_argument('--comments-per-video', type=float, default=10000.0, help='每个视频的平均评论数(含回复)')
+    parser.add_argument('--operations', type=int, default=100000, help='增量操作数')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        counts = AssetGenerator(args.videos, comments_per_video=args.comments_per_video, danmaku_per_video=0,
+                                history=0, seed=args.seed).generate(directory)
+        oracle = Oracle(AssetIndex(directory, stream_above=0))
+        start = time.perf_counter()
+        oracle.build(['comment_index'])
+        built = time.perf_counter() - start
+        index = oracle.table('comment_index')
+
+    rng = random.Random(args.seed)
+    ids = list(index)
+    top_level = {}
+    for comment_id in ids:
+        comment = index.get(comment_id)
+        if comment.parent_id is None:
+            top_level.setdefault(comment.video_id, []).append(comment_id)
+    videos = sorted(top_level)
+
+    operations = []
+    for number in range(args.operations):
+        choice = rng.random()
+        if choice < 0.5:
+            operations.append(('like', rng.choice(ids), rng.choice((1, 1, -1))))
+        elif choice < 0.6:
+            parent = index.get(rng.choice(ids))
+            operations.append(('reply', parent, f'new{number}'))
+        else:
+            operations.append(('query', rng.choice(videos), None))
+
+    start = time.perf_counter()
+    for kind, target, argument in operations:
+        if kind == 'like':
+            index.like(target, argument)
+        elif kind == 'reply':
+            index.add({'commentId': argument, 'videoId': target.video_id,
+                       'parentCommentId': target.parent_id or target.comment_id, 'likeCount': 0,
+                       'publishTime': target.publish_time + 1})
+        else:
+            index.top_liked(target)
+            index.newest(target)
+    incremental = time.perf_counter() - start
+
+    queries = [target for kind, target, _ in operations if kind == 'query']
+    # 重新计算很慢, 只取前1000次查询
+    start = time.perf_counter()
+    for video_id in queries[:1000]:
+        comments = [index.get(comment_id) for comment_id in top_level[video_id]]
+        max(comments, key=lambda comment: comment.likes)
+        max(comments, key=lambda comment: comment.publish_time)
+    recomputed = time.perf_counter() - start
+
+    print(f"评论数: {len(index)} (一级评论 {counts['comments.json']})  视频数: {len(videos)}")
+    print(f"构建: {built:.2f}s ({len(index) / built:,.0f} 条/s)  峰值RSS: {_peak_rss_mb() or 0:.0f}MB")
+    print(f"增量: {incremental / len(operations) * 1e6:.2f}us/操作 ({len(operations)}次, 其中查询{len(queries)}次)")
+    print(f"重新计算: {recomputed / max(min(len(queries), 1000), 1) * 1e6:.1f}us/查询")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+数量显示格式基准测试
+
+随机生成一列数值(分布与assets中的播放量、粉丝数、观看人数相近: 个位数到数亿), 测量:
+- 逐个: 对每个数值调用 format_count / parse_count
+- 批量: format_counts / parse_counts 一次处理整列(安装了numpy时为数组运算, 否则逐个处理)
+并检查批量结果与逐个结果一致。
+
+用法: python -m AutoTest.benchmarks.bench_counts [--values 1000000] [--style count]
+"""
+import argparse
+import random
+import time
+
+from AutoTest import counts
+from AutoTest.counts import STYLES, format_count, format_counts, parse_count, parse_counts
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='数量显示格式基准测试')
+    parser.add_argument('--values', type=int, default=1000000, help='数值个数')
+    parser.add_argument('--style', default='count', choices=sorted(STYLES), help='显示格式')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    values = [rng.randrange(10 ** rng.randrange(0, 9), 10 ** rng.randrange(9, 10)) // 10 ** rng.randrange(0, 9)
+              for _ in range(args.values)]
+
+    texts, formatted = _timed(lambda: [format_count(value, args.style) for value in values])
+    parsed, parsed_time = _timed(lambda: [parse_count(text) for text in texts])
+    rows = [('逐个', formatted, parsed_time, True)]
+    installed = counts.numpy
+    for label, numpy in (('批量(numpy)', installed), ('批量(无numpy)', None)):
+        if label == '批量(numpy)' and installed is None:
+            continue
+        counts.numpy = numpy
+        try:
+            batch_texts, batch_formatted = _timed(format_counts, values, args.style)
+            batch_parsed, batch_parsed_time = _timed(parse_counts, texts)
+        finally:
+            counts.numpy = installed
+        rows.append((label, batch_formatted, batch_parsed_time, batch_texts == texts and batch_parsed == parsed))
+
+    print(f"数值数: {len(values)}  格式: {args.style}  numpy: {'已安装' if installed is not None else '未安装'}")
+    for label, format_time, parse_time, same in rows:
+        print(f"{label}: 格式化 {format_time / len(values) * 1e9:.0f}ns/个  解析 {parse_time / len(values) * 1e9:.0f}ns/个"
+              f"  结果一致: {same}")
+
+
+if __name__ == '__main__':
+    main()
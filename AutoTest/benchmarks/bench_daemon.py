@@ -0,0 +1,93 @@
+"""
+常驻检验服务基准测试
+
+模拟adb server(ScriptedDevice, 每次检验开始后写出全部指令的日志标记)在独立进程中运行,
+比较智能体框架逐个调用检验的两种方式的单次延迟:
+- 脚本: 每次检验启动一个 python eval_N.py 进程(AUTOTEST_MODE=follow), 包括解释器启动、导入和查找adb
+- 服务: 常驻检验服务(python -m AutoTest serve --socket), DaemonClient.check() 在一个keep-alive连接上开始检验并等待结论
+
+用法: python -m AutoTest.benchmarks.bench_daemon [--calls 60] [--tasks 1-30] [--rate 200]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from AutoTest.benchmarks.bench_async import _free_port
+from AutoTest.daemon import DaemonClient
+from AutoTest.scheduler import parse_tasks
+from AutoTest.spans import percentile
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERIAL = 'emulator-5554'
+
+
+def run_scripts(tasks, calls, env):
+    latencies = []
+    failed = 0
+    for index in range(calls):
+        task = tasks[index % len(tasks)]
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, os.path.join(PACKAGE_DIR, f'eval_{task}.py')],
+                                   env=env, capture_output=True, text=True)
+        latencies.append(time.perf_counter() - start)
+        # eval_1.py输出"最终检验结果", 其余脚本最后输出True/False
+        lines = completed.stdout.strip().splitlines()
+        failed += not (lines[-1:] == ['True'] or any('最终检验结果: ✓' in line for line in lines))
+    return latencies, failed
+
+
+def run_daemon(tasks, calls, env, directory):
+    socket_path = os.path.join(directory, 'autotest.sock')
+    server = subprocess.Popen([sys.executable, '-m', 'AutoTest', 'serve', '--socket', socket_path],
+                              env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        server.stdout.readline()
+        client = DaemonClient(f'unix:{socket_path}')
+        latencies = []
+        failed = 0
+        for index in range(calls):
+            start = time.perf_counter()
+            record = client.check(tasks[index % len(tasks)], SERIAL)
+            latencies.append(time.perf_counter() - start)
+            failed += not record['passed']
+        client.close()
+        return latencies, failed
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='常驻检验服务基准测试')
+    parser.add_argument('--calls', type=int, default=60, help='每种方式的检验次数')
+    parser.add_argument('--tasks', default='1-30', help='依次检验的指令')
+    parser.add_argument('--rate', type=float, default=200, help='模拟设备每秒写出的日志标记数')
+    args = parser.parse_args(argv)
+    tasks = parse_tasks(args.tasks)
+
+    port = _free_port()
+    fake = subprocess.Popen([sys.executable, '-m', 'AutoTest.fakeadb', '-P', str(port), '--devices', '1',
+                             '--tasks', args.tasks, '--per-session', 'all', '--rate', str(args.rate), 'serve'],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    env = dict(os.environ, ANDROID_ADB_SERVER_PORT=str(port), ANDROID_SERIAL=SERIAL, AUTOTEST_MODE='follow')
+    try:
+        fake.stdout.readline()
+        with tempfile.TemporaryDirectory() as directory:
+            rows = (('脚本', run_scripts(tasks, args.calls, env)),
+                    ('服务', run_daemon(tasks, args.calls, env, directory)))
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    print(f"{'方式':<8}{'检验数':>8}{'平均(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'失败':>6}")
+    for name, (latencies, failed) in rows:
+        ordered = sorted(latencies)
+        print(f"{name:<8}{len(latencies):>8}{sum(latencies) / len(latencies) * 1000:>10.1f}"
+              f"{percentile(ordered, 0.5) * 1000:>10.1f}{percentile(ordered, 0.95) * 1000:>10.1f}{failed:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+弹幕时间轴索引基准测试
+
+用assetgen生成大量弹幕(视频数 x 每个视频的平均弹幕数), 测量:
+- 构建: 流式读取danmaku.json并建立全部视频的时间轴(oracle的danmaku_timeline表)
+- 可见查询: 每个视频在随机时间点上的 visible_counts (一次调用批量查询) 和 visible (逐个查询)
+- 密度: 全部视频的每秒弹幕数和弹幕最密集的时间段(hotspots)
+
+用法: python -m AutoTest.benchmarks.bench_danmaku [--videos 10000] [--danmaku-per-video 200] [--queries 1000]
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from AutoTest import danmaku
+from AutoTest.assetgen import AssetGenerator
+from AutoTest.assets import AssetIndex
+from AutoTest.benchmarks.bench_load import _peak_rss_mb
+from AutoTest.oracle import Oracle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='弹幕时间轴索引基准测试')
+    parser.add_argument('--videos', type=int, default=10000, help='视频数')
+    parser.add_argument('--danmaku-per-video', type=float, default=200.0, help='每个视频的平均弹幕数')
+    parser.add_argument('--queries', type=int, default=1000, help='每个视频查询的时间点数')
+    parser.add_argument('--sample', type=int, default=200, help='参与查询的视频数')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        counts = AssetGenerator(args.videos, comments_per_video=0, danmaku_per_video=args.danmaku_per_video,
+                                history=0, seed=args.seed).generate(directory)
+        oracle = Oracle(AssetIndex(directory, stream_above=0))
+        start = time.perf_counter()
+        oracle.build(['danmaku_timeline'])
+        built = time.perf_counter() - start
+        timelines = oracle.table('danmaku_timeline')
+
+    rng = random.Random(args.seed)
+    sample = rng.sample(sorted(timelines), min(args.sample, len(timelines)))
+    times = [rng.uniform(0, 1800) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for video_id in sample:
+        timelines[video_id].visible_counts(times)
+    batched = time.perf_counter() - start
+    start = time.perf_counter()
+    for video_id in sample:
+        timeline = timelines[video_id]
+        for t in times:
+            timeline.visible(t)
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    top = danmaku.hotspots(timelines, limit=10)
+    density = time.perf_counter() - start
+
+    queries = len(sample) * len(times)
+    print(f"numpy: {'是' if danmaku.numpy is not None else '否(array + bisect)'}")
+    print(f"弹幕数: {counts['danmaku.json']}  视频数: {len(timelines)}")
+    print(f"构建: {built:.2f}s ({counts['danmaku.json'] / built:,.0f} 条/s)  峰值RSS: {_peak_rss_mb() or 0:.0f}MB")
+    print(f"visible_counts: {batched / queries * 1e6:.2f}us/时间点  visible: {single / queries * 1e6:.2f}us/时间点"
+          f"  ({queries}次)")
+    print(f"密度+hotspots: {density:.2f}s  最密集: {top[0] if top else None}")
+
+
+if __name__ == '__main__':
+    main()
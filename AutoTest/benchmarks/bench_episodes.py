@@ -0,0 +1,102 @@
+"""
+episode分段检验基准测试
+
+生成一份包含多个episode的长日志(每个episode以AUTOTEST_SESSION起点标记开始, 随机完成一部分操作), 比较:
+- 逐指令: 每个episode的日志分别交给30个单规格引擎, 相当于每个eval_N.py各扫描一次日志(切出各episode日志的耗时不计入)
+- 分段: episodes.split_capture 一遍扫描同时完成切分和全部30个规格的检验
+
+两种方式的结论必须一致。
+
+用法: python -m AutoTest.benchmarks.bench_episodes [--episodes 200] [--noise 200]
+"""
+import argparse
+import random
+import time
+
+from AutoTest.benchmarks.bench_replay import NOISE_TAGS
+from AutoTest.benchmarks.bench_scheduler import AGENT_TRACE
+from AutoTest.checkspec import CheckEngine, load_specs
+from AutoTest.episodes import split_capture
+from AutoTest.logcat import after_line
+from AutoTest.markers import LOG_TAG, SESSION_MARKER
+
+
+def generate_capture(episodes, noise, seed=0):
+    """生成长日志, 返回(日志字节, 各episode的起点标识)"""
+    rng = random.Random(seed)
+    lines = []
+    sessions = []
+    timestamp = 1729612800.0
+    for index in range(episodes):
+        session = f'{index:08x}'
+        sessions.append(session)
+        lines.append(f'{timestamp:16.3f}  4321  4321 I {LOG_TAG}: {SESSION_MARKER}: {session}')
+        # 每个episode只完成一段连续的操作
+        start = rng.randrange(len(AGENT_TRACE))
+        trace = AGENT_TRACE[start:start + rng.randrange(10, len(AGENT_TRACE))]
+        for message in trace:
+            for _ in range(noise // len(AGENT_TRACE)):
+                timestamp += 0.001
+                lines.append(f'{timestamp:16.3f}  1000  1000 I {rng.choice(NOISE_TAGS)}: noise {rng.random():.6f}')
+            timestamp += 0.01
+            lines.append(f'{timestamp:16.3f}  4321  4321 D {LOG_TAG}: {message}')
+    return ('\n'.join(lines) + '\n').encode('utf-8'), sessions
+
+
+def split_segments(data, sessions):
+    """按起点标记切出各episode的日志(逐指令方式中由各次logcat -d读取, 不计入耗时)"""
+    segments = []
+    for index, session in enumerate(sessions):
+        start = data.find(f'{SESSION_MARKER}: {session}'.encode('ascii'))
+        end = len(data)
+        if index + 1 < len(sessions):
+            end = data.rfind(b'\n', 0, data.find(f'{SESSION_MARKER}: {sessions[index + 1]}'.encode('ascii'), start)) + 1
+        segments.append(after_line(data[start:end], session.encode('ascii')))
+    return segments
+
+
+def per_task(segments, specs):
+    """逐指令: 每个episode的日志分别按每个规格扫描一次"""
+    results = []
+    for segment in segments:
+        verdicts = []
+        for spec in specs:
+            engine = CheckEngine([spec])
+            engine.feed_text(segment)
+            verdicts.extend(engine.verdicts())
+        results.append([verdict.passed for verdict in verdicts])
+    return results
+
+
+def segmented(data, specs):
+    return [[verdict.passed for verdict in episode.verdicts] for episode in split_capture(data, specs)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='episode分段检验基准测试')
+    parser.add_argument('--episodes', type=int, default=200, help='episode数量')
+    parser.add_argument('--noise', type=int, default=200, help='每个episode中其他标签的噪声日志行数')
+    args = parser.parse_args(argv)
+
+    specs = load_specs()
+    data, sessions = generate_capture(args.episodes, args.noise)
+    print(f"日志: {len(data) / 1024 / 1024:.1f}MB, {args.episodes}个episode, {len(specs)}个规格")
+
+    timings = {}
+    outcomes = {}
+    segments = split_segments(data, sessions)
+    for name, func, func_args in (('逐指令', per_task, (segments, specs)),
+                                  ('分段', segmented, (data, specs))):
+        start = time.perf_counter()
+        outcomes[name] = func(*func_args)
+        timings[name] = time.perf_counter() - start
+        scans = len(sessions) * len(specs) if name == '逐指令' else 1
+        print(f"{name:<6}{timings[name] * 1000:>10.1f}ms  {len(sessions) / timings[name]:>8.0f}个episode/秒  扫描{scans}次")
+
+    assert outcomes['逐指令'] == outcomes['分段'], '两种方式的结论不一致'
+    passed = sum(map(sum, outcomes['分段']))
+    print(f"结论一致: 共{len(sessions) * len(specs)}个检验, 通过{passed}; 加速{timings['逐指令'] / timings['分段']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+大规模设备基准测试
+
+在本地模拟adb server上启动数百台ScriptedDevice, 每台设备依次执行全部指令, 每次检验开始后
+按--rate的速率写出该指令的日志标记(与BilibiliAutoTestLogger.kt一致), 每个adb请求注入--latency/--jitter的延迟。
+报告不同设备数量下的吞吐量和单次检验耗时的分位数。
+
+用法: python -m AutoTest.benchmarks.bench_fleet [--devices 50,100,200] [--tasks 1-30] [--rate 20] [--latency 0.005] [--jitter 0.005]
+"""
+import argparse
+import time
+
+from AutoTest.adb import AdbWireClient
+from AutoTest.fakeadb import FakeAdbServer, ScriptedDevice
+from AutoTest.runtime import WATERMARKS, Runtime
+from AutoTest.scheduler import Scheduler, parse_tasks
+from AutoTest.spans import percentile
+
+
+def measure(device_count, tasks, args):
+    devices = [ScriptedDevice(f'emulator-{5554 + 2 * index}', tasks=tasks, per_session='cycle', rate=args.rate,
+                              start_delay=args.delay, interval_jitter=0.2, noise_rate=args.noise_rate,
+                              latency=args.latency, jitter=args.jitter, seed=index)
+               for index in range(device_count)]
+    with FakeAdbServer(devices=devices) as server:
+        client = AdbWireClient(server.host, server.port, pool_size=1, timeout=30)
+        runtime = Runtime(client, mode='follow', timeout=30, watermark=args.watermark)
+        scheduler = Scheduler(runtime=runtime)
+        start = time.perf_counter()
+        results = scheduler.run_matrix(tasks)
+        elapsed = time.perf_counter() - start
+        runtime.close()
+    failed = [result for result in results if not result.passed]
+    return results, elapsed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='大规模设备基准测试')
+    parser.add_argument('--devices', default='50,100,200', help='逗号分隔的设备数量')
+    parser.add_argument('--tasks', default='1-30', help='每台设备依次执行的指令')
+    parser.add_argument('--rate', type=float, default=20, help='每台设备每秒写出的日志标记数')
+    parser.add_argument('--delay', type=float, default=0.05, help='检验开始到第一条标记的时间(秒)')
+    parser.add_argument('--noise-rate', type=float, default=0, help='每台设备每秒写出的噪声日志数')
+    parser.add_argument('--latency', type=float, default=0.005, help='每个adb请求的固定延迟(秒)')
+    parser.add_argument('--jitter', type=float, default=0.005, help='每个adb请求的随机延迟上限(秒)')
+    parser.add_argument('--watermark', choices=WATERMARKS, default='sentinel', help='检验起点的记录方式')
+    args = parser.parse_args(argv)
+
+    tasks = parse_tasks(args.tasks)
+    print(f"{'设备数':<8}{'检验数':>8}{'耗时(s)':>10}{'检验/秒':>10}{'p50(s)':>10}{'p95(s)':>10}{'失败':>6}")
+    for device_count in (int(count) for count in args.devices.split(',')):
+        results, elapsed, failed = measure(device_count, tasks, args)
+        durations = sorted(result.elapsed for result in results)
+        print(f"{device_count:<8}{len(results):>8}{elapsed:>10.2f}{len(results) / elapsed:>10.1f}"
+              f"{percentile(durations, 0.5):>10.3f}{percentile(durations, 0.95):>10.3f}{len(failed):>6}")
+        for result in failed[:3]:
+            print(f"  失败: 指令{result.task} {result.serial} {result.error or ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+观看历史按天分组索引基准测试
+
+用assetgen生成大量观看历史, 测量:
+- 构建: 流式读取watch_history.json并按设备时区的日期分组(oracle的history_days表)
+- 换算: HistoryDays按15分钟缓存时区偏移换算日期, 与逐条 datetime.fromtimestamp(时区) 比较
+- 查询: get(记录ID) 判断观看日期相对今天的天数(HISTORY_ITEM_DELETED的检验)
+
+用法: python -m AutoTest.benchmarks.bench_history [--history 1000000] [--timezone Asia/Shanghai]
+"""
+import argparse
+import datetime
+import random
+import tempfile
+import time
+
+from AutoTest.assetgen import AssetGenerator
+from AutoTest.assets import AssetIndex, iter_records
+from AutoTest.benchmarks.bench_load import _peak_rss_mb
+from AutoTest.history import HistoryDays, device_timezone
+from AutoTest.oracle import Oracle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='观看历史按天分组索引基准测试')
+    parser.add_argument('--history', type=int, default=1000000, help='观看历史条数')
+    parser.add_argument('--timezone', default='Asia/Shanghai', help='设备时区')
+    parser.add_argument('--lookups', type=int, default=1000000, help='查询次数')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    args = parser.parse_args(argv)
+    timezone = device_timezone(args.timezone)
+
+    with tempfile.TemporaryDirectory() as directory:
+        AssetGenerator(1000, comments_per_video=0, danmaku_per_video=0, history=args.history,
+                       seed=args.seed).generate(directory)
+        oracle = Oracle(AssetIndex(directory, stream_above=0))
+        start = time.perf_counter()
+        oracle.build(['history_days'])
+        built = time.perf_counter() - start
+        days = oracle.table('history_days')
+        watch_times = [record['watchTime'] for record in
+                       iter_records(f'{directory}/watch_history.json', fields=('watchTime',))]
+
+    # assetgen的观看间隔为1分钟到6小时, 百万条记录跨越数百年; 另外换算同样条数、集中在最近90天的观看时间
+    recent = [watch_times[0] - position * 90 * 86400000 // len(watch_times) for position in range(len(watch_times))]
+    conversions = []
+    for label, moments in (('生成数据', watch_times), ('最近90天', recent)):
+        index = HistoryDays(timezone)
+        start = time.perf_counter()
+        cached = [index.ordinal(moment) for moment in moments]
+        converted = time.perf_counter() - start
+        start = time.perf_counter()
+        direct = [datetime.datetime.fromtimestamp(moment / 1000, timezone).toordinal() for moment in moments]
+        naive = time.perf_counter() - start
+        mismatched = sum(1 for left, right in zip(cached, direct) if left != right)
+        conversions.append((label, converted, naive, mismatched))
+
+    rng = random.Random(args.seed)
+    ids = [f'hist{rng.randrange(1, args.history + 1):03d}' for _ in range(args.lookups)]
+    start = time.perf_counter()
+    for history_id in ids:
+        days.get(history_id)
+    looked_up = time.perf_counter() - start
+
+    counts = days.counts()
+    print(f"记录数: {len(days)}  日期数: {len(counts)}  时区: {args.timezone}")
+    print(f"构建: {built:.2f}s ({len(days) / built:,.0f} 条/s)  峰值RSS: {_peak_rss_mb() or 0:.0f}MB")
+    for label, converted, naive, mismatched in conversions:
+        print(f"换算日期({label}): 缓存偏移 {converted / len(watch_times) * 1e9:.0f}ns/条"
+              f"  逐条换算 {naive / len(watch_times) * 1e9:.0f}ns/条  不一致 {mismatched}")
+    print(f"get: {looked_up / len(ids) * 1e9:.0f}ns/次 ({len(ids)}次)")
+
+
+if __name__ == '__main__':
+    main()
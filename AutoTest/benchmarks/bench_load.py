@@ -0,0 +1,206 @@
+"""
+大日志负载基准测试
+
+用loadgen生成数百万行的合成logcat录制, 对30个检验规格分别测量:
+- 扫描: logcat -d 方式, 整段录制交给单规格引擎(CheckEngine.feed_text), 报告行/秒
+- 跟随: follow方式, 录制按64KB分块经LogcatFollower解析, 报告得到结论(全部标记出现)的耗时和所在行
+- 峰值RSS: 每个(规格, 方式)在独立的子进程中执行, 报告子进程的ru_maxrss(含录制数据本身)
+另有all一行: 全部30个规格在同一个引擎中检验。
+
+每次运行的结果(含仓库版本、Python版本和录制参数)追加到 results/bench_load.jsonl,
+并与其中录制参数相同的上一次结果比较, 行/秒下降或耗时、RSS增加超过--tolerance的项视为回归(退出码1)。
+
+用法: python -m AutoTest.benchmarks.bench_load [--lines 2000000] [--tasks 1-30] [--tolerance 0.2] [--no-store]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from AutoTest.checkspec import CheckEngine, load_spec, load_specs
+from AutoTest.loadgen import write_capture
+from AutoTest.logcat import LogcatFollower
+from AutoTest.scheduler import parse_tasks
+
+CHUNK_SIZE = 65536
+RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'bench_load.jsonl')
+# 各指标变大是否为变差
+METRICS = {'lines_per_sec': False, 'seconds': True, 'time_to_verdict': True, 'peak_rss_mb': True}
+
+
+class _FileStream:
+    """按块读取录制文件, 代替adb的logcat输出流"""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb', buffering=0)
+
+    def read(self, size=CHUNK_SIZE):
+        return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux为KB, macOS为字节
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _specs(task):
+    return load_specs() if task == 'all' else [load_spec(f'eval_{task}')]
+
+
+def run_scan(path, task, lines):
+    with open(path, 'rb') as f:
+        data = f.read()
+    engine = CheckEngine(_specs(task))
+    start = time.perf_counter()
+    engine.feed_text(data)
+    verdicts = engine.verdicts()
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'lines_per_sec': lines / elapsed,
+            'passed': all(verdict.passed for verdict in verdicts)}
+
+
+def run_follow(path, task, lines):
+    engine = CheckEngine(_specs(task))
+    consumed = 0
+
+    def consume(events):
+        nonlocal consumed
+        consumed += len(events)
+        return engine.feed_events(events)
+
+    start = time.perf_counter()
+    follower = LogcatFollower(_FileStream(path))
+    try:
+        done = follower.follow(consume)
+    finally:
+        follower.close()
+    elapsed = time.perf_counter() - start
+    return {'time_to_verdict': elapsed if done else None, 'seconds': elapsed,
+            'events_to_verdict': consumed if done else None,
+            'passed': all(verdict.passed for verdict in engine.verdicts())}
+
+
+def worker(argv):
+    """子进程: 执行一个(规格, 方式)并以JSON输出结果"""
+    mode, path, task, lines = argv
+    task = task if task == 'all' else int(task)
+    result = (run_scan if mode == 'scan' else run_follow)(path, task, int(lines))
+    result['peak_rss_mb'] = _peak_rss_mb()
+    print(json.dumps(result))
+
+
+def measure(mode, path, task, lines):
+    output = subprocess.run([sys.executable, '-m', 'AutoTest.benchmarks.bench_load', '--worker',
+                             mode, path, str(task), str(lines)],
+                            capture_output=True, check=True, text=True).stdout
+    return json.loads(output)
+
+
+def harness_version():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=root,
+                              capture_output=True, check=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(previous, current, tolerance):
+    """返回变差超过tolerance的项[(规格, 方式, 指标, 原值, 现值)]"""
+    worse = []
+    for task, modes in current['results'].items():
+        for mode, values in modes.items():
+            before = previous['results'].get(task, {}).get(mode, {})
+            for metric, higher_is_worse in METRICS.items():
+                old, new = before.get(metric), values.get(metric)
+                if not old or new is None:
+                    continue
+                change = new / old - 1 if higher_is_worse else old / new - 1
+                if change > tolerance:
+                    worse.append((task, mode, metric, old, new))
+    return worse
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--worker']:
+        return worker(argv[1:])
+
+    parser = argparse.ArgumentParser(description='大日志负载基准测试')
+    parser.add_argument('--lines', type=int, default=2000000, help='录制的日志行数')
+    parser.add_argument('--seed', type=int, default=0, help='生成录制的随机数种子')
+    parser.add_argument('--tasks', default='1-30', help='测量哪些指令的规格')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='视为回归的变差比例')
+    parser.add_argument('--results', default=RESULTS, help='结果历史文件(JSON lines)')
+    parser.add_argument('--no-store', action='store_true', help='不保存本次结果')
+    args = parser.parse_args(argv)
+
+    tasks = [*parse_tasks(args.tasks), 'all']
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'capture.log')
+        start = time.perf_counter()
+        size = write_capture(path, args.lines, seed=args.seed)
+        print(f"录制: {args.lines}行, {size / 1024 / 1024:.1f}MB, 生成耗时{time.perf_counter() - start:.1f}s")
+
+        print(f"{'规格':<8}{'扫描(行/秒)':>14}{'RSS(MB)':>10}{'结论耗时(s)':>14}{'结论所在行':>12}{'RSS(MB)':>10}{'通过':>6}")
+        results = {}
+        for task in tasks:
+            scan = measure('scan', path, task, args.lines)
+            follow = measure('follow', path, task, args.lines)
+            results[str(task)] = {'scan': scan, 'follow': follow}
+            verdict_time = follow['time_to_verdict']
+            print(f"{task!s:<8}{scan['lines_per_sec']:>14,.0f}{scan['peak_rss_mb'] or 0:>10.1f}"
+                  f"{verdict_time if verdict_time is not None else float('nan'):>14.3f}"
+                  f"{follow['events_to_verdict'] or 0:>12}{follow['peak_rss_mb'] or 0:>10.1f}"
+                  f"{'是' if scan['passed'] else '否':>6}")
+
+    record = {
+        'version': harness_version(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'lines': args.lines, 'bytes': size, 'seed': args.seed,
+        'results': results,
+    }
+    history = [item for item in load_history(args.results)
+               if (item['lines'], item['seed']) == (args.lines, args.seed)]
+    worse = []
+    if history:
+        previous = history[-1]
+        worse = compare(previous, record, args.tolerance)
+        print(f"与{previous['version']}({previous['date']})比较:")
+        for task, mode, metric, old, new in worse:
+            print(f"  {task} {mode} {metric}: {old:.4g} -> {new:.4g}")
+        if not worse:
+            print(f"  没有指标变差超过{args.tolerance:.0%}")
+    if not args.no_store:
+        os.makedirs(os.path.dirname(args.results), exist_ok=True)
+        with open(args.results, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return 1 if worse else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
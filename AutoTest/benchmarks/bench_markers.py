@@ -0,0 +1,125 @@
+"""
+日志标记匹配基准测试
+
+在数MB的logcat输出上比较:
+- 逐标记扫描: 原有检验的 'MARKER' in log_content 方式, 以及eval_1按行拆分提取参数的方式
+- 单遍匹配: markers.scan_markers 一次扫描提取全部标记和参数
+- 检验引擎: checkspec.CheckEngine 在同一次扫描中给出全部30个规格的结论
+
+用法: python -m AutoTest.benchmarks.bench_markers [--size-mb 4]
+"""
+import argparse
+import random
+import time
+
+from AutoTest.checkspec import evaluate_log, load_specs
+from AutoTest.markers import LOGGER_MARKERS, scan_markers
+
+# 各检验原有的逐标记扫描(每个检验中 'X' in log_content 的字符串)
+CHECK_MARKERS = {
+    'eval_1': ['HISTORY_TAB_VIEWED', 'HISTORY_DATA_LOADED'],
+    'eval_2': ['VIP_STATUS_VIEWED', 'VIP_DATA_LOADED'],
+    'eval_3': ['SEARCH_INPUT', 'SEARCH_BUTTON_CLICKED', 'GAME_SEARCH_PAGE_LOADED'],
+    'eval_4': ['ANIMATION_CHANNEL_CLICKED', 'ANIMATION_CHANNEL_PAGE_ENTERED', 'ANIMATION_CHANNEL_DATA_LOADED'],
+    'eval_5': ['VIDEO_PLAYER_OPENED', 'LIKE_BUTTON_CLICKED', 'LIKE_STATUS_CHANGED'],
+    'eval_6': ['FAVORITE_TAB_CLICKED', 'FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED'],
+    'eval_7': ['VIDEO_PLAYER_OPENED', 'FAVORITE_BUTTON_CLICKED'],
+    'eval_8': ['VIDEO_PLAYER_OPENED', 'VIDEO_PLAYBACK_STARTED'],
+    'eval_9': ['PersonTab'],
+    'eval_10': ['FULLSCREEN_MODE_ENTERED', 'FULLSCREEN_BUTTON_CLICKED'],
+    'eval_11': ['UPLOADER_PAGE_ENTERED', 'FANS_COUNT_DISPLAYED'],
+    'eval_12': ['OFFLINE_CACHE_PAGE_ENTERED', 'CACHE_LIST_LOADED'],
+    'eval_13': ['PAUSE_BUTTON_CLICKED', 'VIDEO_PAUSED'],
+    'eval_14': ['FIRST_DYNAMIC_CLICKED', 'DYNAMIC_DETAIL_OPENED'],
+    'eval_15': ['FOLLOW_PAGE_ENTERED'],
+    'eval_16': ['COMMENT_PAGE_ENTERED', 'REPLY_BUTTON_CLICKED', 'COMMENT_INPUT_TEXT', 'SEND_BUTTON_CLICKED',
+                'COMMENT_SENT_SUCCESS'],
+    'eval_17': ['VIDEO_PLAYER_OPENED', 'FOLLOW_BUTTON_CLICKED'],
+    'eval_18': ['FOLLOW_LIST_ENTERED', 'UPLOADER_FOUND', 'UPLOADER_PAGE_ENTERED', 'UPLOADER_DATA_LOADED'],
+    'eval_19': ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED', 'COMMENT_PAGE_ENTERED', 'COMMENT_LIST_LOADED',
+                'COMMENT_LIKE_CLICKED', 'COMMENT_LIKE_STATUS_CHANGED'],
+    'eval_20': ['SEARCH_INPUT', 'SEARCH_BUTTON_CLICKED', 'GAME_SEARCH_PAGE_LOADED'],
+    'eval_21': ['VIDEO_PLAYER_OPENED', 'PAUSE_ACTION_TRIGGERED', 'VIDEO_PAUSED'],
+    'eval_22': ['SEARCH_COMPLETED', 'FIRST_SEARCH_RESULT_CLICKED', 'VIDEO_PLAYER_OPENED', 'LIKE_BUTTON_CLICKED'],
+    'eval_23': ['FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED'],
+    'eval_24': ['FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED', 'FAVORITE_COUNT_DISPLAYED'],
+    'eval_25': ['VIDEO_PLAYER_OPENED', 'DANMAKU_SWITCH_CLICKED', 'DANMAKU_STATUS_CHANGED'],
+    'eval_26': ['VIP_PAGE_ENTERED'],
+    'eval_27': ['HISTORY_PAGE_ENTERED', 'HISTORY_DATA_LOADED', 'HISTORY_ITEM_LONG_PRESSED', 'DELETE_BUTTON_CLICKED',
+                'HISTORY_ITEM_DELETED'],
+    'eval_28': ['HOME_PAGE_ACTIVE', 'FIRST_VIDEO_CLICKED', 'COMMENT_PAGE_ENTERED', 'COMMENT_LIST_LOADED',
+                'SORT_BY_LIKES_SELECTED', 'TOP_LIKED_COMMENT_FOUND'],
+    'eval_29': ['SETTINGS_PAGE_ENTERED', 'TIMER_SHUTDOWN_OPTION_FOUND', 'TIMER_SHUTDOWN_CLICKED',
+                'TIMER_SHUTDOWN_STATUS_LOADED'],
+    'eval_30': ['LIVE_TAB_ENTERED', 'LIVE_RECOMMEND_LOADED', 'FIRST_LIVE_FOUND', 'LIVE_VIEWER_COUNT_DISPLAYED'],
+}
+
+
+def generate_log(size_bytes, seed=0):
+    """生成指定大小的logcat -d输出, 检验相关的标记集中在末尾(最坏情况)"""
+    rng = random.Random(seed)
+    noise = [marker for marker in LOGGER_MARKERS if not marker.startswith(('COMMENT', 'TOP_', 'SORT_', 'HISTORY'))]
+    lines = []
+    size = 0
+    second = 0
+    while size < size_bytes:
+        second += 1
+        marker = rng.choice(noise)
+        payload = rng.choice(['', ': vid001', ': 游戏解说', ': 1.2万', ': on'])
+        line = f'10-18 12:{second // 60 % 60:02d}:{second % 60:02d}.000  4321  4321 D BilibiliAutoTest: {marker}{payload}\n'
+        lines.append(line)
+        size += len(line.encode('utf-8'))
+    for marker in ('HOME_PAGE_ACTIVE', 'FIRST_VIDEO_CLICKED', 'COMMENT_PAGE_ENTERED', 'COMMENT_LIST_LOADED',
+                   'SORT_BY_LIKES_SELECTED', 'TOP_LIKED_COMMENT_FOUND: likes=1024', 'HISTORY_DATA_LOADED: 20'):
+        lines.append(f'10-18 13:00:00.000  4321  4321 D BilibiliAutoTest: {marker}\n')
+    return ''.join(lines)
+
+
+def per_marker_scan(log_content, markers):
+    found = [marker in log_content for marker in markers]
+    # eval_1: 按行拆分提取HISTORY_DATA_LOADED的参数
+    count = 0
+    for line in log_content.split('\n'):
+        if 'HISTORY_DATA_LOADED' in line:
+            count = int(line.split(':')[-1].strip())
+    return found, count
+
+
+def single_pass_scan(log_content, markers):
+    hits = scan_markers(log_content)
+    return [marker in hits for marker in markers], int(hits.last('HISTORY_DATA_LOADED'))
+
+
+def best_of(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='日志标记匹配基准测试')
+    parser.add_argument('--size-mb', type=float, default=4, help='生成的日志大小(MB)')
+    args = parser.parse_args(argv)
+
+    log_content = generate_log(int(args.size_mb * 1024 * 1024))
+    size_mb = len(log_content.encode('utf-8')) / 1024 / 1024
+    print(f"日志大小: {size_mb:.1f}MB, {log_content.count(chr(10))}行")
+    print(f"{'检验':<14}{'标记数':>6}{'逐标记(ms)':>12}{'单遍(ms)':>12}{'加速比':>8}")
+    rows = [(name, CHECK_MARKERS[name]) for name in ('eval_9', 'eval_19', 'eval_28')]
+    # 同一份日志上依次完成全部30个检验: 逐标记方式每个检验各扫描一遍, 单遍方式共用一次扫描
+    rows.append(('30个检验合计', [marker for markers in CHECK_MARKERS.values() for marker in markers]))
+    for name, markers in rows:
+        assert per_marker_scan(log_content, markers) == single_pass_scan(log_content, markers)
+        old = best_of(per_marker_scan, log_content, markers)
+        new = best_of(single_pass_scan, log_content, markers)
+        print(f"{name:<14}{len(markers):>6}{old * 1000:>12.1f}{new * 1000:>12.1f}{old / new:>7.1f}x")
+
+    specs = load_specs()
+    engine = best_of(evaluate_log, log_content, specs)
+    print(f"{'30个规格(引擎)':<14}{len(specs):>6}{old * 1000:>12.1f}{engine * 1000:>12.1f}{old / engine:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+类型化模型与二进制快照基准测试
+
+用assetgen生成数据, 在新的子进程中(冷启动, 没有进程内缓存)分别测量读取全部数据文件:
+- json: json.load得到dict列表
+- 解析: ModelStore没有快照, 流式解析JSON并转换为模型, 写出快照
+- 快照: ModelStore读取快照(计算文件哈希 + 读取pickle)
+以及各子进程的峰值RSS。
+
+用法: python -m AutoTest.benchmarks.bench_models [--videos 100000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from AutoTest.assetgen import AssetGenerator
+
+_PROBE = """
+import json, os, sys, time
+from AutoTest.benchmarks.bench_load import _peak_rss_mb
+from AutoTest.models import MODELS, ModelStore
+directory, cache, mode = sys.argv[1:]
+names = [name for name in MODELS if os.path.exists(os.path.join(directory, name))]
+if mode != 'json':
+    store = ModelStore(directory, cache)
+start = time.perf_counter()
+if mode == 'json':
+    data = [json.load(open(os.path.join(directory, name), encoding='utf-8')) for name in names]
+else:
+    data = [store.load(name) for name in names]
+elapsed = time.perf_counter() - start
+records = sum(len(item) if isinstance(item, list) else 1 for item in data if item is not None)
+print(json.dumps({'elapsed': elapsed, 'peak_rss_mb': _peak_rss_mb(), 'records': records}))
+"""
+
+
+def _probe(directory, cache, mode):
+    output = subprocess.run([sys.executable, '-c', _PROBE, directory, cache, mode], check=True, capture_output=True,
+                            text=True, cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    return json.loads(output.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='类型化模型与二进制快照基准测试')
+    parser.add_argument('--videos', type=int, default=100000, help='视频数')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        AssetGenerator(args.videos, seed=args.seed).generate(directory)
+        cache = os.path.join(directory, 'snapshots')
+        results = [(label, _probe(directory, cache, mode)) for label, mode in
+                   (('json.load', 'json'), ('解析并写出快照', 'parse'), ('读取快照', 'snapshot'))]
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                   if name.endswith('.json'))
+        snapshot_size = sum(os.path.getsize(os.path.join(cache, name)) for name in os.listdir(cache))
+
+    print(f"视频数: {args.videos}  记录数: {results[0][1]['records']}  "
+          f"JSON: {size / 1e6:.1f}MB  快照: {snapshot_size / 1e6:.1f}MB")
+    for label, result in results:
+        print(f"{label}: {result['elapsed'] * 1000:.0f}ms  峰值RSS {result['peak_rss_mb'] or 0:.0f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+日志回放基准测试
+
+生成一批录制的检验日志(每个指令一个录制, 含其他标签的噪声日志, 部分录制缺少关键标记而应判为未通过), 比较:
+- 批量回放: replay.replay_captures 每个录制扫描一次
+- 运行时回放: AUTOTEST_BACKEND=replay 时的检验函数(eval_N.CheckXxx), 经由调度器并行执行
+
+用法: python -m AutoTest.benchmarks.bench_replay [--episodes 3000] [--noise 200]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from AutoTest.benchmarks.bench_scheduler import AGENT_TRACE
+from AutoTest.replay import ReplayClient, find_captures, replay_captures
+from AutoTest.runtime import Runtime
+from AutoTest.scheduler import TASK_COUNT, Scheduler
+
+NOISE_TAGS = ('ActivityManager', 'chromium', 'OpenGLRenderer', 'BufferQueueProducer')
+
+
+def write_episodes(directory, episodes, noise, seed=0):
+    """写出录制文件, 返回应当未通过的录制数"""
+    rng = random.Random(seed)
+    failing = 0
+    for index in range(episodes):
+        task = index % TASK_COUNT + 1
+        trace = list(AGENT_TRACE)
+        # 每10个录制中有1个只有噪声日志, 模拟没有完成任何操作
+        if index % 10 == 9:
+            trace = [f'noise-{position}' for position in range(len(trace))]
+            failing += 1
+        lines = []
+        timestamp = 1729612800.0 + index
+        for message in trace:
+            for _ in range(noise // len(AGENT_TRACE)):
+                timestamp += 0.001
+                lines.append(f'{timestamp:16.3f}  1000  1000 I {rng.choice(NOISE_TAGS)}: noise {rng.random():.6f}')
+            timestamp += 0.01
+            tag = 'BilibiliAutoTest' if not message.startswith('noise-') else rng.choice(NOISE_TAGS)
+            lines.append(f'{timestamp:16.3f}  4321  4321 D {tag}: {message}')
+        path = os.path.join(directory, f'eval_{task}-{index:05d}.log')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+    return failing
+
+
+def batch_replay(paths):
+    return sum(1 for result in replay_captures(paths) for verdict in result.verdicts if not verdict.passed)
+
+
+def runtime_replay(directory, paths):
+    """经由运行时和调度器回放: 每个录制作为一台设备, 执行其文件名对应的检验"""
+    runtime = Runtime(ReplayClient(directory))
+    scheduler = Scheduler(runtime=runtime)
+    jobs = [(int(os.path.basename(path)[5:].split('-')[0]), os.path.splitext(os.path.basename(path))[0])
+            for path in paths]
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = scheduler.run(jobs)
+    return sum(1 for result in results if not result.passed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='日志回放基准测试')
+    parser.add_argument('--episodes', type=int, default=3000, help='录制数量')
+    parser.add_argument('--noise', type=int, default=200, help='每个录制中其他标签的噪声日志行数')
+    parser.add_argument('--runtime-episodes', type=int, default=300, help='经由运行时回放的录制数量')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        expected_failures = write_episodes(directory, args.episodes, args.noise)
+        paths = find_captures(directory)
+        size_mb = sum(os.path.getsize(path) for path in paths) / 1024 / 1024
+        print(f"录制: {len(paths)}个, 共{size_mb:.1f}MB, 其中{expected_failures}个应判为未通过")
+
+        start = time.perf_counter()
+        failures = batch_replay(paths)
+        elapsed = time.perf_counter() - start
+        print(f"批量回放:   {len(paths):>6}个录制 {elapsed:>7.2f}s {len(paths) / elapsed:>9.0f}个/秒  未通过{failures}")
+
+        subset = paths[::max(1, len(paths) // args.runtime_episodes)][:args.runtime_episodes]
+        start = time.perf_counter()
+        failures = runtime_replay(directory, subset)
+        elapsed = time.perf_counter() - start
+        print(f"运行时回放: {len(subset):>6}个录制 {elapsed:>7.2f}s {len(subset) / elapsed:>9.0f}个/秒  未通过{failures}")
+
+
+if __name__ == '__main__':
+    main()
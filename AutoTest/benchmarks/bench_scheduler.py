@@ -0,0 +1,108 @@
+"""
+多设备并行调度基准测试
+
+在本地模拟adb server上启动N台模拟设备, 每台设备在检验开始后(写入起点标记或日志被清除)
+经过一段"操作时间"写出完成全部30个指令所需的日志标记, 比较不同设备数量下的吞吐量。
+--per-device大于1时同一设备上的多个检验同时进行(需要sentinel或time方式记录起点)。
+
+用法: python -m AutoTest.benchmarks.bench_scheduler [--devices 1,2,4,8] [--delay 0.05] [--watermark sentinel] [--per-device 1]
+"""
+import argparse
+import threading
+import time
+
+from AutoTest.adb import AdbWireClient
+from AutoTest.fakeadb import FakeAdbServer, FakeDevice
+from AutoTest.markers import SESSION_MARKER
+from AutoTest.runtime import WATERMARKS, Runtime
+from AutoTest.scheduler import TASK_COUNT, Scheduler
+
+# 覆盖全部30个指令的日志标记(含检验所需的参数)
+AGENT_TRACE = [
+    'HOME_PAGE_ACTIVE', 'MY_PAGE_ACTIVE', 'HISTORY_TAB_VIEWED', 'HISTORY_PAGE_ENTERED', 'HISTORY_DATA_LOADED: 20',
+    'VIP_STATUS_VIEWED', 'VIP_DATA_LOADED:正式会员', 'VIP_PAGE_ENTERED', 'VIP_EXPIRE_DATE_DISPLAYED: 2026-01-01',
+    'SEARCH_INPUT: 游戏解说', 'SEARCH_BUTTON_CLICKED', 'GAME_SEARCH_PAGE_LOADED: 游戏解说', 'SEARCH_COMPLETED: 游戏解说',
+    'ANIMATION_CHANNEL_CLICKED', 'ANIMATION_CHANNEL_PAGE_ENTERED', 'ANIMATION_CHANNEL_DATA_LOADED',
+    'VIDEO_PLAYER_OPENED: vid001', 'VIDEO_PLAYBACK_STARTED', 'LIKE_BUTTON_CLICKED', 'LIKE_STATUS_CHANGED: liked',
+    'FAVORITE_BUTTON_CLICKED', 'FAVORITE_STATUS_CHANGED: favorited', 'FOLLOW_BUTTON_CLICKED',
+    'FOLLOW_STATUS_CHANGED: followed', 'FULLSCREEN_BUTTON_CLICKED', 'FULLSCREEN_MODE_ENTERED',
+    'PAUSE_BUTTON_CLICKED', 'VIDEO_PAUSED', 'DANMAKU_INITIAL_STATE: on', 'DANMAKU_SWITCH_CLICKED',
+    'DANMAKU_STATUS_CHANGED: off', 'DANMAKU_SWITCH_CLICKED', 'DANMAKU_STATUS_CHANGED: on',
+    'FAVORITE_TAB_CLICKED', 'FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED: 5', 'FAVORITE_COUNT_DISPLAYED: 5',
+    'PersonTab', 'PROFILE_PAGE_ENTERED', 'PROFILE_DATA_LOADED',
+    'UPLOADER_FOUND: 逍遥散人', 'UPLOADER_PAGE_ENTERED: 逍遥散人', 'UPLOADER_DATA_LOADED', 'FANS_COUNT_DISPLAYED: 23.5万',
+    'OFFLINE_CACHE_PAGE_ENTERED', 'CACHE_LIST_LOADED',
+    'FOLLOW_PAGE_ENTERED', 'DYNAMIC_LIST_LOADED', 'FIRST_DYNAMIC_CLICKED', 'DYNAMIC_DETAIL_OPENED',
+    'RECENT_VISIT_TAB_CLICKED', 'RECENT_VISIT_LOADED',
+    'FIRST_VIDEO_CLICKED', 'COMMENT_PAGE_ENTERED', 'COMMENT_LIST_LOADED', 'REPLY_BUTTON_CLICKED',
+    'COMMENT_INPUT_TEXT: 谢谢分享！', 'SEND_BUTTON_CLICKED', 'COMMENT_SENT_SUCCESS',
+    'COMMENT_LIKE_CLICKED', 'COMMENT_LIKE_STATUS_CHANGED', 'SORT_BY_LIKES_SELECTED', 'TOP_LIKED_COMMENT_FOUND: likes=156',
+    'HISTORY_ITEM_LONG_PRESSED', 'DELETE_BUTTON_CLICKED', 'HISTORY_ITEM_DELETED: count=19',
+    'SETTINGS_PAGE_ENTERED', 'TIMER_SHUTDOWN_OPTION_FOUND', 'TIMER_SHUTDOWN_CLICKED', 'TIMER_SHUTDOWN_STATUS_LOADED: off',
+    'LIVE_TAB_ENTERED', 'LIVE_RECOMMEND_LOADED', 'FIRST_LIVE_FOUND', 'LIVE_VIEWER_COUNT_DISPLAYED: 5.2万人',
+]
+
+
+class AgentDevice(FakeDevice):
+    """检验开始(写入起点标记、读取设备时间或清除日志)后, 经过delay秒写出AGENT_TRACE的模拟设备"""
+
+    def __init__(self, serial, delay):
+        super().__init__(serial)
+        self.delay = delay
+
+    def log(self, message, *args, **kwargs):
+        super().log(message, *args, **kwargs)
+        if message.startswith(SESSION_MARKER):
+            self._act()
+
+    def clock(self):
+        now = super().clock()
+        self._act()
+        return now
+
+    def clear(self):
+        super().clear()
+        self._act()
+
+    def _act(self):
+        timer = threading.Timer(self.delay, lambda: [super(AgentDevice, self).log(message) for message in AGENT_TRACE])
+        timer.daemon = True
+        timer.start()
+
+
+def measure(device_count, delay, tasks, watermark='sentinel', per_device=1):
+    devices = [AgentDevice(f'emulator-{5554 + 2 * index}', delay) for index in range(device_count)]
+    with FakeAdbServer(devices=devices) as server:
+        client = AdbWireClient(server.host, server.port, pool_size=2 * per_device)
+        runtime = Runtime(client, mode='follow', timeout=5, watermark=watermark)
+        scheduler = Scheduler(runtime=runtime, per_device=per_device)
+        start = time.perf_counter()
+        results = scheduler.run_matrix(tasks)
+        elapsed = time.perf_counter() - start
+        runtime.close()
+    failed = [result for result in results if not result.passed]
+    return len(results), elapsed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='多设备并行调度基准测试')
+    parser.add_argument('--devices', default='1,2,4,8', help='逗号分隔的设备数量')
+    parser.add_argument('--delay', type=float, default=0.05, help='每个检验中模拟的操作时间(秒)')
+    parser.add_argument('--watermark', choices=WATERMARKS, default='sentinel', help='检验起点的记录方式')
+    parser.add_argument('--per-device', type=int, default=1, help='每台设备同时进行的检验数')
+    args = parser.parse_args(argv)
+
+    tasks = range(1, TASK_COUNT + 1)
+    baseline = None
+    print(f"{'设备数':<8}{'检验数':>8}{'耗时(s)':>10}{'检验/秒':>10}{'相对1台':>10}{'失败':>6}")
+    for device_count in (int(count) for count in args.devices.split(',')):
+        count, elapsed, failed = measure(device_count, args.delay, tasks, args.watermark, args.per_device)
+        throughput = count / elapsed
+        baseline = baseline or throughput
+        print(f"{device_count:<8}{count:>8}{elapsed:>10.2f}{throughput:>10.1f}{throughput / baseline:>9.1f}x{len(failed):>6}")
+        for result in failed[:3]:
+            print(f"  失败: 指令{result.task} {result.serial} {result.error or ''}")
+
+
+if __name__ == '__main__':
+    main()
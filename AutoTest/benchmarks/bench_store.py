@@ -0,0 +1,106 @@
+"""
+检验结果存储基准测试
+
+多个线程(模拟调度器的工作线程)同时向ResultStore写入数百万个检验结果, 报告写入吞吐量,
+然后比较两种统计方式的耗时:
+- 明细: 直接在results表上 GROUP BY(使用索引)
+- 汇总: ResultStore.summary(), 在rollup表上计算通过率和p50/p95/p99
+
+用法: python -m AutoTest.benchmarks.bench_store [--rows 2000000] [--writers 8] [--devices 100] [--days 30]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from AutoTest.scheduler import TASK_COUNT, EvalResult
+from AutoTest.store import ResultStore
+
+STEPS = (('connect', 0.001), ('clear', 0.02), ('collect', 1.5), ('verdict', 0.001))
+BUILDS = ('1.0+1', '1.1+2', '1.2+3')
+
+
+def write_results(store, writer, rows, devices, days, seed):
+    rng = random.Random(seed + writer)
+    start = 1760000000.0
+    for index in range(rows):
+        task = rng.randrange(1, TASK_COUNT + 1)
+        elapsed = rng.lognormvariate(0.5, 0.6)
+        passed = rng.random() < 0.9
+        hits = [('HOME_PAGE_ACTIVE', True), ('HISTORY_TAB_VIEWED', passed)]
+        store.add(EvalResult(task, f'emulator-{5554 + 2 * rng.randrange(devices)}', passed, elapsed,
+                             start + days * 86400 * index / rows, '', None, None if passed else '未找到标记',
+                             [(name, scale * elapsed) for name, scale in STEPS], hits),
+                  build=BUILDS[index * len(BUILDS) // rows])
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='检验结果存储基准测试')
+    parser.add_argument('--rows', type=int, default=2000000, help='写入的检验结果数')
+    parser.add_argument('--writers', type=int, default=8, help='同时写入的线程数')
+    parser.add_argument('--devices', type=int, default=100, help='设备数')
+    parser.add_argument('--days', type=int, default=30, help='检验结果分布的天数')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.db')
+        store = ResultStore(path)
+        per_writer = args.rows // args.writers
+        threads = [threading.Thread(target=write_results, args=(store, writer, per_writer, args.devices, args.days, 0))
+                   for writer in range(args.writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        added = time.perf_counter() - start
+        store.flush()
+        written = time.perf_counter() - start
+        rows = per_writer * args.writers
+        print(f"写入: {rows}行, {args.writers}个线程, add()完成{added:.1f}s ({rows / added:,.0f}行/秒), "
+              f"全部落盘{written:.1f}s ({rows / written:,.0f}行/秒)")
+
+        connection = sqlite3.connect(path)
+        rollup_rows = connection.execute('SELECT COUNT(*) FROM rollup').fetchone()[0]
+        print(f"数据库: {os.path.getsize(path) / 1024 / 1024:.0f}MB, rollup {rollup_rows}行")
+        week = 1760000000.0 + (args.days - 7) * 86400
+        queries = (
+            ('各指令通过率', lambda: connection.execute(
+                'SELECT task, COUNT(*), SUM(passed), AVG(elapsed) FROM results GROUP BY task').fetchall(),
+             lambda: store.summary('task')),
+            ('各设备通过率', lambda: connection.execute(
+                'SELECT serial, COUNT(*), SUM(passed), AVG(elapsed) FROM results GROUP BY serial').fetchall(),
+             lambda: store.summary('device')),
+            ('指令5最近7天', lambda: connection.execute(
+                'SELECT COUNT(*), SUM(passed), AVG(elapsed) FROM results WHERE task = 5 AND started >= ?',
+                (week,)).fetchall(),
+             lambda: store.summary(None, since=week, task=5)),
+        )
+        print(f"{'统计':<12}{'明细(ms)':>10}{'汇总(ms)':>10}")
+        for name, detail, summary in queries:
+            detail_time, _ = timed(detail)
+            summary_time, _ = timed(summary)
+            print(f"{name:<12}{detail_time * 1000:>10.1f}{summary_time * 1000:>10.1f}")
+        connection.close()
+
+        overall = store.summary(None)[None]
+        print(f"全部: {overall.count}个检验, 通过率{overall.rate:.1%}, "
+              f"p50 {overall.p50:.2f}s p95 {overall.p95:.2f}s p99 {overall.p99:.2f}s")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
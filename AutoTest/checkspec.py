@@ -0,0 +1,509 @@
+"""
+声明式检验规格与流式检验引擎
+
+每个指令的检验逻辑写在 specs/eval_N.json 中, 由 CheckEngine 编译为按日志标记分发的状态机:
+- steps: 依次给出结论的检验步骤, 每步要求出现某个标记(可限定参数), any_of 表示"至少出现其一";
+  {"text": "文字"} 要求文字出现在BilibiliAutoTest日志的任意一行中(原有检验的 '文字' in log_content);
+  参数约束 count_min 按APP的数量显示格式(如'5.2万人', 见counts.py)还原后比较
+- wait_for: follow模式下需要等到的日志标记(操作流程全部完成), 不影响检验结论
+- captures / assets / report / compare: 从日志参数或assets数据(assets.AssetIndex的条目数)中提取数值, 输出说明和不一致警告
+- verify: 将日志参数与assets数据计算出的期望值(oracle.py)比较, 不一致时检验不通过; format为counts.STYLES中的显示格式
+- expect: 查出oracle期望值用于输出说明(如视频的弹幕数); 指定equals时还要求期望值等于该值, 否则检验不通过;
+  lookup为期望值表上按键查找的方法(默认get, 如comment_index的newest_id); when_env为环境变量名时, 只在设置了该变量时检查equals
+
+日志事件只被处理一次: 每个事件按标记查表, 直接推进订阅了该标记的步骤, 不回头重新扫描日志。
+一个CheckEngine可以同时承载多个规格, 在同一个事件流上一次得到全部结论。
+
+规格示例:
+    {
+      "task": 5,
+      "function": "CheckLikeVideo",
+      "subject": "点赞操作",
+      "instructions": ["打开bilibili APP", "进入任意视频播放页", "点击「点赞」按钮"],
+      "steps": [
+        {"marker": "VIDEO_PLAYER_OPENED", "fail": "未检测到进入视频播放页"},
+        {"marker": "LIKE_STATUS_CHANGED", "payload": {"equals": "liked"}, "fail": "点赞状态未更新"}
+      ],
+      "success": "点赞操作验证成功!"
+    }
+"""
+import collections
+import functools
+import glob
+import json
+import os
+import re
+
+from .assets import get_index
+from .counts import parse_count
+from .oracle import FORMATS, TABLES, get_oracle
+from .logcat import parse_expectation
+from .markers import MarkerMatcher
+from .runtime import connect_device
+from .spans import note, span
+
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'specs')
+
+# text不为None时是全文检查: 文字出现在任意一行日志中即满足, marker为None
+Predicate = collections.namedtuple('Predicate', 'marker test text', defaults=(None,))
+Step = collections.namedtuple('Step', 'predicates fail hints')
+Capture = collections.namedtuple('Capture', 'name marker pick pattern type default mapping')
+Comparison = collections.namedtuple('Comparison', 'values equal differ')
+Verification = collections.namedtuple('Verification', 'value oracle key key_capture format expected required fail hints')
+Lookup = collections.namedtuple('Lookup', 'name oracle key key_capture lookup format default equals required '
+                                         'when_env fail hints')
+Verdict = collections.namedtuple('Verdict', 'spec passed failure values hits')
+
+
+class SpecError(ValueError):
+    """检验规格格式错误"""
+
+
+def _oracle_key(item, where):
+    """检查verify/expect中的oracle和format, 返回(字面值key, key引用的capture名称)"""
+    if item['oracle'] not in TABLES:
+        raise SpecError(f"{where}: 未知的oracle {item['oracle']}")
+    if item.get('format') is not None and item['format'] not in FORMATS:
+        raise SpecError(f"{where}: 未知的format {item['format']}")
+    key = item.get('key')
+    key_capture = key['capture'] if isinstance(key, dict) else None
+    return (None if key_capture else key), key_capture
+
+
+def _payload_test(constraint, where):
+    """将参数约束编译为判断函数, 无约束时返回None"""
+    if constraint is None:
+        return None
+    if isinstance(constraint, str):
+        constraint = {'equals': constraint}
+    if not isinstance(constraint, dict) or len(constraint) != 1:
+        raise SpecError(f"{where}: payload需要是 {{equals|contains|in|regex|count_min: 值}}")
+    (kind, value), = constraint.items()
+    if kind == 'equals':
+        return lambda payload: payload == value
+    if kind == 'contains':
+        return lambda payload: value in payload
+    if kind == 'in':
+        values = frozenset(value)
+        return lambda payload: payload in values
+    if kind == 'regex':
+        pattern = re.compile(value)
+        return lambda payload: pattern.match(payload) is not None
+    if kind == 'count_min':
+        # 显示的数量(如'5.2万人', 见counts.py)还原后不小于value; 不是数量的文本不满足
+        return lambda payload: parse_count(payload, -1) >= value
+    raise SpecError(f"{where}: 未知的payload约束 {kind}")
+
+
+def _predicate(data, where):
+    if isinstance(data, str):
+        return Predicate(data, None)
+    if 'text' in data:
+        if 'marker' in data or 'payload' in data:
+            raise SpecError(f"{where}: text不能与marker或payload同时使用")
+        return Predicate(None, None, data['text'])
+    if 'marker' not in data:
+        raise SpecError(f"{where}: 缺少marker")
+    return Predicate(data['marker'], _payload_test(data.get('payload'), where))
+
+
+class CheckSpec:
+    """一个指令的检验规格"""
+
+    def __init__(self, data, name=None):
+        self.name = name or f"eval_{data.get('task')}"
+        self.task = data.get('task')
+        self.function = data.get('function')
+        self.subject = data.get('subject', self.name)
+        self.instructions = list(data.get('instructions', ()))
+        self.ordered = bool(data.get('ordered', False))
+        self.success = data.get('success', '验证成功!')
+        self.show_log = bool(data.get('show_log', False))
+        self.echo_log = bool(data.get('echo_log', False))
+        self.report = list(data.get('report', ()))
+
+        self.steps = []
+        for index, step in enumerate(data.get('steps', ())):
+            where = f"{self.name}.steps[{index}]"
+            if 'fail' not in step:
+                raise SpecError(f"{where}: 缺少fail")
+            alternatives = step['any_of'] if 'any_of' in step else [step]
+            self.steps.append(Step([_predicate(item, where) for item in alternatives],
+                                   step['fail'], list(step.get('hints', ()))))
+        if not self.steps:
+            raise SpecError(f"{self.name}: 至少需要一个检验步骤")
+
+        # wait_for沿用 'MARKER' / 'MARKER: 参数' 的写法
+        self.waits = []
+        for item in data.get('wait_for', ()):
+            marker, payload = parse_expectation(item)
+            self.waits.append(Predicate(marker, None if payload is None else _payload_test(payload, self.name)))
+
+        self.captures = []
+        for name, capture in data.get('captures', {}).items():
+            pick = capture.get('pick', 'first')
+            if pick not in ('first', 'last'):
+                raise SpecError(f"{self.name}.captures.{name}: pick只能是first或last")
+            pattern = capture.get('pattern')
+            self.captures.append(Capture(name, capture['marker'], pick, pattern and re.compile(pattern),
+                                         capture.get('type', 'str'), capture.get('default'),
+                                         capture.get('map')))
+
+        self.assets = dict(data.get('assets', {}))
+        self.compare = [Comparison(tuple(item['values']), list(item.get('equal', ())), list(item.get('differ', ())))
+                        for item in data.get('compare', ())]
+
+        # key为字面值, 或 {"capture": 名称} 表示取该capture的值
+        self.verify = []
+        for index, item in enumerate(data.get('verify', ())):
+            where = f"{self.name}.verify[{index}]"
+            for field in ('value', 'oracle', 'fail'):
+                if field not in item:
+                    raise SpecError(f"{where}: 缺少{field}")
+            key, key_capture = _oracle_key(item, where)
+            self.verify.append(Verification(item['value'], item['oracle'], key, key_capture,
+                                            item.get('format'), item.get('expected', f"expected_{item['value']}"),
+                                            bool(item.get('required', True)), item['fail'],
+                                            list(item.get('hints', ()))))
+        # equals为空时只查值; 否则要求查出的值等于equals, required为false时key引用的capture不存在则不检查
+        self.expect = []
+        for name, item in data.get('expect', {}).items():
+            where = f"{self.name}.expect.{name}"
+            if 'oracle' not in item:
+                raise SpecError(f"{where}: 缺少oracle")
+            if 'equals' in item and 'fail' not in item:
+                raise SpecError(f"{where}: 指定equals时需要fail")
+            key, key_capture = _oracle_key(item, where)
+            lookup = item.get('lookup', 'get')
+            if not isinstance(lookup, str) or not lookup.isidentifier() or lookup.startswith('_'):
+                raise SpecError(f"{where}: 无效的lookup {lookup!r}")
+            self.expect.append(Lookup(name, item['oracle'], key, key_capture, lookup, item.get('format'),
+                                      item.get('default'), item.get('equals'), bool(item.get('required', True)),
+                                      item.get('when_env'), item.get('fail'), list(item.get('hints', ()))))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data, os.path.splitext(os.path.basename(path))[0])
+
+    @property
+    def markers(self):
+        """规格中引用的全部日志标记"""
+        names = [predicate.marker for step in self.steps for predicate in step.predicates if predicate.text is None]
+        names += [predicate.marker for predicate in self.waits]
+        names += [capture.marker for capture in self.captures]
+        return tuple(dict.fromkeys(names))
+
+    def __repr__(self):
+        return f"CheckSpec({self.name!r})"
+
+
+@functools.lru_cache(maxsize=None)
+def load_spec(name):
+    """按名称(如'eval_5')加载specs目录下的检验规格"""
+    return CheckSpec.load(os.path.join(SPEC_DIR, f'{name}.json'))
+
+
+def load_specs():
+    """加载specs目录下的全部检验规格(按指令编号排序)"""
+    names = [os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(SPEC_DIR, '*.json'))]
+    specs = [load_spec(name) for name in names]
+    return sorted(specs, key=lambda spec: (spec.task is None, spec.task or 0, spec.name))
+
+
+def _convert(capture, payload):
+    if payload is None:
+        return capture.default
+    if capture.pattern is not None:
+        match = capture.pattern.match(payload)
+        if not match:
+            return capture.default
+        # 有捕获组时取第一个组
+        payload = match.group(1 if capture.pattern.groups else 0)
+    if capture.mapping is not None:
+        return capture.mapping.get(payload, capture.default)
+    if capture.type == 'int':
+        return int(payload)
+    if capture.type == 'float':
+        return float(payload)
+    return payload
+
+
+class _SpecState:
+    """单个规格在事件流上的推进状态"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.satisfied = [False] * len(spec.steps)
+        self.position = 0
+        self.waiting = [True] * len(spec.waits)
+        self.remaining = len(spec.steps) + len(spec.waits)
+        self.raw = {}
+
+    def satisfy_step(self, index):
+        self.satisfied[index] = True
+        self.remaining -= 1
+        while self.position < len(self.satisfied) and self.satisfied[self.position]:
+            self.position += 1
+
+    def verdict(self):
+        spec = self.spec
+        failure = next((step for step, done in zip(spec.steps, self.satisfied) if not done), None)
+        values = {capture.name: _convert(capture, self.raw.get(capture.name)) for capture in spec.captures}
+        if failure is None and spec.assets:
+            with span('assets'):
+                index = get_index()
+                for name, source in spec.assets.items():
+                    values[name] = index.count(source)
+        if failure is None and (spec.verify or spec.expect):
+            with span('oracle'):
+                failure = _verify(spec, values)
+        return Verdict(spec, failure is None, failure, values, tuple(self.satisfied))
+
+
+def _formatted(oracle, item, key, expected):
+    """期望值的显示文本: 优先取整张表批量格式化的结果(oracle.formatted), 表中没有时(如default)单独格式化"""
+    texts = oracle.formatted(item.oracle, item.format)
+    text = texts.get(key) if texts is not None else None
+    return FORMATS[item.format](expected) if text is None else text
+
+
+def _verify(spec, values):
+    """将日志参数与oracle期望值比较, 期望值记入values; 返回第一个不一致项对应的Step, 全部一致时返回None"""
+    oracle = get_oracle()
+    failure = None
+    for item in spec.expect:
+        key = values.get(item.key_capture) if item.key_capture else item.key
+        checked = item.fail is not None and (key is not None or item.required) and (
+            item.when_env is None or os.environ.get(item.when_env, '').strip())
+        try:
+            expected = oracle.expect(item.oracle, key, item.default, item.lookup)
+        except ValueError as e:
+            # 期望值依赖的配置有误(如AUTOTEST_NOW格式错误), 需要检查时记为不通过
+            values[item.name] = None
+            if checked and failure is None:
+                failure = Step([], str(e), item.hints)
+            continue
+        if expected is not None and item.format:
+            expected = _formatted(oracle, item, key, expected)
+        values[item.name] = expected
+        if not checked:
+            continue
+        if failure is None and expected != item.equals:
+            failure = Step([], item.fail.format_map(_Values(values)), item.hints)
+    for item in spec.verify:
+        actual = values.get(item.value)
+        key = values.get(item.key_capture) if item.key_capture else item.key
+        expected = oracle.expect(item.oracle, key)
+        if expected is not None and item.format:
+            expected = _formatted(oracle, item, key, expected)
+        values[item.expected] = expected
+        if actual is None and not item.required:
+            continue
+        if failure is None and (expected is None or actual != expected):
+            failure = Step([], item.fail.format_map(_Values(values)), item.hints)
+    return failure
+
+
+@functools.lru_cache(maxsize=64)
+def _matcher(markers, other_lines=False):
+    """规格引用的标记集合对应的匹配器(批量回放时大量引擎共用); 有全文检查时还要返回其他日志行"""
+    return MarkerMatcher(markers, other_lines=other_lines)
+
+
+def predicate_label(predicate):
+    """步骤条件的显示名称: 标记名, 全文检查为引号括起的文字"""
+    return predicate.marker if predicate.text is None else repr(predicate.text)
+
+
+class CheckEngine:
+    """
+    流式检验引擎
+    将一个或多个检验规格编译为"标记 -> 订阅者"分发表, 每个日志事件只按标记查表一次
+    """
+
+    def __init__(self, specs):
+        self.states = [_SpecState(spec) for spec in specs]
+        self._steps = collections.defaultdict(list)
+        self._waits = collections.defaultdict(list)
+        self._captures = collections.defaultdict(list)
+        # 全文检查: [(状态, 步骤序号, 文字)], 每个日志事件都要检查
+        self._texts = []
+        for state in self.states:
+            for index, step in enumerate(state.spec.steps):
+                for predicate in step.predicates:
+                    if predicate.text is not None:
+                        self._texts.append((state, index, predicate.text))
+                    else:
+                        self._steps[predicate.marker].append((state, index, predicate.test))
+            for index, predicate in enumerate(state.spec.waits):
+                self._waits[predicate.marker].append((state, index, predicate.test))
+            for capture in state.spec.captures:
+                self._captures[capture.marker].append((state, capture))
+        self.unsettled = sum(1 for state in self.states if state.remaining)
+
+    def reset(self):
+        """清空全部规格的推进状态, 分发表保持不变(分段检验时同一引擎依次用于各个episode)"""
+        for state in self.states:
+            state.__init__(state.spec)
+        self.unsettled = sum(1 for state in self.states if state.remaining)
+
+    @property
+    def markers(self):
+        return tuple(dict.fromkeys([*self._steps, *self._waits, *self._captures]))
+
+    @property
+    def has_texts(self):
+        """有全文检查时, 扫描日志需要返回不以标记开头的行(见markers.MarkerMatcher)"""
+        return bool(self._texts)
+
+    @property
+    def done(self):
+        """全部规格的步骤与等待标记都已满足"""
+        return self.unsettled == 0
+
+    def feed(self, marker, payload=''):
+        """处理一个日志事件, 返回是否全部规格都已满足"""
+        for state, index, test in self._steps.get(marker, ()):
+            if state.satisfied[index] or (state.spec.ordered and index != state.position):
+                continue
+            if test is None or test(payload):
+                state.satisfy_step(index)
+                if not state.remaining:
+                    self.unsettled -= 1
+        for state, index, test in self._waits.get(marker, ()):
+            if state.waiting[index] and (test is None or test(payload)):
+                state.waiting[index] = False
+                state.remaining -= 1
+                if not state.remaining:
+                    self.unsettled -= 1
+        for state, capture in self._captures.get(marker, ()):
+            if capture.pick == 'last' or capture.name not in state.raw:
+                state.raw[capture.name] = payload
+        for state, index, text in self._texts:
+            if state.satisfied[index] or (state.spec.ordered and index != state.position):
+                continue
+            if text in payload or text in marker:
+                state.satisfy_step(index)
+                if not state.remaining:
+                    self.unsettled -= 1
+        return self.unsettled == 0
+
+    def feed_events(self, events):
+        """处理logcat.LogEvent序列(follow模式)"""
+        for event in events:
+            self.feed(event.marker, event.payload)
+        return self.unsettled == 0
+
+    def feed_text(self, data):
+        """单遍扫描一段logcat输出(logcat -d), 只识别规格中引用的标记; data可以是str或原始字节"""
+        for marker, payload in _matcher(self.markers, self.has_texts).events(data):
+            self.feed(marker, payload.strip())
+        return self.unsettled == 0
+
+    def verdicts(self):
+        return [state.verdict() for state in self.states]
+
+
+def step_hits(verdict):
+    """各步骤的标记是否出现: [(标记, 是否出现)], 多选一的步骤标记以|连接"""
+    return [('|'.join(predicate_label(predicate) for predicate in step.predicates), hit)
+            for step, hit in zip(verdict.spec.steps, verdict.hits)]
+
+
+def evaluate_log(data, specs=None):
+    """在一段logcat输出(str或原始字节)上同时计算多个规格的结论"""
+    engine = CheckEngine(load_specs() if specs is None else specs)
+    engine.feed_text(data)
+    return engine.verdicts()
+
+
+def _as_text(log_content):
+    if isinstance(log_content, (bytes, bytearray, memoryview)):
+        return bytes(log_content).decode('utf-8', errors='ignore')
+    return log_content
+
+
+class _Values(dict):
+    def __missing__(self, key):
+        return '?'
+
+
+def print_verdict(verdict, log_content=''):
+    """按原有检验脚本的格式输出结论, 返回是否通过; 日志内容(可为原始字节)只在需要输出时解码"""
+    spec = verdict.spec
+    if spec.echo_log or (spec.show_log and not verdict.passed):
+        log_content = _as_text(log_content)
+    if spec.echo_log:
+        print("\n捕获到的日志内容:")
+        print("-" * 60)
+        print(log_content if log_content.strip() else "(无日志)")
+        print("-" * 60)
+
+    if not verdict.passed:
+        print(f"验证失败: {verdict.failure.fail}")
+        if verdict.failure.hints:
+            print()
+            for line in verdict.failure.hints:
+                print(line)
+        if spec.show_log:
+            print(f"\n日志内容:\n{log_content if log_content else '(无相关日志)'}")
+        return False
+
+    values = _Values(verdict.values)
+    for line in spec.report:
+        print(line.format_map(values))
+    for comparison in spec.compare:
+        current = [verdict.values.get(name) for name in comparison.values]
+        if None in current:
+            continue
+        lines = comparison.equal if len(set(current)) == 1 else comparison.differ
+        for line in lines:
+            print(line.format_map(values))
+    print(spec.success)
+    return True
+
+
+def run_spec(spec, serial=None):
+    """在设备上执行一个指令的检验: 清除日志、提示操作、采集日志并按规格给出结论"""
+    if isinstance(spec, str):
+        spec = load_spec(spec)
+    try:
+        with span('connect'):
+            device = connect_device(serial)
+        if device is None:
+            print("错误: 找不到adb命令")
+            print("请确保Android SDK已安装,或将platform-tools目录添加到系统PATH")
+            note(failure="找不到adb命令")
+            return False
+
+        print(f"使用{device.describe()}")
+
+        print("\n清除旧日志...")
+        with span('clear'):
+            session = device.start_session()
+
+        print("=" * 60)
+        print("请在虚拟机中执行以下操作:")
+        for index, instruction in enumerate(spec.instructions, 1):
+            print(f"{index}. {instruction}")
+        print("=" * 60)
+
+        engine = CheckEngine([spec])
+        with span('collect'):
+            log_content = session.evaluate(engine)
+        with span('verdict'):
+            verdict = engine.verdicts()[0]
+            note(failure=None if verdict.passed else verdict.failure.fail, values=verdict.values,
+                 hits=step_hits(verdict))
+            return print_verdict(verdict, log_content)
+
+    except TimeoutError:
+        print("验证失败: 读取日志超时")
+        note(failure="读取日志超时")
+        return False
+    except Exception as e:
+        print(f"检查{spec.subject}时发生错误: {str(e)}")
+        note(error=f"{type(e).__name__}: {e}")
+        return False
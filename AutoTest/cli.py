@@ -0,0 +1,397 @@
+"""
+批量检验命令行
+
+python -m AutoTest run 经由调度器在多台设备上批量执行检验, 输出机器可读的结果:
+- --jsonl: 每个检验完成时写出一行JSON(指令、设备、结论、失败原因、总耗时和各步骤耗时)
+- --junit: 全部完成后写出JUnit XML(每台设备一个testsuite, 各步骤耗时记录在testcase的properties中)
+- --spans / --metrics: 各阶段耗时按指令和设备汇总的p50/p95/p99(JSON / Prometheus文本格式, 见spans.py)
+- --async: 在一个asyncio事件循环中驱动全部设备(见aio.py), 检验输出不再逐个捕获
+- --store: 追加写入SQLite结果库(含APP版本和各步骤标记是否出现, 见store.py), APP版本取--build或设备上安装的版本
+- 退出码: 0 全部通过, 1 有检验未通过或出错, 2 参数错误或没有可用的设备
+
+python -m AutoTest compare 比较两次--spans导出的耗时, 有阶段变慢超过阈值时退出码为1, 用于拦截性能退化。
+python -m AutoTest episodes 将录制文件或设备的日志流按会话起点标记切分为episode, 每个episode在全部检验规格上给出结论(见episodes.py)。
+python -m AutoTest stats 按指令/设备/APP版本统计结果库中的通过率和耗时分位数。
+python -m AutoTest serve 启动常驻检验服务, 通过本地HTTP接口接受检验请求(见daemon.py)。
+
+检验脚本按需导入(只导入本次要执行的eval_N.py)。
+不能等待人工确认: 默认使用follow模式(回放录制的日志时为batch模式), 可用--mode指定。
+
+用法:
+    python -m AutoTest run --tasks 1-30 --devices emulator-5554,emulator-5556 --jsonl results.jsonl --junit junit.xml
+    python -m AutoTest run --replay captures/ --jsonl -
+    python -m AutoTest run --replay captures/ --spans spans.json --metrics spans.prom
+    python -m AutoTest compare baseline.json spans.json --quantile p95 --tolerance 0.2
+    python -m AutoTest episodes episode.log --jsonl -
+    python -m AutoTest run --tasks 1-30 --store results.db
+    python -m AutoTest stats results.db --by device --since 2026-10-01
+    python -m AutoTest serve --socket /tmp/autotest.sock
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import sys
+import threading
+import xml.etree.ElementTree as ET
+
+from .adb import AdbError
+from .runtime import MODES, WATERMARKS, Runtime, create_client
+from .scheduler import Scheduler, discover_tasks, load_task, parse_tasks
+from .spans import SpanCollector, regressions
+from .store import ResultStore, parse_time
+
+EXIT_PASSED = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def result_record(result):
+    """检验结果对应的JSON对象"""
+    return {
+        'task': result.task,
+        'check': load_task(result.task).__name__,
+        'serial': result.serial,
+        'passed': result.passed,
+        'failure': result.failure,
+        'error': result.error,
+        'started': datetime.datetime.fromtimestamp(result.started).astimezone().isoformat(timespec='milliseconds'),
+        'elapsed': round(result.elapsed, 6),
+        'steps': [{'name': name, 'elapsed': round(elapsed, 6)} for name, elapsed in result.steps],
+        'hits': None if result.hits is None else [{'marker': marker, 'hit': hit} for marker, hit in result.hits],
+    }
+
+
+def junit_tree(results):
+    """按设备分组生成JUnit XML"""
+    suites = ET.Element('testsuites', name='AutoTest')
+    by_serial = {}
+    for result in results:
+        by_serial.setdefault(result.serial, []).append(result)
+    for serial, group in by_serial.items():
+        suite = ET.SubElement(suites, 'testsuite', name=str(serial), tests=str(len(group)),
+                              failures=str(sum(1 for r in group if not r.passed and not r.error)),
+                              errors=str(sum(1 for r in group if r.error)),
+                              time=f"{sum(r.elapsed for r in group):.3f}")
+        for result in group:
+            case = ET.SubElement(suite, 'testcase', classname=f'AutoTest.eval_{result.task}',
+                                 name=load_task(result.task).__name__, time=f"{result.elapsed:.3f}")
+            if result.steps:
+                properties = ET.SubElement(case, 'properties')
+                for name, elapsed in result.steps:
+                    ET.SubElement(properties, 'property', name=f'step.{name}', value=f"{elapsed:.6f}")
+            if result.error:
+                ET.SubElement(case, 'error', message=result.error)
+            elif not result.passed:
+                ET.SubElement(case, 'failure', message=result.failure or '验证失败')
+            if result.output:
+                ET.SubElement(case, 'system-out').text = result.output
+    for attribute in ('tests', 'failures', 'errors'):
+        suites.set(attribute, str(sum(int(suite.get(attribute)) for suite in suites)))
+    return ET.ElementTree(suites)
+
+
+def create_runtime(args):
+    """按命令行参数创建运行时"""
+    if args.replay:
+        from .replay import ReplayClient
+
+        client = ReplayClient(args.replay, speed=args.replay_speed)
+    else:
+        client = create_client(args.backend)
+    default_mode = 'batch' if client.kind == 'replay' else 'follow'
+    mode = args.mode or os.environ.get('AUTOTEST_MODE', default_mode)
+    return Runtime(client, mode=mode, timeout=args.timeout, watermark=args.watermark)
+
+
+def run(args):
+    try:
+        tasks = parse_tasks(args.tasks) if args.tasks else discover_tasks()
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    missing = sorted(set(tasks) - set(discover_tasks()))
+    if missing:
+        print(f"错误: 没有指令{','.join(map(str, missing))}的检验脚本", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        runtime = create_runtime(args)
+        serials = [serial for serial in args.devices.split(',') if serial] if args.devices else None
+        collector = SpanCollector() if args.spans or args.metrics else None
+        scheduler = Scheduler(serials, runtime=runtime, collector=collector, per_device=args.per_device)
+    except (AdbError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    jobs = [(task, None if args.spread else serial)
+            for _ in range(args.repeat)
+            for task in tasks
+            for serial in (scheduler.serials if not args.spread else (None,))]
+
+    # JSON输出到stdout时, 进度信息改为输出到stderr
+    progress = sys.stderr if args.jsonl == '-' else sys.stdout
+    jsonl = None
+    if args.jsonl:
+        jsonl = sys.stdout if args.jsonl == '-' else open(args.jsonl, 'w', encoding='utf-8')
+    store = ResultStore(args.store) if args.store else None
+    builds = {}
+    lock = threading.Lock()
+
+    def on_result(result):
+        if store is not None:
+            store.add(result, build=apk_build(runtime, result.serial, args.build, builds))
+        with lock:
+            if jsonl is not None:
+                jsonl.write(json.dumps(result_record(result), ensure_ascii=False) + '\n')
+                jsonl.flush()
+            if not args.quiet:
+                status = '通过' if result.passed else '未通过'
+                reason = result.error or result.failure
+                print(f"指令{result.task:>2} {result.serial}: {status} ({result.elapsed:.2f}s)"
+                      + (f" - {reason}" if reason and not result.passed else ''), file=progress, flush=True)
+
+    try:
+        if args.use_async:
+            results = asyncio.run(run_async(args, scheduler, jobs, on_result))
+        else:
+            results = scheduler.run(jobs, on_result)
+    finally:
+        if jsonl is not None and jsonl is not sys.stdout:
+            jsonl.close()
+        if store is not None:
+            store.close()
+        runtime.close()
+
+    if args.junit:
+        junit_tree(results).write(args.junit, encoding='utf-8', xml_declaration=True)
+    if args.spans:
+        collector.write_json(args.spans)
+    if args.metrics:
+        collector.write_prometheus(args.metrics)
+
+    passed = sum(1 for result in results if result.passed)
+    print(f"共{len(results)}个检验, 通过{passed}, 未通过{len(results) - passed}", file=progress)
+    return EXIT_PASSED if passed == len(results) else EXIT_FAILED
+
+
+async def run_async(args, scheduler, jobs, on_result):
+    """在一个事件循环中执行全部检验(见aio.py), 未指定设备的任务依次分配给各台设备"""
+    from .aio import AsyncThreadClient, create_async_client, evaluate_all
+
+    runtime = scheduler.runtime
+    if runtime.client.kind == 'replay':
+        client = AsyncThreadClient(runtime.client)
+    else:
+        client = await create_async_client(args.backend)
+    serials = itertools.cycle(scheduler.serials)
+    jobs = [(task, serial or next(serials)) for task, serial in jobs]
+    try:
+        return await evaluate_all(jobs, client, mode=runtime.mode, timeout=runtime.timeout,
+                                  watermark=runtime.watermark, concurrency=args.concurrency,
+                                  per_device=args.per_device, collector=scheduler.collector, on_result=on_result)
+    finally:
+        if client.kind != 'replay':
+            await client.close()
+
+
+def apk_build(runtime, serial, build, cache):
+    """结果所属的APP版本: 指定的版本, 或设备上安装的版本(每台设备只查询一次, 回放时为None)"""
+    build = build or os.environ.get('AUTOTEST_BUILD')
+    if build or runtime.client.kind == 'replay':
+        return build
+    if serial not in cache:
+        try:
+            cache[serial] = runtime.device(serial).apk_build()
+        except AdbError:
+            cache[serial] = None
+    return cache[serial]
+
+
+def compare(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    slower = regressions(baseline, current, args.quantile, args.tolerance, args.minimum)
+    for name, old, new in slower:
+        print(f"{name}: {args.quantile} {old * 1000:.2f}ms -> {new * 1000:.2f}ms (+{(new / old - 1) * 100:.0f}%)")
+    if not slower:
+        print(f"没有阶段的{args.quantile}耗时增加超过{args.tolerance:.0%}")
+    return EXIT_FAILED if slower else EXIT_PASSED
+
+
+def episode_record(capture, episode):
+    """episode结论对应的JSON对象"""
+    return {
+        'capture': capture,
+        'episode': episode.index,
+        'session': episode.session,
+        'events': episode.events,
+        'passed': [verdict.spec.task for verdict in episode.verdicts if verdict.passed],
+        'failures': {str(verdict.spec.task): verdict.failure.fail
+                     for verdict in episode.verdicts if not verdict.passed},
+    }
+
+
+def episodes(args):
+    from .checkspec import load_specs
+    from .episodes import follow_episodes, split_capture
+    from .replay import capture_name, find_captures
+    from .runtime import connect_device
+
+    specs = load_specs()
+    try:
+        if args.tasks:
+            tasks = set(parse_tasks(args.tasks))
+            specs = [spec for spec in specs if spec.task in tasks]
+        paths = [path for source in args.sources for path in find_captures(source)]
+    except (AdbError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not paths and not args.device:
+        print("错误: 需要指定录制的日志或--device", file=sys.stderr)
+        return EXIT_USAGE
+
+    progress = sys.stderr if args.jsonl == '-' else sys.stdout
+    jsonl = None
+    if args.jsonl:
+        jsonl = sys.stdout if args.jsonl == '-' else open(args.jsonl, 'w', encoding='utf-8')
+
+    def report(capture, episode):
+        if jsonl is not None:
+            jsonl.write(json.dumps(episode_record(capture, episode), ensure_ascii=False) + '\n')
+            jsonl.flush()
+        passed = [str(verdict.spec.task) for verdict in episode.verdicts if verdict.passed]
+        print(f"{capture} #{episode.index} ({episode.session or '起点标记之前'}): "
+              f"通过指令 {','.join(passed) or '无'} ({episode.events}个事件)", file=progress, flush=True)
+
+    try:
+        for path in paths:
+            with open(path, 'rb') as f:
+                for episode in split_capture(f.read(), specs):
+                    report(capture_name(path), episode)
+        if args.device:
+            device = connect_device(args.device)
+            if device is None:
+                print("错误: 找不到adb命令", file=sys.stderr)
+                return EXIT_USAGE
+            follow_episodes(device, specs, lambda episode: report(args.device, episode), args.duration)
+    finally:
+        if jsonl is not None and jsonl is not sys.stdout:
+            jsonl.close()
+    return EXIT_PASSED
+
+
+def stats(args):
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        print(f"错误: 无法识别的时间: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not os.path.exists(args.database):
+        print(f"错误: 找不到结果库 {args.database}", file=sys.stderr)
+        return EXIT_USAGE
+    by = None if args.by == 'all' else args.by
+    with ResultStore(args.database) as store:
+        summary = store.summary(by, since, until, task=args.task, serial=args.device, build=args.build)
+    if args.json:
+        print(json.dumps({str(key): dict(values._asdict()) for key, values in summary.items()}, ensure_ascii=False, indent=2))
+        return EXIT_PASSED
+    print(f"{args.by:<20}{'检验数':>8}{'通过率':>8}{'p50(s)':>9}{'p95(s)':>9}{'p99(s)':>9}")
+    # 指令按编号排序(1, 2, ..., 10), 不按字符串排序
+    order = (lambda item: int(item[0])) if by == 'task' else (lambda item: str(item[0]))
+    for key, values in sorted(summary.items(), key=order):
+        print(f"{str(key):<20}{values.count:>8}{values.rate:>8.1%}{values.p50:>9.2f}{values.p95:>9.2f}{values.p99:>9.2f}")
+    return EXIT_PASSED
+
+
+def serve(args):
+    from .daemon import serve as serve_daemon
+
+    mode = args.mode or ('batch' if args.backend == 'replay' else 'follow')
+    try:
+        asyncio.run(serve_daemon(args.listen, args.socket, args.backend, mode, args.timeout, args.watermark,
+                                 args.store, args.build, args.keep))
+    except (AdbError, OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    return EXIT_PASSED
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m AutoTest', description='Bilibili APP 自动化测试检验')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='批量执行检验')
+    run_parser.add_argument('--tasks', help='指令编号, 如 1-30 或 1-5,8 (默认全部)')
+    run_parser.add_argument('--devices', help='设备serial, 逗号分隔 (默认全部在线设备)')
+    run_parser.add_argument('--spread', action='store_true', help='每个指令只执行一次, 分配给空闲的设备 (默认每台设备都执行)')
+    run_parser.add_argument('--repeat', type=int, default=1, help='重复执行的轮数')
+    run_parser.add_argument('--backend', choices=('auto', 'wire', 'subprocess', 'replay'), help='adb客户端')
+    run_parser.add_argument('--replay', help='回放录制的日志(文件或目录), 代替真实设备')
+    run_parser.add_argument('--replay-speed', type=float, default=0, help='回放倍速, 0表示一次性输出')
+    run_parser.add_argument('--mode', choices=[mode for mode in MODES if mode != 'interactive'],
+                            help='等待方式 (默认follow, 回放时为batch)')
+    run_parser.add_argument('--timeout', type=float, help='follow模式下每个检验的最长等待时间(秒)')
+    run_parser.add_argument('--watermark', choices=WATERMARKS, help='检验起点的记录方式 (默认sentinel, 回放时为clear)')
+    run_parser.add_argument('--per-device', type=int, default=1, help='每台设备同时进行的检验数 (不能与clear同时使用)')
+    run_parser.add_argument('--async', dest='use_async', action='store_true',
+                            help='在一个asyncio事件循环中驱动全部设备 (见aio.py), 不再每台设备一个线程')
+    run_parser.add_argument('--concurrency', type=int, default=64, help='--async时同时进行的检验数上限')
+    run_parser.add_argument('--jsonl', help="JSON lines输出文件, '-'表示stdout")
+    run_parser.add_argument('--junit', help='JUnit XML输出文件')
+    run_parser.add_argument('--spans', help='各阶段耗时统计(JSON)输出文件')
+    run_parser.add_argument('--metrics', help='各阶段耗时统计(Prometheus文本格式)输出文件')
+    run_parser.add_argument('--store', help='追加写入的SQLite结果库')
+    run_parser.add_argument('--build', help='写入结果库的APP版本 (默认AUTOTEST_BUILD或设备上安装的版本)')
+    run_parser.add_argument('-q', '--quiet', action='store_true', help='不输出每个检验的进度')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help='比较两次--spans导出的耗时, 检查性能退化')
+    compare_parser.add_argument('baseline', help='基准耗时统计(JSON)')
+    compare_parser.add_argument('current', help='本次耗时统计(JSON)')
+    compare_parser.add_argument('--quantile', choices=('p50', 'p95', 'p99'), default='p95', help='比较的分位数')
+    compare_parser.add_argument('--tolerance', type=float, default=0.2, help='允许的增加比例')
+    compare_parser.add_argument('--minimum', type=float, default=0.001, help='低于此耗时(秒)的阶段不比较')
+    compare_parser.set_defaults(handler=compare)
+
+    episodes_parser = commands.add_parser('episodes', help='按会话起点标记切分日志并在每个episode上检验全部指令')
+    episodes_parser.add_argument('sources', nargs='*', help='录制文件或目录')
+    episodes_parser.add_argument('--device', help='跟随设备的日志流(而不是读取录制文件)')
+    episodes_parser.add_argument('--duration', type=float, help='跟随设备日志流的时长(秒), 默认直到日志流结束')
+    episodes_parser.add_argument('--tasks', help='只检验指定的指令, 如 1-5,8')
+    episodes_parser.add_argument('--jsonl', help="JSON lines输出文件, '-'表示stdout")
+    episodes_parser.set_defaults(handler=episodes)
+
+    stats_parser = commands.add_parser('stats', help='统计结果库中的通过率和耗时')
+    stats_parser.add_argument('database', help='run --store写入的结果库')
+    stats_parser.add_argument('--by', choices=('task', 'device', 'build', 'all'), default='task', help='分组方式')
+    stats_parser.add_argument('--since', help='起始时间(epoch秒或ISO格式, 如2026-10-01)')
+    stats_parser.add_argument('--until', help='截止时间(epoch秒或ISO格式)')
+    stats_parser.add_argument('--task', type=int, help='只统计指定指令')
+    stats_parser.add_argument('--device', help='只统计指定设备')
+    stats_parser.add_argument('--build', help='只统计指定APP版本')
+    stats_parser.add_argument('--json', action='store_true', help='以JSON输出')
+    stats_parser.set_defaults(handler=stats)
+
+    serve_parser = commands.add_parser('serve', help='启动常驻检验服务(本地HTTP接口)')
+    serve_parser.add_argument('--listen', help='监听地址 host:port (默认127.0.0.1:8765)')
+    serve_parser.add_argument('--socket', help='监听Unix socket路径(代替--listen)')
+    serve_parser.add_argument('--backend', choices=('auto', 'wire', 'subprocess', 'replay'), help='adb客户端')
+    serve_parser.add_argument('--mode', choices=('follow', 'batch'), help='默认的等待方式 (默认follow, 回放时为batch)')
+    serve_parser.add_argument('--timeout', type=float, help='follow模式下每个检验的默认最长等待时间(秒)')
+    serve_parser.add_argument('--watermark', choices=WATERMARKS, help='检验起点的记录方式 (默认sentinel, 回放时为clear)')
+    serve_parser.add_argument('--store', help='追加写入的SQLite结果库')
+    serve_parser.add_argument('--build', help='写入结果库的APP版本 (默认设备上安装的版本)')
+    serve_parser.add_argument('--keep', type=int, default=1000, help='保留的已结束检验数')
+    serve_parser.set_defaults(handler=serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
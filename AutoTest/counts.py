@@ -0,0 +1,148 @@
+"""
+数量的中文显示格式(万/亿)与解析
+
+APP中各处的数量显示(播放量、点赞数、粉丝数、观看人数)都是 String.format("%.1f万", count / 10000.0) 一类的写法,
+STYLES按显示函数整理为几种格式:
+- count: 1亿以上'x.x亿', 1万以上'x.x万', 否则为整数 (VideoPresenter.formatViewCount, UpPresenter.formatCount,
+  ContentPresenter.formatViewCount; UP主页的粉丝数)
+- wan: 1万以上'x.x万', 否则为整数, 没有亿 (VideoPresenter.formatCount, CollectPresenter/PersonPresenter/
+  UpPresenter.formatCommentCount 等)
+- viewers: 同wan, 末尾加'人' (LiveStream.getFormattedViewerCount, 直播观看人数)
+- fans: 同wan, 末尾加'粉丝' (VideoPresenter.formatFansCount)
+- wan_floor: 1万以上为整数的'x万'(整除, 舍去小数), 否则为整数 (GamePresenter.formatViewCount)
+
+保留一位小数时与Java的%.1f一致按四舍五入(HALF_UP): count / 10000.0 的最短十进制表示就是精确的商(最多4位小数),
+因此只用整数运算 (count + 500) // 1000 得到十分位, 不受浮点数误差影响。
+
+parse_count把显示文本还原为数值('1.2万' -> 12000, 也接受APP中没有用到的'千'和千分位逗号)。
+format_counts / parse_counts 批量处理一列数值, 安装了numpy时用numpy数组运算一次完成, 否则逐个处理, 结果相同。
+
+format_count(234500)                    # '23.5万'
+format_count(52439, 'viewers')          # '5.2万人'
+parse_count('5.2万人')                  # 52000
+"""
+import collections
+import re
+
+try:
+    import numpy
+except ImportError:  # numpy为可选依赖
+    numpy = None
+
+# units: (下限, 单位数值, 单位) 从大到小; decimals为0时整除
+Style = collections.namedtuple('Style', 'units decimals suffix')
+
+_WAN = ((10000, 10000, '万'),)
+STYLES = {
+    'count': Style(((100000000, 100000000, '亿'),) + _WAN, 1, ''),
+    'wan': Style(_WAN, 1, ''),
+    'viewers': Style(_WAN, 1, '人'),
+    'fans': Style(_WAN, 1, '粉丝'),
+    'wan_floor': Style(_WAN, 0, ''),
+}
+
+UNITS = {'亿': 100000000, '万': 10000, '千': 1000}
+_SUFFIXES = ('粉丝', '播放', '人')
+_NUMBER = re.compile(r'(\d+)(?:\.(\d+))?([亿万千]?)$')
+
+
+def format_count(count, style='count'):
+    """与APP中对应的格式化函数一致的显示文本"""
+    style = STYLES[style]
+    count = int(count)
+    for threshold, unit, label in style.units:
+        if count >= threshold:
+            if not style.decimals:
+                return f'{count // unit}{label}{style.suffix}'
+            # 十分位, 四舍五入
+            tenths = (count + unit // 20) // (unit // 10)
+            return f'{tenths // 10}.{tenths % 10}{label}{style.suffix}'
+    return f'{count}{style.suffix}'
+
+
+def format_counts(counts, style='count'):
+    """批量格式化, 返回list"""
+    if numpy is None or len(counts) == 0:
+        return [format_count(count, style) for count in counts]
+    spec = STYLES[style]
+    counts = numpy.asarray(counts, dtype=numpy.int64)
+    # 显示文本 = 整数部分 + 尾部; 尾部('.5万人'一类)只有几十种, 按编号查表, 整列只做一次整数到文本的转换
+    leading = counts.copy()
+    codes = numpy.zeros(len(counts), dtype=numpy.intp)
+    tails = [spec.suffix]
+    done = numpy.zeros(len(counts), dtype=bool)
+    for threshold, unit, label in spec.units:
+        selected = (counts >= threshold) & ~done
+        if spec.decimals:
+            tenths = (counts[selected] + unit // 20) // (unit // 10)
+            leading[selected] = tenths // 10
+            codes[selected] = len(tails) + tenths % 10
+            tails.extend(f'.{digit}{label}{spec.suffix}' for digit in range(10))
+        else:
+            leading[selected] = counts[selected] // unit
+            codes[selected] = len(tails)
+            tails.append(f'{label}{spec.suffix}')
+        done |= selected
+    return numpy.char.add(leading.astype('U20'), numpy.array(tails)[codes]).tolist()
+
+
+def _strip(text):
+    text = str(text).strip().replace(',', '')
+    for suffix in _SUFFIXES:
+        if text.endswith(suffix):
+            return text[:-len(suffix)]
+    return text
+
+
+def parse_count(text, default=None):
+    """显示文本还原为数值(单位换算后的整数), 无法解析时返回default"""
+    match = _NUMBER.match(_strip(text))
+    if match is None:
+        return default
+    whole, fraction, label = match.groups()
+    unit = UNITS.get(label, 1)
+    fraction = fraction or ''
+    scale = 10 ** len(fraction)
+    # 整数运算: '1.25万' -> 125 * 10000 // 100
+    return (int(whole + fraction) * unit + scale // 2) // scale
+
+
+def _drop_suffix(texts, suffix, marked):
+    """marked的项去掉末尾的suffix(按切片, 不是numpy.char.rstrip的按字符集合去除), 只处理marked的项"""
+    if marked.any():
+        texts[marked] = numpy.char.rpartition(texts[marked], suffix)[:, 0]
+
+
+def parse_counts(texts, default=None):
+    """批量解析, 返回list, 结果与逐个parse_count相同; 有无法解析的文本时逐个处理"""
+    if numpy is None or len(texts) == 0:
+        return [parse_count(text, default) for text in texts]
+    original = texts
+    texts = numpy.char.replace(numpy.char.strip(numpy.asarray(texts, dtype=str)), ',', '')
+    # 与_strip相同, 只去掉第一个匹配的后缀
+    stripped = numpy.zeros(len(texts), dtype=bool)
+    for suffix in _SUFFIXES:
+        marked = numpy.char.endswith(texts, suffix) & ~stripped
+        _drop_suffix(texts, suffix, marked)
+        stripped |= marked
+    units = numpy.ones(len(texts), dtype=numpy.int64)
+    # 单位的位数(10**k中的k), 用于检查是否超出int64
+    widths = numpy.zeros(len(texts), dtype=numpy.int64)
+    for label, unit in UNITS.items():
+        marked = numpy.char.endswith(texts, label) & (units == 1)
+        units[marked] = unit
+        widths[marked] = len(str(unit)) - 1
+        _drop_suffix(texts, label, marked)
+    # 与_NUMBER相同: 整数部分和可选的小数部分都是数字('1e3'、'-3'、'nan'、'1万万'等不匹配)
+    parts = numpy.char.partition(texts, '.')
+    whole, dot, fraction = parts[:, 0], parts[:, 1], parts[:, 2]
+    valid = numpy.char.isdecimal(whole) & ((dot == '') | numpy.char.isdecimal(fraction))
+    digits = numpy.char.add(whole, fraction)
+    lengths = numpy.char.str_len(digits)
+    # 乘以单位后不能超出int64
+    valid &= lengths + widths <= 18
+    if not valid.all():
+        return [parse_count(text, default) for text in original]
+    # 与parse_count相同的整数运算: '1.25万' -> 125 * 10000 // 100, 四舍五入
+    scales = 10 ** numpy.char.str_len(fraction).astype(numpy.int64)
+    return ((digits.astype(numpy.int64) * units + scales // 2) // scales).tolist()
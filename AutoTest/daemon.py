@@ -0,0 +1,669 @@
+"""
+常驻检验服务
+
+由智能体框架频繁调用检验时, 每次启动 python eval_N.py 都要重新启动解释器、导入模块、查找adb和读取assets。
+检验服务常驻于一个进程中, 通过本地HTTP接口(TCP端口或Unix socket)接受检验请求, 各次检验共享:
+- 一个asyncio adb客户端(见aio.py), 只在启动时选择一次
+- 预先加载的assets索引(assets.get_index)和编译好的检验规格与标记匹配器
+- 每台设备一个常驻的logcat跟随流(sentinel方式): 检验写入起点标记后直接从中取得之后的日志, 不再每次重新打开并读取整个缓冲区
+- 检验规格热更新: 每次开始检验时(每revalidate秒最多一次)比较specs目录下文件的mtime和大小, 修改过的规格重新加载,
+  格式错误时继续使用原来的规格; POST /reload 立即重新加载
+
+接口(请求和响应均为JSON):
+    GET    /health                  服务状态
+    GET    /specs                   全部检验规格
+    POST   /reload                  重新加载检验规格
+    POST   /runs                    开始检验 {"task": 5, "serial": "emulator-5554", "mode": "follow", "timeout": 60,
+                                             "wait": false}, wait为true时等到结论后再返回
+    GET    /runs/<id>?wait=<秒>     检验状态和结论, wait时最多等待指定秒数
+    GET    /runs/<id>/events        检验进度(JSON lines, 分块传输): 开始、各步骤标记出现、结论
+    DELETE /runs/<id>               取消检验
+
+用法:
+    python -m AutoTest serve --socket /tmp/autotest.sock
+    curl --unix-socket /tmp/autotest.sock -d '{"task": 5, "wait": true}' http://localhost/runs
+    python -m AutoTest serve --listen 127.0.0.1:8765 --store results.db
+"""
+import asyncio
+import collections
+import glob
+import http.client
+import itertools
+import json
+import os
+import signal
+import socket
+import time
+import urllib.parse
+
+from .adb import AdbError
+from .aio import AsyncCheck, AsyncDevice, create_async_client, run_check
+from .assets import get_index
+from .checkspec import SPEC_DIR, CheckEngine, CheckSpec, SpecError, predicate_label
+from .runtime import FOLLOW_COMMAND
+from .store import ResultStore
+
+DEFAULT_LISTEN = '127.0.0.1:8765'
+MAX_BODY = 1 << 20
+# 保留的已结束检验数
+DEFAULT_KEEP = 1000
+REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class SpecRegistry:
+    """specs目录下检验规格的缓存, 文件修改后重新加载"""
+
+    def __init__(self, directory=SPEC_DIR, revalidate=1.0):
+        self.directory = directory
+        self.revalidate = revalidate
+        self.generation = 0
+        self.errors = {}
+        self._specs = {}
+        self._stamps = {}
+        self._checked = float('-inf')
+
+    def refresh(self, force=False):
+        """重新加载修改过的规格, 返回本次重新加载的规格名称"""
+        now = time.monotonic()
+        if not force and now - self._checked < self.revalidate:
+            return []
+        self._checked = now
+        stamps = {}
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            stat = os.stat(path)
+            stamps[os.path.splitext(os.path.basename(path))[0]] = (path, stat.st_mtime_ns, stat.st_size)
+        reloaded = []
+        for name, stamp in stamps.items():
+            if self._stamps.get(name) == stamp:
+                continue
+            self._stamps[name] = stamp
+            try:
+                spec = CheckSpec.load(stamp[0])
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # 格式错误时继续使用原来的规格
+                self.errors[name] = f"{type(e).__name__}: {e}"
+                continue
+            self.errors.pop(name, None)
+            # 预先编译标记匹配器
+            CheckEngine([spec]).feed_text(b'')
+            self._specs[name] = spec
+            reloaded.append(name)
+        for name in set(self._specs) - set(stamps):
+            del self._specs[name]
+            self._stamps.pop(name, None)
+            reloaded.append(name)
+        if reloaded:
+            self.generation += 1
+        return reloaded
+
+    def get(self, task):
+        self.refresh()
+        spec = self._specs.get(f'eval_{task}')
+        if spec is None:
+            raise SpecError(f"没有指令{task}的检验规格")
+        return spec
+
+    def specs(self):
+        self.refresh()
+        return sorted(self._specs.values(), key=lambda spec: (spec.task is None, spec.task or 0, spec.name))
+
+
+class _Tap:
+    """LogTail的一个订阅者, 提供与AsyncStream相同的read/close"""
+
+    def __init__(self, tail):
+        self._tail = tail
+        self._queue = asyncio.Queue()
+
+    def push(self, data):
+        self._queue.put_nowait(data)
+
+    async def read(self, size=None):
+        return await self._queue.get()
+
+    async def close(self):
+        self._tail.taps.discard(self)
+
+
+class LogTail:
+    """设备上常驻的logcat跟随流, 读到的完整日志行分发给正在进行的各个检验"""
+
+    def __init__(self, device):
+        self.device = device
+        self.taps = set()
+        self.opened = 0
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    async def open(self):
+        """日志流未打开或已断开时打开"""
+        async with self._lock:
+            if self._task is None or self._task.done():
+                # 从设备当前时间(提前1秒, 避免时间精度的误差)开始跟随, 不输出缓冲区中更早的日志;
+                # 多出的几行在起点标记之前, 检验时会被跳过
+                since = await self.device.clock() - 1
+                stream = await self.device.client.open_stream(self.device.serial, f'{FOLLOW_COMMAND} -T {since:.3f}')
+                self.opened += 1
+                self._task = asyncio.create_task(self._pump(stream))
+
+    async def tap(self):
+        """订阅此后的日志(先订阅再等待日志流打开, 与之同时写入的起点标记不会错过)"""
+        tap = _Tap(self)
+        self.taps.add(tap)
+        try:
+            await self.open()
+        except BaseException:
+            self.taps.discard(tap)
+            raise
+        return tap
+
+    async def _pump(self, stream):
+        pending = b''
+        try:
+            while True:
+                chunk = await stream.read()
+                if not chunk:
+                    break
+                pending += chunk
+                cut = pending.rfind(b'\n') + 1
+                if not cut:
+                    continue
+                complete, pending = pending[:cut], pending[cut:]
+                for tap in self.taps:
+                    tap.push(complete)
+        except (AdbError, OSError):
+            pass
+        finally:
+            await stream.close()
+            # 日志流结束: 正在进行的检验按已收到的日志给出结论, 下一次检验重新打开
+            for tap in self.taps:
+                tap.push(b'')
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class ResidentDevice(AsyncDevice):
+    """sentinel方式下从常驻日志流中跟随日志的AsyncDevice"""
+
+    def __init__(self, client, serial=None, watermark=None):
+        super().__init__(client, serial, watermark)
+        self.tail = LogTail(self)
+        # clear方式会清除同一设备上其他检验的日志, 依次进行
+        self.lock = asyncio.Lock() if self.watermark == 'clear' else None
+        self.build = None
+
+    async def mark(self):
+        if self.watermark == 'sentinel':
+            # 起点标记需要在常驻日志流打开之后写入
+            await self.tail.open()
+        return await super().mark()
+
+    async def follow_logcat(self, since=None):
+        if since is None and self.watermark == 'sentinel':
+            return await self.tail.tap()
+        return await super().follow_logcat(since)
+
+
+class Run:
+    """一次检验请求"""
+
+    def __init__(self, run_id, spec, serial, mode, timeout):
+        self.id = run_id
+        self.spec = spec
+        self.serial = serial
+        self.mode = mode
+        self.timeout = timeout
+        self.created = time.time()
+        self.status = 'running'
+        self.result = None
+        # 检验以外的错误(没有result时)
+        self.error = None
+        self.events = []
+        self.changed = asyncio.Condition()
+        self.task = None
+        self._satisfied = [False] * len(spec.steps)
+
+    @property
+    def finished(self):
+        return self.status != 'running'
+
+    async def emit(self, event):
+        self.events.append(event)
+        async with self.changed:
+            self.changed.notify_all()
+
+    def progress(self, engine):
+        """follow模式下每处理一块日志后调用, 新出现的步骤标记作为进度事件"""
+        state = engine.states[0]
+        for index, (before, now) in enumerate(zip(self._satisfied, state.satisfied)):
+            if now and not before:
+                marker = '|'.join(predicate_label(predicate) for predicate in self.spec.steps[index].predicates)
+                self.events.append({'event': 'step', 'index': index, 'marker': marker,
+                                    'elapsed': round(time.time() - self.created, 6)})
+        self._satisfied = list(state.satisfied)
+        asyncio.get_running_loop().create_task(self._notify())
+
+    async def _notify(self):
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def wait(self, timeout=None):
+        async with self.changed:
+            try:
+                await asyncio.wait_for(self.changed.wait_for(lambda: self.finished), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def record(self):
+        record = {'id': self.id, 'task': self.spec.task, 'check': self.spec.function, 'serial': self.serial,
+                  'mode': self.mode, 'status': self.status}
+        result = self.result
+        if result is not None:
+            record.update({
+                'passed': result.passed,
+                'failure': result.failure,
+                'error': result.error,
+                'elapsed': round(result.elapsed, 6),
+                'steps': [{'name': name, 'elapsed': round(elapsed, 6)} for name, elapsed in result.steps],
+                'hits': None if result.hits is None else [{'marker': marker, 'hit': hit}
+                                                          for marker, hit in result.hits],
+            })
+        elif self.error is not None:
+            record['error'] = self.error
+        return record
+
+
+class EvalDaemon:
+    """常驻检验服务: 持有adb客户端、各设备的常驻日志流、检验规格和检验记录"""
+
+    def __init__(self, client, mode='follow', timeout=None, watermark=None, store=None, build=None,
+                 keep=DEFAULT_KEEP, registry=None):
+        self.client = client
+        self.mode = mode
+        self.timeout = timeout
+        self.watermark = watermark
+        self.store = store
+        self.build = build
+        self.keep = keep
+        self.registry = registry or SpecRegistry()
+        self.runs = collections.OrderedDict()
+        self.devices = {}
+        self.started = time.time()
+        self._ids = itertools.count(1)
+        self.counts = collections.Counter()
+
+    def warm(self):
+        """启动时加载全部检验规格和assets数据"""
+        self.registry.refresh(force=True)
+        index = get_index()
+        for name in index.names():
+            index.entry(name)
+
+    def device(self, serial):
+        device = self.devices.get(serial)
+        if device is None:
+            device = self.devices[serial] = ResidentDevice(self.client, serial, self.watermark)
+        return device
+
+    def start(self, task, serial=None, mode=None, timeout=None):
+        """开始一次检验, 返回Run"""
+        spec = self.registry.get(task)
+        mode = mode or self.mode
+        if mode not in ('follow', 'batch'):
+            raise ValueError(f"检验服务只支持follow和batch方式: {mode}")
+        run = Run(f'{next(self._ids):x}-{int(self.started) % 100000:05d}', spec, serial, mode,
+                  self.timeout if timeout is None else timeout)
+        self.runs[run.id] = run
+        run.task = asyncio.get_running_loop().create_task(self._execute(run))
+        self._trim()
+        return run
+
+    async def _execute(self, run):
+        try:
+            device = self.device(run.serial)
+            await run.emit({'event': 'started', 'task': run.spec.task, 'serial': run.serial})
+            if device.lock is not None:
+                async with device.lock:
+                    result = await run_check(AsyncCheck(run.spec), device, run.mode, run.timeout,
+                                             progress=run.progress)
+            else:
+                result = await run_check(AsyncCheck(run.spec), device, run.mode, run.timeout, progress=run.progress)
+            run.result = result
+            run.status = 'error' if result.error else 'passed' if result.passed else 'failed'
+            self.counts[run.status] += 1
+            if self.store is not None:
+                self.store.add(result, build=await self._build(device))
+        except asyncio.CancelledError:
+            if not run.finished:
+                run.status = 'cancelled'
+                self.counts['cancelled'] += 1
+            await run.emit({'event': 'cancelled'})
+            return
+        except Exception as e:
+            # 出错也要结束本次检验并通知等待结果的请求, 否则它们会一直等到超时
+            if not run.finished:
+                run.status = 'error'
+                self.counts['error'] += 1
+            run.error = f"{type(e).__name__}: {e}"
+        await run.emit({'event': 'verdict', **run.record()})
+
+    async def _build(self, device):
+        if self.build or self.client.kind == 'replay':
+            return self.build
+        if device.build is None:
+            try:
+                device.build = await device.apk_build() or ''
+            except AdbError:
+                device.build = ''
+        return device.build or None
+
+    def _trim(self):
+        finished = [run_id for run_id, run in self.runs.items() if run.finished]
+        for run_id in finished[:max(0, len(finished) - self.keep)]:
+            del self.runs[run_id]
+
+    def health(self):
+        running = sum(1 for run in self.runs.values() if not run.finished)
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'uptime': round(time.time() - self.started, 3),
+            'client': self.client.describe(),
+            'mode': self.mode,
+            'specs': len(self.registry.specs()),
+            'generation': self.registry.generation,
+            'spec_errors': self.registry.errors,
+            'running': running,
+            'finished': dict(self.counts),
+            'devices': {str(serial): {'watermark': device.watermark, 'subscribers': len(device.tail.taps),
+                                      'streams_opened': device.tail.opened}
+                        for serial, device in self.devices.items()},
+        }
+
+    async def close(self):
+        for run in list(self.runs.values()):
+            if run.task is not None and not run.task.done():
+                run.task.cancel()
+        await asyncio.gather(*(run.task for run in self.runs.values() if run.task is not None),
+                             return_exceptions=True)
+        for device in self.devices.values():
+            await device.tail.close()
+        await self.client.close()
+        if self.store is not None:
+            self.store.close()
+
+    # HTTP接口
+
+    async def handle(self, reader, writer):
+        """一个HTTP连接(支持keep-alive)"""
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, query, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    await self._dispatch(writer, method, path, query, body, keep_alive)
+                except HttpError as e:
+                    await _send_json(writer, e.status, {'error': e.message}, keep_alive)
+                except (AdbError, OSError) as e:
+                    await _send_json(writer, 500, {'error': f"{type(e).__name__}: {e}"}, keep_alive)
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            await _send_json(writer, e.status, {'error': e.message}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer, method, path, query, body, keep_alive):
+        parts = [part for part in path.split('/') if part]
+        if parts == ['health'] and method == 'GET':
+            return await _send_json(writer, 200, self.health(), keep_alive)
+        if parts == ['specs'] and method == 'GET':
+            return await _send_json(writer, 200, [{'task': spec.task, 'name': spec.name, 'function': spec.function,
+                                                   'subject': spec.subject} for spec in self.registry.specs()],
+                                    keep_alive)
+        if parts == ['reload'] and method == 'POST':
+            reloaded = self.registry.refresh(force=True)
+            get_index().clear()
+            return await _send_json(writer, 200, {'reloaded': reloaded, 'generation': self.registry.generation,
+                                                  'errors': self.registry.errors}, keep_alive)
+        if parts == ['runs'] and method == 'POST':
+            params = _json_body(body)
+            try:
+                run = self.start(int(params['task']), params.get('serial'), params.get('mode'),
+                                 _optional_float(params.get('timeout')))
+            except KeyError:
+                raise HttpError(400, "缺少task")
+            except (ValueError, TypeError) as e:
+                raise HttpError(400, str(e))
+            if params.get('wait'):
+                await run.wait()
+                return await _send_json(writer, 200, run.record(), keep_alive)
+            return await _send_json(writer, 202, run.record(), keep_alive)
+        if parts and parts[0] == 'runs' and len(parts) in (2, 3):
+            run = self.runs.get(parts[1])
+            if run is None:
+                raise HttpError(404, f"没有检验{parts[1]}")
+            if len(parts) == 3 and parts[2] == 'events' and method == 'GET':
+                return await self._stream_events(writer, run, keep_alive)
+            if len(parts) == 2 and method == 'GET':
+                if 'wait' in query:
+                    try:
+                        wait = _optional_float(query['wait'])
+                    except (ValueError, TypeError) as e:
+                        raise HttpError(400, str(e))
+                    await run.wait(wait)
+                return await _send_json(writer, 200, run.record(), keep_alive)
+            if len(parts) == 2 and method == 'DELETE':
+                if run.task is not None and not run.task.done():
+                    run.task.cancel()
+                    await asyncio.gather(run.task, return_exceptions=True)
+                return await _send_json(writer, 200, run.record(), keep_alive)
+            raise HttpError(405, f"不支持的请求: {method} {path}")
+        raise HttpError(404, f"没有此接口: {method} {path}")
+
+    async def _stream_events(self, writer, run, keep_alive):
+        """以分块传输逐行输出检验进度, 直到检验结束"""
+        writer.write(_head(200, 'application/x-ndjson', keep_alive, chunked=True))
+        sent = 0
+        while True:
+            async with run.changed:
+                await run.changed.wait_for(lambda: len(run.events) > sent or run.finished)
+            events, sent = run.events[sent:], len(run.events)
+            if events:
+                data = ''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in events).encode('utf-8')
+                writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+                await writer.drain()
+            if run.finished and sent == len(run.events):
+                break
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def _read_request(reader):
+    """读取一个HTTP请求, 连接关闭时返回None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HttpError(400, "无法识别的请求行")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length') or 0)
+    if length > MAX_BODY:
+        raise HttpError(413, "请求过大")
+    body = await reader.readexactly(length) if length else b''
+    url = urllib.parse.urlsplit(target)
+    query = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+    return method.upper(), url.path, query, headers, body
+
+
+def _head(status, content_type, keep_alive, length=None, chunked=False):
+    lines = [f'HTTP/1.1 {status} {REASONS.get(status, "")}', f'Content-Type: {content_type}',
+             f'Connection: {"keep-alive" if keep_alive else "close"}']
+    lines.append('Transfer-Encoding: chunked' if chunked else f'Content-Length: {length}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def _send_json(writer, status, value, keep_alive):
+    data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+    writer.write(_head(status, 'application/json; charset=utf-8', keep_alive, len(data)) + data)
+    await writer.drain()
+
+
+def _json_body(body):
+    try:
+        value = json.loads(body or b'{}')
+    except ValueError:
+        raise HttpError(400, "请求内容不是有效的JSON")
+    if not isinstance(value, dict):
+        raise HttpError(400, "请求内容需要是JSON对象")
+    return value
+
+
+def _optional_float(value):
+    return None if value in (None, '') else float(value)
+
+
+async def serve(listen=None, socket_path=None, backend=None, mode='follow', timeout=None, watermark=None,
+                store=None, build=None, keep=DEFAULT_KEEP, ready=None):
+    """运行检验服务直到收到SIGINT / SIGTERM"""
+    client = await create_async_client(backend)
+    daemon = EvalDaemon(client, mode=mode, timeout=timeout, watermark=watermark,
+                        store=ResultStore(store) if store else None, build=build, keep=keep)
+    daemon.warm()
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(daemon.handle, socket_path)
+        address = f'unix:{socket_path}'
+    else:
+        host, _, port = (listen or DEFAULT_LISTEN).rpartition(':')
+        server = await asyncio.start_server(daemon.handle, host or '127.0.0.1', int(port))
+        host, port = server.sockets[0].getsockname()[:2]
+        address = f'{host}:{port}'
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    print(f"检验服务已启动: {address} ({client.describe()}, {len(daemon.registry.specs())}个检验规格)", flush=True)
+    if ready is not None:
+        ready(address)
+    try:
+        await stop.wait()
+    finally:
+        server.close()
+        await server.wait_closed()
+        await daemon.close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class DaemonClient:
+    """
+    检验服务的同步客户端(保持一个keep-alive连接)
+    address为 'host:port' 或 'unix:/path/to/socket'
+    """
+
+    def __init__(self, address=DEFAULT_LISTEN, timeout=None):
+        self.address = address
+        self.timeout = timeout
+        self._connection = None
+
+    def _connect(self):
+        if self.address.startswith('unix:'):
+            return _UnixConnection(self.address[5:], timeout=self.timeout)
+        host, _, port = self.address.rpartition(':')
+        return http.client.HTTPConnection(host, int(port), timeout=self.timeout)
+
+    def request(self, method, path, body=None):
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = self._connect()
+            try:
+                self._connection.request(method, path, body=data,
+                                         headers={'Content-Type': 'application/json'} if data else {})
+                response = self._connection.getresponse()
+                value = json.loads(response.read() or b'null')
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # 服务端关闭了空闲连接时重新连接一次
+                self.close()
+                if attempt:
+                    raise
+        if response.status >= 400:
+            raise AdbError(f"检验服务返回{response.status}: {value.get('error') if isinstance(value, dict) else value}")
+        return value
+
+    def start(self, task, serial=None, mode=None, timeout=None):
+        return self.request('POST', '/runs', {'task': task, 'serial': serial, 'mode': mode, 'timeout': timeout})
+
+    def check(self, task, serial=None, mode=None, timeout=None):
+        """开始检验并等待结论"""
+        return self.request('POST', '/runs', {'task': task, 'serial': serial, 'mode': mode, 'timeout': timeout,
+                                              'wait': True})
+
+    def get(self, run_id, wait=None):
+        return self.request('GET', f'/runs/{run_id}' + ('' if wait is None else f'?wait={wait}'))
+
+    def events(self, run_id):
+        """逐个产出检验进度事件(dict), 检验结束时结束; 使用单独的连接"""
+        connection = self._connect()
+        try:
+            connection.request('GET', f'/runs/{run_id}/events')
+            response = connection.getresponse()
+            if response.status >= 400:
+                raise AdbError(f"检验服务返回{response.status}")
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            connection.close()
+
+    def reload(self):
+        return self.request('POST', '/reload')
+
+    def health(self):
+        return self.request('GET', '/health')
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,146 @@
+"""
+弹幕时间轴索引
+
+danmaku.json中每条弹幕有所属视频(videoId)、出现的播放时间点(videoTime, 秒)和类型(type), 按视频建立时间轴索引后:
+- visible(t): 播放到t秒时屏幕上的弹幕(出现时间 <= t < 出现时间 + 显示时长)
+- visible_counts(times): 一批时间点上屏幕上的弹幕数
+- window(start, end): 在[start, end)内出现的弹幕
+- density(): 每秒(或每bin_seconds秒)出现的弹幕数; hotspots(): 全部视频中弹幕最密集的时间段
+
+每个视频按类型分别保存按出现时间排序的数组和对应的消失时间数组: 同一类型的显示时长相同, 两个数组的顺序一致,
+"t时刻可见"的弹幕是 出现时间 <= t 的弹幕去掉 消失时间 <= t 的弹幕, 每个类型两次二分查找即可, 不需要通用的区间树。
+安装了numpy时数组为numpy数组, 批量查询用searchsorted/bincount一次完成; 没有numpy时用array + bisect逐个查询, 结果相同。
+
+时间轴作为oracle的期望值表(danmaku_timeline, 见oracle.py)构建, 随danmaku.json一起失效:
+timeline = get_oracle().expect('danmaku_timeline', 'vid001')
+timeline.visible(130)                   # ['dm002']
+timeline.visible_counts([0, 10, 20])    # [0, 1, 0]
+"""
+import array
+import bisect
+import heapq
+
+try:
+    import numpy
+except ImportError:  # numpy为可选依赖
+    numpy = None
+
+# 各类型弹幕的显示时长(秒): APP的播放页不渲染弹幕, 取B站播放器的默认值(滚动弹幕约8秒, 顶部/底部固定弹幕5秒)
+DISPLAY_SECONDS = {'SCROLL': 8.0, 'TOP': 5.0, 'BOTTOM': 5.0}
+# 与Danmaku.kt的默认值一致
+DEFAULT_TYPE = 'SCROLL'
+FIELDS = ('danmakuId', 'videoId', 'videoTime', 'type')
+
+
+class VideoTimeline:
+    """一个视频的弹幕时间轴: 类型 -> (按出现时间排序的出现时间数组, 消失时间数组, 弹幕ID)"""
+
+    __slots__ = ('lanes', 'count')
+
+    def __init__(self, lanes):
+        self.lanes = lanes
+        self.count = sum(len(ids) for _, _, ids in lanes.values())
+
+    def __len__(self):
+        return self.count
+
+    def visible(self, t):
+        """播放到t秒时屏幕上的弹幕ID(按出现时间排序)"""
+        found = []
+        for times, ends, ids in self.lanes.values():
+            low = bisect.bisect_right(ends, t)
+            high = bisect.bisect_right(times, t)
+            found.extend((times[position], ids[position]) for position in range(low, high))
+        found.sort()
+        return [danmaku_id for _, danmaku_id in found]
+
+    def visible_counts(self, times):
+        """各时间点上屏幕上的弹幕数; 有numpy时返回numpy数组, 否则返回list"""
+        if numpy is not None:
+            times = numpy.asarray(times, dtype=numpy.float64)
+            counts = numpy.zeros(len(times), dtype=numpy.int64)
+            for starts, ends, _ in self.lanes.values():
+                counts += starts.searchsorted(times, 'right')
+                counts -= ends.searchsorted(times, 'right')
+            return counts
+        counts = [0] * len(times)
+        for starts, ends, _ in self.lanes.values():
+            for position, t in enumerate(times):
+                counts[position] += bisect.bisect_right(starts, t) - bisect.bisect_right(ends, t)
+        return counts
+
+    def window(self, start, end):
+        """在[start, end)内出现的弹幕ID(按出现时间排序)"""
+        found = []
+        for times, _, ids in self.lanes.values():
+            low = bisect.bisect_left(times, start)
+            high = bisect.bisect_left(times, end)
+            found.extend((times[position], ids[position]) for position in range(low, high))
+        found.sort()
+        return [danmaku_id for _, danmaku_id in found]
+
+    def density(self, bin_seconds=1.0):
+        """每bin_seconds秒出现的弹幕数(第i项为[i * bin_seconds, (i + 1) * bin_seconds)), 没有弹幕时为空"""
+        if numpy is not None:
+            bins = [(starts // bin_seconds).astype(numpy.int64) for starts, _, _ in self.lanes.values()]
+            bins = numpy.concatenate(bins) if bins else numpy.zeros(0, dtype=numpy.int64)
+            return numpy.bincount(bins.clip(0)) if len(bins) else bins
+        counts = []
+        for starts, _, _ in self.lanes.values():
+            for t in starts:
+                position = max(int(t // bin_seconds), 0)
+                if position >= len(counts):
+                    counts.extend([0] * (position + 1 - len(counts)))
+                counts[position] += 1
+        return counts
+
+
+def add(lanes_by_video, source, record):
+    """oracle的累积函数: 按视频和类型收集弹幕的出现时间和ID"""
+    kind = record.get('type')
+    if kind not in DISPLAY_SECONDS:
+        kind = DEFAULT_TYPE
+    video = lanes_by_video.get(record.get('videoId'))
+    if video is None:
+        video = lanes_by_video[record.get('videoId')] = {}
+    lane = video.get(kind)
+    if lane is None:
+        lane = video[kind] = (array.array('d'), [])
+    lane[0].append(float(record.get('videoTime') or 0.0))
+    lane[1].append(record.get('danmakuId'))
+
+
+def finish(lanes_by_video):
+    """oracle的结束函数: 各类型按出现时间排序, 得到 视频ID -> VideoTimeline"""
+    timelines = {}
+    for video_id, video in lanes_by_video.items():
+        lanes = {}
+        for kind, (times, ids) in video.items():
+            duration = DISPLAY_SECONDS[kind]
+            if numpy is not None:
+                starts = numpy.frombuffer(times, dtype=numpy.float64)
+                order = starts.argsort(kind='stable')
+                starts = starts[order]
+                lanes[kind] = (starts, starts + duration, [ids[position] for position in order])
+            else:
+                order = sorted(range(len(times)), key=times.__getitem__)
+                starts = array.array('d', (times[position] for position in order))
+                lanes[kind] = (starts, array.array('d', (t + duration for t in starts)),
+                               [ids[position] for position in order])
+        timelines[video_id] = VideoTimeline(lanes)
+    return timelines
+
+
+def hotspots(timelines, limit=10, bin_seconds=1.0):
+    """全部视频中弹幕最密集的limit个时间段: [(弹幕数, 视频ID, 开始秒数), ...], 按弹幕数从多到少"""
+    def candidates():
+        for video_id, timeline in timelines.items():
+            counts = timeline.density(bin_seconds)
+            if numpy is not None and len(counts) > limit:
+                # 每个视频只需要取出自己最密集的limit个时间段
+                top = numpy.argpartition(counts, -limit)[-limit:]
+                yield from ((int(counts[position]), video_id, float(position * bin_seconds)) for position in top)
+            else:
+                yield from ((int(count), video_id, position * bin_seconds) for position, count in enumerate(counts))
+
+    return heapq.nlargest(limit, candidates())
@@ -0,0 +1,92 @@
+"""
+长日志的episode分段检验
+
+智能体评测中一个长episode可能依次尝试多个指令, 不再为每个eval_N.py各做一次清除/读取日志,
+而是只采集一份BilibiliAutoTest日志流, 按会话起点标记(AUTOTEST_SESSION, 见runtime.Device.write_sentinel)切分为episode,
+每个episode在全部已注册的检验规格上同时给出结论:
+- 切分与检验在同一遍扫描中完成, 起点标记只是匹配器词表中多出的一个标记
+- 同一个CheckEngine依次用于各个episode(reset), 增加检验规格几乎不增加I/O和扫描开销
+- 第一个起点标记之前的日志(如有)作为session为None的episode; 日志中没有起点标记时整段为一个episode
+
+EpisodeSplitter 可以接收录制文件的原始字节(feed_text), 也可以接收follow模式的日志事件(feed_events)。
+
+用法:
+    python -m AutoTest episodes 录制文件或目录... [--tasks 1-30] [--jsonl -]
+    python -m AutoTest episodes --device emulator-5554 --duration 600
+"""
+import collections
+
+from .checkspec import CheckEngine, _matcher, load_specs
+from .logcat import LogcatFollower
+from .markers import SESSION_MARKER
+from .runtime import FOLLOW_COMMAND
+
+Episode = collections.namedtuple('Episode', 'index session events verdicts')
+
+
+class EpisodeSplitter:
+    """按会话起点标记切分日志事件流, 每个episode结束时在全部规格上给出结论"""
+
+    def __init__(self, specs=None, on_episode=None):
+        self.engine = CheckEngine(load_specs() if specs is None else specs)
+        self.on_episode = on_episode
+        self.episodes = []
+        self._markers = self.engine.markers + (SESSION_MARKER,)
+        self._session = None
+        self._events = 0
+
+    def feed(self, marker, payload=''):
+        if marker == SESSION_MARKER:
+            self._close_episode()
+            self._session = payload.split()[0] if payload.strip() else ''
+            return
+        self._events += 1
+        self.engine.feed(marker, payload)
+
+    def feed_events(self, events):
+        """处理logcat.LogEvent序列(follow模式), 始终返回False以便持续跟随"""
+        for event in events:
+            self.feed(event.marker, event.payload)
+        return False
+
+    def feed_text(self, data):
+        """单遍扫描一段logcat输出(str或原始字节), 同时完成切分与检验"""
+        for marker, payload in _matcher(self._markers, self.engine.has_texts).events(data):
+            self.feed(marker, payload.strip())
+
+    def close(self):
+        """结束最后一个episode, 返回全部Episode"""
+        self._close_episode()
+        return self.episodes
+
+    def _close_episode(self):
+        # 第一个起点标记之前没有任何相关日志时不算一个episode
+        if self._session is None and not self._events:
+            return
+        episode = Episode(len(self.episodes), self._session, self._events, self.engine.verdicts())
+        self.episodes.append(episode)
+        if self.on_episode is not None:
+            self.on_episode(episode)
+        self.engine.reset()
+        self._events = 0
+
+
+def split_capture(data, specs=None):
+    """切分并检验一段录制的日志, 返回Episode列表"""
+    splitter = EpisodeSplitter(specs)
+    splitter.feed_text(data)
+    return splitter.close()
+
+
+def follow_episodes(device, specs=None, on_episode=None, duration=None):
+    """
+    跟随设备的日志流, 在每个episode结束(出现下一个起点标记)时回调on_episode
+    duration秒后或日志流结束时返回全部Episode
+    """
+    splitter = EpisodeSplitter(specs, on_episode)
+    follower = LogcatFollower(device.client.open_stream(device.serial, FOLLOW_COMMAND))
+    try:
+        follower.follow(splitter.feed_events, duration)
+    finally:
+        follower.close()
+    return splitter.close()
@@ -1,87 +1,18 @@
-import subprocess
 import os
-import shutil
+import sys
 
-def find_adb():
-    """查找adb命令路径"""
-    adb_path = shutil.which('adb')
-    if adb_path:
-        return adb_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from AutoTest.checkspec import run_spec
 
-    possible_paths = [
-        r'C:\Users\%USERNAME%\AppData\Local\Android\Sdk\platform-tools\adb.exe',
-        r'C:\Android\sdk\platform-tools\adb.exe',
-        r'D:\Android\sdk\platform-tools\adb.exe',
-        r'%LOCALAPPDATA%\Android\Sdk\platform-tools\adb.exe',
-    ]
 
-    for path in possible_paths:
-        expanded_path = os.path.expandvars(path)
-        if os.path.exists(expanded_path):
-            return expanded_path
-
-    return None
-
-def CheckFirstFavoriteDuration():
+def CheckFirstFavoriteDuration(serial=None):
     """
     检验逻辑:查看收藏页面上显示的视频时长
     只需进入收藏页面，页面会显示收藏视频的时长信息
     不需要点开视频
     """
-    try:
-        adb_cmd = find_adb()
-        if not adb_cmd:
-            print("错误: 找不到adb命令")
-            return False
-
-        print(f"使用adb路径: {adb_cmd}")
-
-        # step1. 清除旧的logcat日志
-        print("\n清除旧日志...")
-        subprocess.run([adb_cmd, 'logcat', '-c'],
-                      stderr=subprocess.PIPE,
-                      stdout=subprocess.PIPE)
-
-        print("=" * 60)
-        print("请在虚拟机中执行以下操作:")
-        print("1. 打开bilibili APP")
-        print("2. 进入'我的'页面")
-        print("3. 点击'我的收藏'")
-        print("4. 在收藏页面查看视频时长(不需要点开视频)")
-        print("=" * 60)
-
-        input("\n完成上述操作后，按回车键继续验证...")
-
-        # step2. 读取logcat日志
-        print("\n正在检查日志...")
-        result = subprocess.run(
-            [adb_cmd, 'logcat', '-d', '-s', 'BilibiliAutoTest:D'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-
-        log_content = result.stdout
-
-        # step3. 验证是否进入收藏页面
-        if 'FAVORITE_PAGE_ENTERED' not in log_content:
-            print("验证失败: 未检测到进入收藏页面")
-            return False
-
-        # step4. 验证是否成功加载收藏列表(列表中显示时长)
-        if 'FAVORITE_DATA_LOADED' not in log_content:
-            print("验证失败: 未检测到收藏列表加载")
-            return False
-
-        print("验证成功: 已进入收藏页面并显示视频时长!")
-        return True
+    return run_spec('eval_23', serial)
 
-    except subprocess.TimeoutExpired:
-        print("验证失败: 读取日志超时")
-        return False
-    except Exception as e:
-        print(f"检查收藏页面时发生错误: {str(e)}")
-        return False
 
 if __name__ == "__main__":
     result = CheckFirstFavoriteDuration()
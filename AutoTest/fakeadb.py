@@ -0,0 +1,542 @@
+"""
+本地模拟adb server
+
+实现了检验运行时用到的adb host协议子集, 用于在没有模拟器的环境下做基准测试:
+- host:version / host:devices / host:transport:<serial> / host:transport-any
+- 切换到设备后的 shell:<cmd> / exec:<cmd>, 其中支持 logcat -c / logcat -d 与持续输出的 logcat [-v 格式] [-s 过滤] [-T 起始时间],
+  以及写入日志的 log [-p 级别] -t 标签 内容、读取设备时间的 date +%s.%N 和读取APP版本的 dumpsys package
+
+ScriptedDevice 在每次检验开始(写入起点标记、读取设备时间或清除日志)后按脚本写出日志标记:
+- 标记序列(TASK_TRACES)与APP中BilibiliAutoTestLogger.kt对应操作输出的日志一致, 可选择指令、丢弃概率
+- 写出速率(行/秒)、开始前的操作时间和间隔抖动可配置, 也可以持续写出其他标签的噪声日志
+- 所有设备的定时写出共用一个线程(Emitter), 一台主机可以模拟数百台设备
+每台设备还可以为每个adb请求注入固定延迟和随机抖动, 日志缓冲区与真实设备一样有容量上限(超出后丢弃最早的日志)。
+随机数按设备的seed生成, 同样的参数可以复现同样的日志和延迟。
+
+同时提供一个最小的adb命令行替身(python -m AutoTest.fakeadb [-P 端口] [-s 设备] exec-out <cmd>),
+用于衡量"每次调用都启动一个adb进程"的原有方式的开销。
+
+    python -m AutoTest.fakeadb -P 5037 --devices 200 --rate 50 --latency 0.005 --jitter 0.002 serve
+"""
+import argparse
+import heapq
+import itertools
+import random
+import select
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from .markers import LOG_TAG, SESSION_MARKER
+
+DEFAULT_CAPACITY = 100000
+NOISE_TAGS = ('ActivityManager', 'chromium', 'OpenGLRenderer', 'BufferQueueProducer')
+
+# 完成每个指令时APP输出的日志标记(与BilibiliAutoTestLogger.kt的输出格式一致)
+TASK_TRACES = {
+    1: ['HOME_PAGE_ACTIVE', 'HISTORY_TAB_VIEWED', 'HISTORY_DATA_LOADED: 20'],
+    2: ['HOME_PAGE_ACTIVE', 'VIP_STATUS_VIEWED', 'VIP_DATA_LOADED:正式会员'],
+    3: ['HOME_PAGE_ACTIVE', 'SEARCH_INPUT: 游戏解说', 'SEARCH_BUTTON_CLICKED', 'GAME_SEARCH_PAGE_LOADED: 游戏解说'],
+    4: ['HOME_PAGE_ACTIVE', 'ANIMATION_CHANNEL_CLICKED', 'ANIMATION_CHANNEL_PAGE_ENTERED', 'ANIMATION_CHANNEL_DATA_LOADED'],
+    5: ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED: vid001', 'LIKE_BUTTON_CLICKED', 'LIKE_STATUS_CHANGED: liked'],
+    6: ['HOME_PAGE_ACTIVE', 'FAVORITE_TAB_CLICKED', 'FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED: 5'],
+    7: ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED: vid001', 'FAVORITE_BUTTON_CLICKED'],
+    8: ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED: vid001', 'VIDEO_PLAYBACK_STARTED'],
+    9: ['HOME_PAGE_ACTIVE', 'PersonTab'],
+    10: ['HOME_PAGE_ACTIVE', 'FULLSCREEN_BUTTON_CLICKED', 'FULLSCREEN_MODE_ENTERED'],
+    11: ['HOME_PAGE_ACTIVE', 'UPLOADER_PAGE_ENTERED: 逍遥散人', 'FANS_COUNT_DISPLAYED: 23.5万'],
+    12: ['HOME_PAGE_ACTIVE', 'OFFLINE_CACHE_PAGE_ENTERED', 'CACHE_LIST_LOADED'],
+    13: ['HOME_PAGE_ACTIVE', 'PAUSE_BUTTON_CLICKED', 'VIDEO_PAUSED'],
+    14: ['HOME_PAGE_ACTIVE', 'FIRST_DYNAMIC_CLICKED', 'DYNAMIC_DETAIL_OPENED'],
+    15: ['HOME_PAGE_ACTIVE', 'FOLLOW_PAGE_ENTERED', 'RECENT_VISIT_LOADED'],
+    16: ['HOME_PAGE_ACTIVE', 'COMMENT_PAGE_ENTERED', 'COMMENT_INPUT_TEXT: 谢谢分享！', 'SEND_BUTTON_CLICKED', 'COMMENT_SENT_SUCCESS'],
+    17: ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED: vid001', 'FOLLOW_BUTTON_CLICKED'],
+    18: ['HOME_PAGE_ACTIVE', 'UPLOADER_FOUND: 逍遥散人', 'UPLOADER_PAGE_ENTERED: 逍遥散人', 'UPLOADER_DATA_LOADED'],
+    19: ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED: vid001', 'COMMENT_PAGE_ENTERED', 'COMMENT_LIKE_CLICKED'],
+    20: ['HOME_PAGE_ACTIVE', 'SEARCH_INPUT: 游戏解说', 'SEARCH_BUTTON_CLICKED', 'GAME_SEARCH_PAGE_LOADED: 游戏解说'],
+    21: ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED: vid001', 'VIDEO_PAUSED'],
+    22: ['HOME_PAGE_ACTIVE', 'SEARCH_COMPLETED: 游戏解说', 'VIDEO_PLAYER_OPENED: vid001', 'LIKE_BUTTON_CLICKED'],
+    23: ['HOME_PAGE_ACTIVE', 'FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED: 5'],
+    24: ['HOME_PAGE_ACTIVE', 'FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED: 5', 'FAVORITE_COUNT_DISPLAYED: 5'],
+    25: ['HOME_PAGE_ACTIVE', 'VIDEO_PLAYER_OPENED: vid001', 'DANMAKU_SWITCH_CLICKED', 'DANMAKU_STATUS_CHANGED: off',
+         'DANMAKU_SWITCH_CLICKED', 'DANMAKU_STATUS_CHANGED: on'],
+    26: ['HOME_PAGE_ACTIVE', 'VIP_PAGE_ENTERED', 'VIP_EXPIRE_DATE_DISPLAYED: 2026-01-01'],
+    27: ['HOME_PAGE_ACTIVE', 'HISTORY_PAGE_ENTERED', 'HISTORY_ITEM_LONG_PRESSED', 'DELETE_BUTTON_CLICKED', 'HISTORY_ITEM_DELETED: count=8 id=hist016'],
+    28: ['HOME_PAGE_ACTIVE', 'COMMENT_PAGE_ENTERED', 'TOP_LIKED_COMMENT_FOUND: likes=156'],
+    29: ['HOME_PAGE_ACTIVE', 'SETTINGS_PAGE_ENTERED', 'TIMER_SHUTDOWN_CLICKED', 'TIMER_SHUTDOWN_STATUS_LOADED: off'],
+    30: ['HOME_PAGE_ACTIVE', 'LIVE_TAB_ENTERED', 'LIVE_RECOMMEND_LOADED', 'FIRST_LIVE_FOUND', 'LIVE_VIEWER_COUNT_DISPLAYED: 5.2万人'],
+}
+
+
+class FakeDevice:
+    """一台模拟设备, 保存logcat缓冲区"""
+
+    def __init__(self, serial, state='device', pid=4321, capacity=DEFAULT_CAPACITY, latency=0.0, jitter=0.0, seed=None):
+        self.serial = serial
+        self.state = state
+        self.pid = pid
+        self.entries = []
+        # 已被logcat -c清除或超出容量而丢弃的日志条数, 用于持续输出时定位新日志
+        self.cleared = 0
+        self.capacity = capacity
+        # 每个adb请求的固定延迟和随机抖动(秒)
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(serial if seed is None else seed)
+        # dumpsys package 报告的APP版本
+        self.version_name = '1.0'
+        self.version_code = 1
+        self.lock = threading.Condition()
+
+    def log(self, message, tag=LOG_TAG, level='D', timestamp=None):
+        """追加一条日志"""
+        with self.lock:
+            self.entries.append((time.time() if timestamp is None else timestamp,
+                                 self.pid, self.pid, level, tag, message))
+            if len(self.entries) > self.capacity:
+                overflow = len(self.entries) - self.capacity
+                del self.entries[:overflow]
+                self.cleared += overflow
+            self.lock.notify_all()
+
+    def respond_delay(self):
+        """处理一个adb请求前的延迟"""
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def clear(self):
+        with self.lock:
+            self.cleared += len(self.entries)
+            self.entries.clear()
+
+    def clock(self):
+        """设备时间(date +%s.%N)"""
+        return time.time()
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.entries)
+
+    def wait_entries(self, position, timeout=0.5):
+        """返回全局序号position之后的日志及新的序号, 暂无新日志时最多等待timeout秒"""
+        with self.lock:
+            if position < self.cleared:
+                position = self.cleared
+            if position - self.cleared >= len(self.entries):
+                self.lock.wait(timeout)
+            entries = self.entries[position - self.cleared:]
+            return entries, self.cleared + len(self.entries)
+
+
+class Emitter:
+    """按计划时间执行写出操作的共享线程, 所有ScriptedDevice共用"""
+
+    def __init__(self):
+        self._queue = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='fake-adb-emitter', daemon=True)
+        self._thread.start()
+
+    def schedule(self, when, action):
+        """在time.monotonic()为when时执行action()"""
+        with self._cond:
+            heapq.heappush(self._queue, (when, next(self._counter), action))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    self._cond.wait(self._queue[0][0] - time.monotonic() if self._queue else None)
+                _, _, action = heapq.heappop(self._queue)
+            action()
+
+
+_emitter = None
+_emitter_lock = threading.Lock()
+
+
+def get_emitter():
+    global _emitter
+    with _emitter_lock:
+        if _emitter is None:
+            _emitter = Emitter()
+        return _emitter
+
+
+class ScriptedDevice(FakeDevice):
+    """
+    每次检验开始后按脚本写出日志标记的模拟设备
+    tasks: 写出哪些指令的标记(默认全部); per_session='all'时每次检验写出全部指令, 'cycle'时每次依次写出一个指令
+    rate: 每秒写出的标记数(0表示一次全部写出); start_delay: 检验开始到第一条标记的操作时间; interval_jitter: 间隔的随机比例
+    drop: 每条标记被丢弃的概率(模拟未完成的操作); noise_rate: 每秒写出的其他标签日志数(持续写出)
+    """
+
+    def __init__(self, serial, tasks=None, per_session='all', rate=0.0, start_delay=0.05, interval_jitter=0.0,
+                 drop=0.0, noise_rate=0.0, emitter=None, **kwargs):
+        super().__init__(serial, **kwargs)
+        self.tasks = list(tasks or TASK_TRACES)
+        self.per_session = per_session
+        self.rate = rate
+        self.start_delay = start_delay
+        self.interval_jitter = interval_jitter
+        self.drop = drop
+        self.noise_rate = noise_rate
+        self.sessions = 0
+        self._emitter = emitter or get_emitter()
+        self._stopped = False
+        if noise_rate > 0:
+            self._emitter.schedule(time.monotonic() + self._interval(noise_rate), self._noise)
+
+    def session_trace(self):
+        """本次检验要写出的日志标记"""
+        if self.per_session == 'cycle':
+            tasks = [self.tasks[self.sessions % len(self.tasks)]]
+        else:
+            tasks = self.tasks
+        self.sessions += 1
+        return [message for task in tasks for message in TASK_TRACES[task]
+                if not (self.drop and self.random.random() < self.drop)]
+
+    def start_script(self):
+        trace = self.session_trace()
+        when = time.monotonic() + self.start_delay
+        if not self.rate:
+            self._emitter.schedule(when, lambda: [self.log(message) for message in trace])
+            return
+        for message in trace:
+            self._emitter.schedule(when, lambda message=message: self.log(message))
+            when += self._interval(self.rate)
+
+    def _interval(self, rate):
+        interval = 1 / rate
+        if self.interval_jitter:
+            interval *= 1 + self.random.uniform(-self.interval_jitter, self.interval_jitter)
+        return interval
+
+    def _noise(self):
+        if self._stopped:
+            return
+        self.log(f'noise {self.random.random():.6f}', tag=self.random.choice(NOISE_TAGS), level='I')
+        self._emitter.schedule(time.monotonic() + self._interval(self.noise_rate), self._noise)
+
+    def stop(self):
+        self._stopped = True
+
+    def log(self, message, *args, **kwargs):
+        super().log(message, *args, **kwargs)
+        if message.startswith(SESSION_MARKER):
+            self.start_script()
+
+    def clock(self):
+        now = super().clock()
+        self.start_script()
+        return now
+
+    def clear(self):
+        super().clear()
+        self.start_script()
+
+
+def format_entry(entry, fmt='threadtime'):
+    """按logcat的输出格式格式化一条日志"""
+    timestamp, pid, tid, level, tag, message = entry
+    if fmt == 'epoch':
+        return f'{timestamp:16.3f} {pid:5d} {tid:5d} {level} {tag}: {message}\n'
+    if fmt == 'brief':
+        return f'{level}/{tag}({pid:5d}): {message}\n'
+    local = time.localtime(timestamp)
+    millis = int(timestamp * 1000) % 1000
+    return (f'{time.strftime("%m-%d %H:%M:%S", local)}.{millis:03d} '
+            f'{pid:5d} {tid:5d} {level} {tag}: {message}\n')
+
+
+def parse_logcat_args(args):
+    """解析logcat参数, 返回(选项字典, 标签过滤器)"""
+    options = {'clear': False, 'dump': False, 'format': 'threadtime', 'since': None}
+    filters = []
+    silent = False
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        if arg == '-c':
+            options['clear'] = True
+        elif arg == '-d':
+            options['dump'] = True
+        elif arg == '-v':
+            index += 1
+            options['format'] = args[index]
+        elif arg == '-T':
+            index += 1
+            options['since'] = float(args[index])
+        elif arg == '-s':
+            silent = True
+        elif ':' in arg:
+            filters.append(arg.split(':', 1)[0])
+        index += 1
+    return options, (filters if silent else None)
+
+
+def format_entries(entries, options, tags):
+    since = options['since']
+    lines = [format_entry(entry, options['format']) for entry in entries
+             if (tags is None or entry[4] in tags) and (since is None or entry[0] >= since)]
+    return ''.join(lines).encode('utf-8')
+
+
+def run_logcat(device, args):
+    """在模拟设备上执行一次性的logcat命令(-c / -d), 返回输出字节"""
+    options, tags = parse_logcat_args(args)
+    if options['clear']:
+        device.clear()
+        return b''
+    return format_entries(device.snapshot(), options, tags)
+
+
+def run_log(device, args):
+    """在模拟设备上执行 log [-p 级别] [-t 标签] 内容"""
+    level, tag = 'I', 'log'
+    index = 0
+    while index < len(args) and args[index] in ('-p', '-t'):
+        if args[index] == '-p':
+            level = args[index + 1].upper()
+        else:
+            tag = args[index + 1]
+        index += 2
+    device.log(' '.join(args[index:]), tag=tag, level=level)
+
+
+class FakeAdbServer:
+    """模拟adb server, 可作为上下文管理器使用"""
+
+    def __init__(self, host='127.0.0.1', port=0, devices=None):
+        self.devices = {}
+        for device in devices or []:
+            self.add_device(device)
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server.handle_connection(self.request)
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+            # 默认的listen队列只有5, 并发连接多时SYN被丢弃, 客户端要等1秒重传
+            request_queue_size = 1024
+
+        self._server = Server((host, port), Handler)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def add_device(self, device):
+        if isinstance(device, str):
+            device = FakeDevice(device)
+        self.devices[device.serial] = device
+        return device
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-adb-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+        for device in self.devices.values():
+            if hasattr(device, 'stop'):
+                device.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def _recv_request(sock):
+        header = b''
+        while len(header) < 4:
+            chunk = sock.recv(4 - len(header))
+            if not chunk:
+                return None
+            header += chunk
+        length = int(header, 16)
+        payload = b''
+        while len(payload) < length:
+            chunk = sock.recv(length - len(payload))
+            if not chunk:
+                return None
+            payload += chunk
+        return payload.decode('utf-8')
+
+    @staticmethod
+    def _okay(sock, payload=None):
+        if payload is None:
+            sock.sendall(b'OKAY')
+        else:
+            data = payload.encode('utf-8')
+            sock.sendall(b'OKAY' + b'%04x' % len(data) + data)
+
+    @staticmethod
+    def _fail(sock, message):
+        data = message.encode('utf-8')
+        sock.sendall(b'FAIL' + b'%04x' % len(data) + data)
+
+    def _find_device(self, serial):
+        if serial is None:
+            online = [device for device in self.devices.values() if device.state == 'device']
+            if len(online) == 1:
+                return online[0], None
+            return None, 'no devices/emulators found' if not online else 'more than one device/emulator'
+        device = self.devices.get(serial)
+        if device is None:
+            return None, f"device '{serial}' not found"
+        return device, None
+
+    def handle_connection(self, sock):
+        device = None
+        try:
+            while True:
+                request = self._recv_request(sock)
+                if request is None:
+                    return
+                if request == 'host:version':
+                    self._okay(sock, '0029')
+                    return
+                if request == 'host:devices':
+                    self._okay(sock, ''.join(f'{d.serial}\t{d.state}\n' for d in self.devices.values()))
+                    return
+                if request.startswith('host:transport'):
+                    serial = None if request == 'host:transport-any' else request.split(':', 2)[2]
+                    device, error = self._find_device(serial)
+                    if error:
+                        self._fail(sock, error)
+                        return
+                    self._okay(sock)
+                    continue
+                if request.startswith(('shell:', 'exec:')) and device is not None:
+                    device.respond_delay()
+                    self.handle_service(sock, device, request.split(':', 1)[1])
+                    return
+                self._fail(sock, f'unsupported request: {request}')
+                return
+        except (ConnectionError, OSError):
+            return
+        finally:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def handle_service(self, sock, device, command):
+        args = command.split()
+        self._okay(sock)
+        if args and args[0] == 'log':
+            run_log(device, args[1:])
+            return
+        if args and args[0] == 'date':
+            sock.sendall(f'{device.clock():.9f}\n'.encode('ascii'))
+            return
+        if args[:2] == ['dumpsys', 'package']:
+            sock.sendall(f'    versionCode={device.version_code} minSdk=24 targetSdk=34\n'
+                         f'    versionName={device.version_name}\n'.encode('utf-8'))
+            return
+        if not args or args[0] != 'logcat':
+            return
+        options, tags = parse_logcat_args(args[1:])
+        if options['clear'] or options['dump']:
+            sock.sendall(run_logcat(device, args[1:]))
+            return
+
+        # 持续输出: 先输出缓冲区中的日志, 之后有新日志时立即推送, 直到客户端断开
+        position = 0
+        while not self._stopping.is_set() and not self._client_closed(sock):
+            entries, position = device.wait_entries(position)
+            if entries:
+                sock.sendall(format_entries(entries, options, tags))
+
+    @staticmethod
+    def _client_closed(sock):
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b''
+
+
+def _client_request(host, port, serial, command):
+    """adb命令行替身: 每次调用都新建连接, 与adb客户端进程的行为一致"""
+    sock = socket.create_connection((host, port))
+    try:
+        for request in (f'host:transport:{serial}' if serial else 'host:transport-any', f'exec:{command}'):
+            data = request.encode('utf-8')
+            sock.sendall(b'%04x' % len(data) + data)
+            status = sock.recv(4)
+            if status != b'OKAY':
+                message = sock.recv(65536)[4:].decode('utf-8', 'replace')
+                sys.stderr.write(f'error: {message}\n')
+                return 1
+        out = sys.stdout.buffer
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            out.write(chunk)
+        out.flush()
+        return 0
+    finally:
+        sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='模拟adb server / adb命令行替身')
+    parser.add_argument('-H', dest='host', default='127.0.0.1')
+    parser.add_argument('-P', dest='port', type=int, default=5037)
+    parser.add_argument('-s', dest='serial')
+    parser.add_argument('--devices', type=int, help='serve: 模拟设备数量(serial为emulator-5554起)')
+    parser.add_argument('--tasks', help='serve: 写出哪些指令的标记, 如 1-5,8 (默认全部)')
+    parser.add_argument('--per-session', choices=('all', 'cycle'), default='all', help='serve: 每次检验写出全部指令或依次一个')
+    parser.add_argument('--rate', type=float, default=0, help='serve: 每秒写出的标记数, 0表示一次全部写出')
+    parser.add_argument('--start-delay', type=float, default=0.05, help='serve: 检验开始到第一条标记的时间(秒)')
+    parser.add_argument('--drop', type=float, default=0, help='serve: 每条标记被丢弃的概率')
+    parser.add_argument('--noise-rate', type=float, default=0, help='serve: 每台设备每秒写出的噪声日志数')
+    parser.add_argument('--latency', type=float, default=0, help='serve: 每个adb请求的固定延迟(秒)')
+    parser.add_argument('--jitter', type=float, default=0, help='serve: 每个adb请求的随机延迟上限(秒)')
+    parser.add_argument('--seed', type=int, default=0, help='serve: 随机数种子')
+    parser.add_argument('command', nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    if not args.command:
+        parser.error('缺少命令')
+    if args.command[0] == 'serve':
+        serials = args.command[1:] or [f'emulator-{5554 + 2 * index}' for index in range(args.devices or 1)]
+        tasks = None
+        if args.tasks:
+            from .scheduler import parse_tasks
+
+            tasks = parse_tasks(args.tasks)
+        devices = [ScriptedDevice(serial, tasks=tasks, per_session=args.per_session, rate=args.rate,
+                                  start_delay=args.start_delay, drop=args.drop, noise_rate=args.noise_rate,
+                                  latency=args.latency, jitter=args.jitter, seed=args.seed + index)
+                   for index, serial in enumerate(serials)]
+        server = FakeAdbServer(args.host, args.port, devices=devices).start()
+        print(f'模拟adb server已启动: {server.host}:{server.port}, {len(devices)}台设备')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+        return 0
+    if args.command[0] == 'exec-out':
+        return _client_request(args.host, args.port, args.serial, ' '.join(args.command[1:]))
+    if args.command[0] == 'logcat':
+        return _client_request(args.host, args.port, args.serial, ' '.join(args.command))
+    parser.error(f'不支持的命令: {args.command[0]}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+观看历史按天分组的索引
+
+watch_history.json中的watchTime是UTC毫秒时间戳, "昨天观看的视频"取决于设备时区和当前日期。
+HistoryDays在构建时把每条记录换算为设备时区的日期(按天编号, 即date.toordinal()), 建立:
+- 记录ID -> 日期: get(history_id) 返回相对今天的天数(0为今天, -1为昨天), O(1)
+- 日期 -> 记录ID: on(-1) 为昨天观看的记录(按文件顺序)
+
+时区和"今天"可以配置(检验机器的时钟和时区不一定与设备一致, 内置数据的日期也是固定的):
+- AUTOTEST_TZ: 设备时区(IANA名称), 默认Asia/Shanghai; 构建索引时读取
+- AUTOTEST_NOW: 当前时间, 毫秒时间戳或 'YYYY-MM-DD[ HH:MM[:SS]]'(设备时区), 默认为检验机器的当前时间; 每次查询时读取
+
+换算日期时按UTC日缓存时区偏移: 一天的开始和结束偏移相同(全年只有切换夏令时的几天例外)时整天共用一个偏移,
+观看历史集中在最近几个月时, 百万条记录只需要调用几百次时区库。
+
+索引作为oracle的期望值表(history_days, 见oracle.py)构建, 随watch_history.json一起失效:
+days = get_oracle().table('history_days')
+days.get('hist016')                     # -1: 昨天观看
+days.on(-1)                             # ('hist016', 'hist017', ...)
+"""
+import datetime
+import os
+import time
+
+DEFAULT_TIMEZONE = 'Asia/Shanghai'
+FIELDS = ('historyId', 'watchTime')
+
+_DAY_MS = 86400000
+# 1970-01-01 的日期编号
+_EPOCH_ORDINAL = 719163
+
+
+def device_timezone(name=None):
+    """设备时区: name或AUTOTEST_TZ指定的IANA时区; 没有时区数据库(如Windows未安装tzdata)时使用东八区"""
+    name = name or os.environ.get('AUTOTEST_TZ') or DEFAULT_TIMEZONE
+    try:
+        import zoneinfo
+        return zoneinfo.ZoneInfo(name)
+    except (ImportError, LookupError, ValueError):
+        return datetime.timezone(datetime.timedelta(hours=8), DEFAULT_TIMEZONE)
+
+
+def now_ms(timezone):
+    """当前时间(毫秒), AUTOTEST_NOW可以指定为毫秒时间戳或设备时区的日期时间"""
+    value = os.environ.get('AUTOTEST_NOW', '').strip()
+    if not value:
+        return int(time.time() * 1000)
+    if value.isdigit():
+        return int(value)
+    try:
+        moment = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"无法识别的AUTOTEST_NOW: {value!r} (应为毫秒时间戳或 'YYYY-MM-DD[ HH:MM[:SS]]')") from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone)
+    return int(moment.timestamp() * 1000)
+
+
+class HistoryDays:
+    """观看历史的日期索引"""
+
+    def __init__(self, timezone=None):
+        self.timezone = timezone or device_timezone()
+        self._day_of = {}
+        self._days = {}
+        self._offsets = {}
+
+    def __len__(self):
+        return len(self._day_of)
+
+    def ordinal(self, epoch_ms):
+        """毫秒时间戳在设备时区的日期编号(date.toordinal())"""
+        utc_day = epoch_ms // _DAY_MS
+        offset = self._offsets.get(utc_day)
+        if offset is None:
+            start, end = (datetime.datetime.fromtimestamp(moment / 1000, self.timezone).utcoffset()
+                          for moment in (utc_day * _DAY_MS, (utc_day + 1) * _DAY_MS - 1))
+            # 当天有时区切换时记为False, 逐条换算
+            offset = self._offsets[utc_day] = start == end and int(start.total_seconds() * 1000)
+        if offset is False:
+            return datetime.datetime.fromtimestamp(epoch_ms / 1000, self.timezone).toordinal()
+        return (epoch_ms + offset) // _DAY_MS + _EPOCH_ORDINAL
+
+    def add(self, history_id, watch_time):
+        day = self.ordinal(int(watch_time))
+        self._day_of[history_id] = day
+        ids = self._days.get(day)
+        if ids is None:
+            ids = self._days[day] = []
+        ids.append(history_id)
+
+    def today(self):
+        """设备时区的今天(日期编号)"""
+        return self.ordinal(now_ms(self.timezone))
+
+    def day(self, history_id):
+        """记录的观看日期(date), 记录不存在时返回None"""
+        day = self._day_of.get(history_id)
+        return None if day is None else datetime.date.fromordinal(day)
+
+    def get(self, history_id, default=None):
+        """记录的观看日期相对今天的天数(0为今天, -1为昨天), 也用于oracle.expect('history_days', 记录ID)"""
+        day = self._day_of.get(history_id)
+        return default if day is None else day - self.today()
+
+    def on(self, day):
+        """某天观看的记录ID; day为相对今天的天数(int)或date"""
+        ordinal = day.toordinal() if isinstance(day, datetime.date) else self.today() + day
+        return tuple(self._days.get(ordinal, ()))
+
+    def counts(self):
+        """各日期的记录数: {date: 条数}, 按日期排序"""
+        return {datetime.date.fromordinal(day): len(ids) for day, ids in sorted(self._days.items())}
+
+
+def add(days, source, record):
+    """oracle的累积函数"""
+    if record.get('historyId') is not None and record.get('watchTime') is not None:
+        days.add(record['historyId'], record['watchTime'])
@@ -0,0 +1,193 @@
+"""
+合成logcat负载生成器
+
+生成与真实检验相似、但规模大得多的logcat录制(可达数百万行), 用于衡量检验逻辑随日志增长的表现:
+- 日志由若干episode组成, 每个episode以会话起点标记(AUTOTEST_SESSION)开始, 完成一个随机指令的操作(TASK_TRACES),
+  部分标记被丢弃(模拟未完成的操作)
+- Compose重组导致的重复日志: 同一个BilibiliAutoTest标记连续重复输出多次
+- 偶发的其他BilibiliAutoTest日志, 覆盖BilibiliAutoTestLogger.kt的全部78种标记(LOGGER_MESSAGES)
+- 其他标签的噪声日志, 含中文内容
+- 格式异常的行: 被截断的行、无标签的行、非法UTF-8字节、logcat的分区提示行和空行
+
+同样的参数和seed生成同样的日志。输出为logcat -v threadtime(默认)或 -v epoch 格式的原始字节。
+
+用法: python -m AutoTest.loadgen -o capture.log [--lines 2000000] [--seed 0] [--format threadtime]
+"""
+import argparse
+import random
+import sys
+import time
+
+from .fakeadb import TASK_TRACES, format_entry
+from .markers import LOG_TAG, SESSION_MARKER
+
+# BilibiliAutoTestLogger.kt输出的全部日志标记, 以及各参数的取值
+LOGGER_MESSAGES = (
+    ('FAVORITE_TAB_CLICKED', ()), ('FAVORITE_PAGE_ENTERED', ()), ('FAVORITE_DATA_LOADED', ('0', '5', '12')),
+    ('FAVORITE_BUTTON_CLICKED', ()), ('FAVORITE_STATUS_CHANGED', ('favorited', 'unfavorited')),
+    ('FAVORITE_COUNT_DISPLAYED', ('0', '5', '12')), ('VIDEO_PLAYER_OPENED', ('vid001', 'vid002', 'BV1xx411c7mD')),
+    ('VIDEO_PLAYBACK_STARTED', ()), ('VIDEO_PAUSED', ()), ('PAUSE_BUTTON_CLICKED', ()), ('PAUSE_ACTION_TRIGGERED', ()),
+    ('FULLSCREEN_MODE_ENTERED', ()), ('FULLSCREEN_BUTTON_CLICKED', ()),
+    ('UPLOADER_PAGE_ENTERED', ('逍遥散人', '罗翔说刑法', '')), ('UPLOADER_FOUND', ('逍遥散人', '罗翔说刑法')),
+    ('UPLOADER_DATA_LOADED', ()), ('FANS_COUNT_DISPLAYED', ('23.5万', '3.2万', '987')),
+    ('FOLLOW_PAGE_ENTERED', ()), ('FOLLOW_LIST_ENTERED', ()), ('FOLLOW_BUTTON_CLICKED', ()),
+    ('FOLLOW_STATUS_CHANGED', ('followed', 'unfollowed')), ('RECENT_VISIT_TAB_CLICKED', ()), ('RECENT_VISIT_LOADED', ()),
+    ('DYNAMIC_LIST_LOADED', ()), ('FIRST_DYNAMIC_CLICKED', ()), ('DYNAMIC_DETAIL_OPENED', ()),
+    ('COMMENT_PAGE_ENTERED', ()), ('COMMENT_LIST_LOADED', ()), ('COMMENT_LIKE_CLICKED', ()),
+    ('COMMENT_LIKE_STATUS_CHANGED', ()), ('REPLY_BUTTON_CLICKED', ()),
+    ('COMMENT_INPUT_TEXT', ('谢谢分享！', '前排围观', '太好笑了哈哈哈')), ('SEND_BUTTON_CLICKED', ()),
+    ('COMMENT_SENT_SUCCESS', ()), ('SORT_BY_LIKES_SELECTED', ()), ('TOP_LIKED_COMMENT_FOUND', ('likes=156', 'likes=37')),
+    ('SEARCH_INPUT', ('游戏解说', '鬼畜', '美食')), ('SEARCH_BUTTON_CLICKED', ()),
+    ('SEARCH_COMPLETED', ('游戏解说', '鬼畜', '美食')), ('SEARCH_RESULTS_PAGE_ENTERED', ()),
+    ('SEARCH_RESULTS_COUNT_DISPLAYED', ('20', '3')), ('FIRST_SEARCH_RESULT_CLICKED', ()), ('GAME_SEARCH_PAGE_LOADED', ()),
+    ('LIKE_BUTTON_CLICKED', ()), ('LIKE_STATUS_CHANGED', ('liked', 'unliked')), ('OFFLINE_CACHE_PAGE_ENTERED', ()),
+    ('CACHE_LIST_LOADED', ()), ('HISTORY_PAGE_ENTERED', ()), ('HISTORY_DATA_LOADED', ('20', '7')),
+    ('YESTERDAY_VIDEO_FOUND', ()), ('HISTORY_ITEM_LONG_PRESSED', ()), ('DELETE_BUTTON_CLICKED', ()),
+    ('HISTORY_ITEM_DELETED', ('count=19', 'count=8 id=hist016')), ('HISTORY_TAB_VIEWED', ()), ('PersonTab', ()),
+    ('PROFILE_PAGE_ENTERED', ()), ('PROFILE_DATA_LOADED', ()), ('SETTINGS_PAGE_ENTERED', ()),
+    ('TIMER_SHUTDOWN_OPTION_FOUND', ()), ('TIMER_SHUTDOWN_CLICKED', ()), ('TIMER_SHUTDOWN_STATUS_LOADED', ('on', 'off')),
+    ('VIP_PAGE_ENTERED', ()), ('VIP_DATA_LOADED', ('正式会员', '非会员')), ('VIP_EXPIRE_DATE_DISPLAYED', ('2026-01-01',)),
+    ('VIP_STATUS_VIEWED', ()), ('HOME_PAGE_ACTIVE', ()), ('FIRST_VIDEO_CLICKED', ()), ('LIVE_TAB_ENTERED', ()),
+    ('LIVE_RECOMMEND_LOADED', ()), ('FIRST_LIVE_FOUND', ()), ('LIVE_VIEWER_COUNT_DISPLAYED', ('5.2万人', '856人')),
+    ('ANIMATION_CHANNEL_CLICKED', ()), ('ANIMATION_CHANNEL_PAGE_ENTERED', ()), ('ANIMATION_CHANNEL_DATA_LOADED', ()),
+    ('DANMAKU_SWITCH_CLICKED', ()), ('DANMAKU_STATUS_CHANGED', ('on', 'off')), ('DANMAKU_INITIAL_STATE', ('on', 'off')),
+)
+
+NOISE = (
+    ('ActivityManager', 'I', 'Displayed com.example.bilibili/.MainActivity: +412ms'),
+    ('chromium', 'I', '[INFO:CONSOLE(1)] "Uncaught TypeError", source: https://www.bilibili.com/ (1)'),
+    ('OpenGLRenderer', 'D', 'Davey! duration=733ms; Flags=0, FrameTimelineVsyncId=12345'),
+    ('BufferQueueProducer', 'W', '[SurfaceView[com.example.bilibili/com.example.bilibili.MainActivity]#1] dequeueBuffer: timeout'),
+    ('Choreographer', 'I', 'Skipped 31 frames!  The application may be doing too much work on its main thread.'),
+    ('Recomposer', 'D', 'recompose scope invalidated: VideoCard'),
+    ('VideoPlayer', 'D', '开始播放: 【游戏解说】逍遥散人的实况 第12期'),
+    ('DanmakuView', 'V', '弹幕加载完成: 共1024条, 可见87条'),
+    ('CommentRepo', 'I', '加载评论: 第2页, 每页20条'),
+    ('OkHttp', 'D', '<-- 200 OK https://api.bilibili.com/x/web-interface/view?bvid=BV1xx411c7mD (87ms)'),
+)
+
+MALFORMED = (
+    b'--------- beginning of main\n',
+    b'--------- beginning of crash\n',
+    b'\n',
+    b'10-18 12:00:00.000  4321  4321 D BilibiliAutoTest\n',
+    b'10-18 12:00:00.000  4321  4321 D BilibiliAutoTe',
+    b'\xe6\x92\xad\xe6\x94 \xff\xfe garbled \xc3\x28 BilibiliAutoTest: HOME_PAGE_ACTIVE\n',
+    'W/System.err( 4321): \tat com.example.bilibili.ui.VideoScreen.invoke(VideoScreen.kt:88)\n'.encode('utf-8'),
+    '   中文日志行但没有时间戳和级别 BilibiliAutoTest: VIDEO_PAUSED\n'.encode('utf-8'),
+)
+
+
+def logger_message(rng, marker=None):
+    """一条BilibiliAutoTestLogger的日志内容, marker为None时随机选择"""
+    if marker is None:
+        marker, payloads = rng.choice(LOGGER_MESSAGES)
+    else:
+        payloads = dict(LOGGER_MESSAGES).get(marker, ())
+    payload = rng.choice(payloads) if payloads else ''
+    return f'{marker}: {payload}' if payload else marker
+
+
+def generate_lines(count, seed=0, fmt='threadtime', tasks=None, episode_lines=2000, drop=0.1,
+                   spam=0.02, stray=0.005, malformed=0.001, start=1760760000.0):
+    """
+    逐行生成日志(bytes, 含换行), 共count行
+    episode_lines: 每个episode的平均行数; drop: 指令标记被丢弃的概率; spam: 重组重复日志突发的概率(每行);
+    stray: 随机BilibiliAutoTest日志的比例; malformed: 格式异常行的比例
+    """
+    rng = random.Random(seed)
+    tasks = list(tasks or TASK_TRACES)
+    pid = 4321
+    timestamp = start
+    produced = 0
+    episode = 0
+    pending = []
+
+    def entry(tag, level, message, owner=pid):
+        return format_entry((timestamp, owner, owner, level, tag, message), fmt).encode('utf-8')
+
+    while produced < count:
+        if not pending:
+            # 开始一个新的episode: 起点标记, 然后是该指令的标记, 均匀散布在episode中
+            task = rng.choice(tasks)
+            length = max(1, int(rng.expovariate(1 / episode_lines)))
+            trace = [message for message in TASK_TRACES[task] if rng.random() >= drop]
+            positions = sorted(rng.randrange(length) for _ in trace)
+            pending = [None] * length
+            # 前面已插入的i个标记都在position之前, 插入位置要加上i, 否则同一位置的标记顺序会颠倒
+            for i, (position, message) in enumerate(zip(positions, trace)):
+                pending.insert(position + 1 + i, message)
+            pending.reverse()
+            episode += 1
+            timestamp += 0.5
+            yield entry(LOG_TAG, 'I', f'{SESSION_MARKER}: {episode:08x}')
+            produced += 1
+            continue
+
+        timestamp += rng.expovariate(200.0)
+        message = pending.pop()
+        if message is not None:
+            line = entry(LOG_TAG, 'D', message)
+            yield line
+            produced += 1
+            if rng.random() < spam * 10:
+                # Compose重组: 同一日志连续输出多次
+                for _ in range(min(rng.randrange(5, 60), count - produced)):
+                    yield line
+                    produced += 1
+            continue
+
+        roll = rng.random()
+        if roll < malformed:
+            yield rng.choice(MALFORMED)
+        elif roll < malformed + stray:
+            yield entry(LOG_TAG, 'D', logger_message(rng))
+        elif roll < malformed + stray + spam:
+            line = entry('Recomposer', 'D', f'recompose scope invalidated: {rng.choice(("VideoCard", "首页推荐", "DanmakuLayer"))}')
+            for _ in range(min(rng.randrange(10, 200), count - produced - 1)):
+                yield line
+                produced += 1
+            yield line
+        else:
+            tag, level, message = rng.choice(NOISE)
+            yield entry(tag, level, message, owner=rng.choice((1000, 1234, 2345, pid)))
+        produced += 1
+
+
+def write_capture(path, count, **options):
+    """生成日志写入文件, 返回写入的字节数"""
+    size = 0
+    with open(path, 'wb') as f:
+        batch = []
+        for line in generate_lines(count, **options):
+            batch.append(line)
+            if len(batch) >= 8192:
+                size += f.write(b''.join(batch))
+                batch.clear()
+        size += f.write(b''.join(batch))
+    return size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成合成logcat负载')
+    parser.add_argument('-o', '--output', required=True, help='输出文件, -表示标准输出')
+    parser.add_argument('--lines', type=int, default=2000000, help='日志行数')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    parser.add_argument('--format', choices=('threadtime', 'epoch'), default='threadtime', help='logcat输出格式')
+    parser.add_argument('--episode-lines', type=int, default=2000, help='每个episode的平均行数')
+    parser.add_argument('--drop', type=float, default=0.1, help='指令标记被丢弃的概率')
+    args = parser.parse_args(argv)
+
+    options = dict(seed=args.seed, fmt=args.format, episode_lines=args.episode_lines, drop=args.drop)
+    start = time.perf_counter()
+    if args.output == '-':
+        for line in generate_lines(args.lines, **options):
+            sys.stdout.buffer.write(line)
+        return 0
+    size = write_capture(args.output, args.lines, **options)
+    print(f"已生成 {args.output}: {args.lines}行, {size / 1024 / 1024:.1f}MB, 耗时{time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
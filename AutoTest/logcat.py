@@ -0,0 +1,209 @@
+"""
+logcat日志解析与跟随
+
+LogcatFollower 在后台持续读取 logcat -v epoch 输出流, 增量解析为LogEvent,
+检验脚本可以在所需的日志标记全部出现时立即得到结果, 而不必等待人工确认后再整体读取日志。
+
+输出流按原始字节解析(parse_lines): 每次收到的完整行一次性匹配, 只解码标签和日志内容片段,
+接收到的日志以字节形式保存, 需要输出时才解码。
+"""
+import collections
+import re
+import threading
+import time
+
+from .adb import AdbError
+
+LogEvent = collections.namedtuple('LogEvent', 'timestamp pid tid level tag marker payload line')
+
+# logcat -v epoch:      "  1729612800.123  1234  1234 D BilibiliAutoTest: MARKER: payload"
+# logcat -v threadtime: "10-18 12:00:00.123  1234  1234 D BilibiliAutoTest: MARKER: payload"
+_LINE_PATTERN = re.compile(
+    r'^\s*(?:(?P<epoch>\d+\.\d+)|\d\d-\d\d \d\d:\d\d:\d\d\.\d+)'
+    r'\s+(?P<pid>\d+)\s+(?P<tid>\d+)\s+(?P<level>[VDIWEFS])\s+(?P<tag>.*?)\s*: (?P<message>.*)$'
+)
+
+# 同样的格式, 用于一次匹配一整块原始字节中的所有行: (整行, epoch, pid, tid, level, tag, message)
+_RAW_LINE_PATTERN = re.compile(
+    rb'^([ \t]*(?:(\d+\.\d+)|\d\d-\d\d \d\d:\d\d:\d\d\.\d+)'
+    rb'[ \t]+(\d+)[ \t]+(\d+)[ \t]+([VDIWEFS])[ \t]+([^\r\n]*?)[ \t]*: ([^\r\n]*))',
+    re.M
+)
+
+# 已解码的(level, tag, message), 日志内容高度重复, 缓存后大部分行不需要再解码
+_DECODED_LIMIT = 4096
+_decoded = {}
+
+
+def split_message(message):
+    """将日志内容拆分为(标记, 参数), 如 'VIP_DATA_LOADED:正式会员' -> ('VIP_DATA_LOADED', '正式会员')"""
+    marker, _, payload = message.partition(':')
+    return marker.strip(), payload.strip()
+
+
+def parse_line(line):
+    """解析一行logcat输出, 无法识别的行返回None"""
+    match = _LINE_PATTERN.match(line)
+    if not match:
+        return None
+    epoch = match.group('epoch')
+    marker, payload = split_message(match.group('message'))
+    return LogEvent(float(epoch) if epoch else None,
+                    int(match.group('pid')),
+                    int(match.group('tid')),
+                    match.group('level'),
+                    match.group('tag'),
+                    marker,
+                    payload,
+                    line)
+
+
+def _decode(key):
+    level, tag, message = key
+    marker, _, payload = message.partition(b':')
+    decoded = (level.decode('ascii'),
+               tag.decode('utf-8', errors='ignore'),
+               marker.strip().decode('utf-8', errors='ignore'),
+               payload.strip().decode('utf-8', errors='ignore'))
+    if len(_decoded) < _DECODED_LIMIT:
+        _decoded[key] = decoded
+    return decoded
+
+
+def parse_lines(data):
+    """
+    解析一块原始logcat输出(bytes/bytearray/memoryview), 返回LogEvent列表
+    只解码标签、标记和参数片段, 事件的line字段为该行的原始字节
+    """
+    events = []
+    cached = _decoded.get
+    for line, epoch, pid, tid, level, tag, message in _RAW_LINE_PATTERN.findall(data):
+        key = (level, tag, message)
+        level, tag, marker, payload = cached(key) or _decode(key)
+        events.append(LogEvent(float(epoch) if epoch else None, int(pid), int(tid),
+                               level, tag, marker, payload, line))
+    return events
+
+
+def parse_raw_line(line):
+    """解析一行原始字节, 无法识别的行返回None"""
+    events = parse_lines(line[:line.find(b'\n')] if b'\n' in line else line)
+    return events[0] if events else None
+
+
+def after_line(data, sentinel):
+    """
+    data中包含sentinel的行之后的部分
+    找不到时返回全部: logcat是循环缓冲区, 起点标记被覆盖说明剩余的日志都在它之后
+    """
+    index = data.rfind(sentinel)
+    if index < 0:
+        return data
+    end = data.find(b'\n', index)
+    return data[end + 1:] if end >= 0 else data[:0]
+
+
+def parse_expectation(expected):
+    """
+    解析期望的日志标记
+    'LIKE_BUTTON_CLICKED' 只匹配标记; 'DANMAKU_STATUS_CHANGED: off' 同时匹配标记和参数
+    """
+    marker, sep, payload = expected.partition(':')
+    return marker.strip(), payload.strip() if sep else None
+
+
+def matches(event, expectation):
+    marker, payload = expectation
+    return event.marker == marker and (payload is None or event.payload == payload)
+
+
+class LogcatFollower:
+    """后台跟随一个logcat输出流, 增量解析日志事件"""
+
+    def __init__(self, stream, after=None):
+        self._stream = stream
+        # 会话起点标记(bytes): 指定时丢弃该标记所在行及之前的日志
+        self._after = after
+        self.events = []
+        self._data = bytearray()
+        self._cond = threading.Condition()
+        self.finished = False
+        self._thread = threading.Thread(target=self._pump, name='logcat-follower', daemon=True)
+        self._thread.start()
+
+    def _pump(self):
+        pending = b''
+        while True:
+            try:
+                chunk = self._stream.read()
+            except (AdbError, OSError, ValueError):
+                chunk = b''
+            if not chunk:
+                with self._cond:
+                    self.finished = True
+                    self._cond.notify_all()
+                return
+
+            pending += chunk
+            cut = pending.rfind(b'\n') + 1
+            if not cut:
+                continue
+            complete, pending = pending[:cut], pending[cut:]
+            if self._after is not None:
+                if self._after not in complete:
+                    continue
+                complete = after_line(complete, self._after)
+                self._after = None
+            events = parse_lines(complete)
+            with self._cond:
+                self._data += complete
+                self.events.extend(events)
+                self._cond.notify_all()
+
+    def follow(self, consume, timeout=None):
+        """
+        将新到达的事件依次交给consume(events), 每个事件只交付一次
+        consume返回True时立即返回True; 超时或日志流结束时返回False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        index = 0
+        with self._cond:
+            while True:
+                events = self.events[index:]
+                index = len(self.events)
+                if consume(events):
+                    return True
+                if self.finished:
+                    return False
+                wait = None if deadline is None else deadline - time.monotonic()
+                if wait is not None and wait <= 0:
+                    return False
+                self._cond.wait(wait)
+
+    def wait_for(self, expected, timeout=None):
+        """
+        等待expected中的所有日志标记都出现(不要求顺序)
+        全部出现时立即返回True; 超时或日志流结束时返回False
+        """
+        remaining = [parse_expectation(item) for item in expected]
+
+        def consume(events):
+            nonlocal remaining
+            for event in events:
+                remaining = [item for item in remaining if not matches(event, item)]
+            return not remaining
+
+        return self.follow(consume, timeout)
+
+    def data(self):
+        """已接收的全部日志(原始字节)"""
+        with self._cond:
+            return bytes(self._data)
+
+    def text(self):
+        """已接收的全部日志文本"""
+        return self.data().decode('utf-8', errors='ignore').replace('\r\n', '\n')
+
+    def close(self):
+        self._stream.close()
+        self._thread.join(timeout=1)
@@ -0,0 +1,192 @@
+"""
+日志标记词表与单遍匹配器
+
+MarkerMatcher 将全部日志标记编译为一个按前缀树展开的正则表达式, 以 BilibiliAutoTest 标签为锚点,
+一次线性扫描即可提取日志中出现的所有标记及其参数, 取代对 log_content 的多次 'MARKER' in 扫描。
+同一表达式也编译为bytes版本, 可以直接扫描adb输出的原始字节(bytes/bytearray/memoryview),
+只解码提取出的参数片段, 不需要先把整段日志解码为str。
+other_lines=True时, 该标签下不以词表中标记开头的日志行也作为('', 日志内容)返回,
+用于检验"某段文字出现在日志中任意位置"(原有检验的 '文字' in log_content)。
+"""
+import functools
+import re
+
+LOG_TAG = 'BilibiliAutoTest'
+
+# 检验开始时由运行时写入的会话起点标记(不是APP的日志标记, 不在词表中)
+SESSION_MARKER = 'AUTOTEST_SESSION'
+
+# BilibiliAutoTestLogger.kt 及各页面中直接输出的日志标记
+LOGGER_MARKERS = (
+    # 收藏相关
+    'FAVORITE_TAB_CLICKED', 'FAVORITE_PAGE_ENTERED', 'FAVORITE_DATA_LOADED', 'FAVORITE_BUTTON_CLICKED',
+    'FAVORITE_STATUS_CHANGED', 'FAVORITE_COUNT_DISPLAYED',
+    # 视频播放相关
+    'VIDEO_PLAYER_OPENED', 'VIDEO_PLAYBACK_STARTED', 'VIDEO_PAUSED', 'PAUSE_BUTTON_CLICKED', 'PAUSE_ACTION_TRIGGERED',
+    # 全屏相关
+    'FULLSCREEN_MODE_ENTERED', 'FULLSCREEN_BUTTON_CLICKED',
+    # UP主相关
+    'UPLOADER_PAGE_ENTERED', 'UPLOADER_FOUND', 'UPLOADER_DATA_LOADED', 'FANS_COUNT_DISPLAYED',
+    # 关注相关
+    'FOLLOW_LIST_ENTERED', 'FOLLOW_PAGE_ENTERED', 'FOLLOW_BUTTON_CLICKED', 'FOLLOW_STATUS_CHANGED',
+    'RECENT_VISIT_TAB_CLICKED', 'RECENT_VISIT_LOADED',
+    # 动态相关
+    'DYNAMIC_LIST_LOADED', 'FIRST_DYNAMIC_CLICKED', 'DYNAMIC_DETAIL_OPENED',
+    # 评论相关
+    'COMMENT_PAGE_ENTERED', 'COMMENT_LIST_LOADED', 'COMMENT_LIKE_CLICKED', 'COMMENT_LIKE_STATUS_CHANGED',
+    'REPLY_BUTTON_CLICKED', 'COMMENT_INPUT_TEXT', 'SEND_BUTTON_CLICKED', 'COMMENT_SENT_SUCCESS',
+    'SORT_BY_LIKES_SELECTED', 'TOP_LIKED_COMMENT_FOUND',
+    # 搜索相关
+    'SEARCH_INPUT', 'SEARCH_BUTTON_CLICKED', 'SEARCH_COMPLETED', 'SEARCH_RESULTS_PAGE_ENTERED',
+    'SEARCH_RESULTS_COUNT_DISPLAYED', 'FIRST_SEARCH_RESULT_CLICKED', 'GAME_SEARCH_PAGE_LOADED',
+    # 点赞相关
+    'LIKE_BUTTON_CLICKED', 'LIKE_STATUS_CHANGED',
+    # 离线缓存相关
+    'OFFLINE_CACHE_PAGE_ENTERED', 'CACHE_LIST_LOADED',
+    # 历史记录相关
+    'HISTORY_PAGE_ENTERED', 'HISTORY_DATA_LOADED', 'YESTERDAY_VIDEO_FOUND', 'HISTORY_ITEM_LONG_PRESSED',
+    'DELETE_BUTTON_CLICKED', 'HISTORY_ITEM_DELETED', 'HISTORY_TAB_VIEWED',
+    # 个人信息相关
+    'PersonTab', 'PROFILE_PAGE_ENTERED', 'PROFILE_DATA_LOADED',
+    # 设置相关
+    'SETTINGS_PAGE_ENTERED', 'TIMER_SHUTDOWN_OPTION_FOUND', 'TIMER_SHUTDOWN_CLICKED', 'TIMER_SHUTDOWN_STATUS_LOADED',
+    # 会员相关
+    'VIP_PAGE_ENTERED', 'VIP_DATA_LOADED', 'VIP_EXPIRE_DATE_DISPLAYED', 'VIP_STATUS_VIEWED',
+    # 首页相关
+    'HOME_PAGE_ACTIVE', 'FIRST_VIDEO_CLICKED', 'CHANNEL_ICON_CLICKED',
+    # 直播相关
+    'LIVE_TAB_ENTERED', 'LIVE_RECOMMEND_LOADED', 'FIRST_LIVE_FOUND', 'LIVE_VIEWER_COUNT_DISPLAYED',
+    # 频道相关
+    'ANIMATION_CHANNEL_CLICKED', 'ANIMATION_CHANNEL_PAGE_ENTERED', 'ANIMATION_CHANNEL_DATA_LOADED',
+    # 弹幕相关
+    'DANMAKU_SWITCH_CLICKED', 'DANMAKU_STATUS_CHANGED', 'DANMAKU_INITIAL_STATE',
+)
+
+# 检验逻辑.md 中引用、APP尚未输出的日志标记
+DOC_MARKERS = (
+    'MY_PAGE_ACTIVE', 'RECOMMEND_VIDEO_CLICKED', 'PROFILE_HEADER_CLICKED', 'OFFLINE_CACHE_CLICKED',
+    'ANIMATION_CHANNEL_ENTERED', 'CHANNEL_CONTENT_LOADED', 'SEARCH_RESULTS_LOADED', 'UPLOADER_LIST_COUNT',
+    'FIRST_FAVORITE_VIDEO_CLICKED', 'VIDEO_DURATION_DISPLAYED',
+)
+
+MARKERS = LOGGER_MARKERS + DOC_MARKERS
+
+
+def _trie_pattern(words):
+    """将词表编译为前缀树形式的正则, 减少交替分支的回溯"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if end else body
+
+    return build(trie)
+
+
+class MarkerHits:
+    """
+    一次扫描得到的全部日志标记
+    events按出现顺序保存(标记, 参数); 首个/最后一个参数的索引在C层由dict()构建, 不逐条遍历
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self._last = dict(events)
+        self._first = dict(reversed(events)) if len(self._last) < len(events) else self._last
+
+    def __contains__(self, marker):
+        return marker in self._last
+
+    def __len__(self):
+        return len(self.events)
+
+    def count(self, marker):
+        return sum(1 for name, _ in self.events if name == marker)
+
+    def payloads(self, marker):
+        """标记的全部参数(按出现顺序)"""
+        return [payload.strip() for name, payload in self.events if name == marker]
+
+    def first(self, marker, default=None):
+        payload = self._first.get(marker)
+        return default if payload is None else payload.strip()
+
+    def last(self, marker, default=None):
+        payload = self._last.get(marker)
+        return default if payload is None else payload.strip()
+
+    def payload_contains(self, text, marker=None):
+        """text是否出现在(指定标记的)参数中"""
+        values = self.payloads(marker) if marker else (payload for _, payload in self.events)
+        return any(text in payload for payload in values)
+
+
+# 每个匹配器最多缓存的已解码(标记, 参数)数量
+_DECODED_LIMIT = 4096
+
+
+class MarkerMatcher:
+    """由标记词表编译而成的单遍匹配器"""
+
+    def __init__(self, vocabulary=MARKERS, tag=LOG_TAG, other_lines=False):
+        self.vocabulary = tuple(dict.fromkeys(vocabulary))
+        self.other_lines = other_lines
+        # 以"TAG: "为锚点(threadtime/epoch格式), 标记后可跟": 参数"
+        source = (r'(' + _trie_pattern(self.vocabulary) + r')(?![A-Za-z0-9_])'
+                  + r'(?:[ \t]*:[ \t]*([^\r\n]*))?')
+        if other_lines:
+            # 不以标记开头的行: 整个日志内容在第三个分组中
+            source = r'(?:' + source + r'|([^\r\n]*))'
+        source = re.escape(tag) + r': ' + source
+        self.pattern = re.compile(source)
+        # UTF-8编码后的多字节字符不含ASCII元字符, 同一表达式可直接用于bytes
+        self.byte_pattern = re.compile(source.encode('utf-8'))
+        self._names = {marker.encode('utf-8'): marker for marker in self.vocabulary}
+        self._names[b''] = ''
+        # 已解码的(标记, 参数), 参数大多重复出现, 缓存后不必逐个解码
+        self._decoded = {}
+
+    def events(self, data):
+        """按出现顺序返回(标记, 参数)列表; data为bytes类对象时只解码参数片段"""
+        if isinstance(data, str):
+            if self.other_lines:
+                return [(marker, payload) if marker else ('', message)
+                        for marker, payload, message in self.pattern.findall(data)]
+            return self.pattern.findall(data)
+        cached = self._decoded.get
+        return [cached(item) or self._decode(item) for item in self.byte_pattern.findall(data)]
+
+    def _decode(self, item):
+        if self.other_lines:
+            marker, payload, message = item
+            if not marker:
+                payload = message
+        else:
+            marker, payload = item
+        event = (self._names[marker], payload.decode('utf-8', errors='ignore'))
+        if len(self._decoded) < _DECODED_LIMIT:
+            self._decoded[item] = event
+        return event
+
+    def scan(self, data):
+        return MarkerHits(self.events(data))
+
+
+@functools.lru_cache(maxsize=None)
+def get_matcher(extra=()):
+    """获取(缓存的)匹配器, extra为词表之外需要额外识别的标记"""
+    return MarkerMatcher(MARKERS + tuple(extra))
+
+
+def scan_markers(data, extra=()):
+    """单遍扫描日志(str或原始字节), 返回MarkerHits"""
+    return get_matcher(tuple(extra)).scan(data)
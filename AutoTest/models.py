@@ -0,0 +1,352 @@
+"""
+assets数据的类型化模型与二进制快照
+
+检验端默认把assets数据当作json.load得到的dict使用, 数据量大时解析慢、占用内存多。本模块提供与APP中
+model/*.kt一一对应的记录类型(Video / Comment / Danmaku / WatchHistory / UPMaster / LiveStream / User / Product):
+- 属性为Kotlin字段名的snake_case形式(upMasterId -> up_master_id), 用__slots__存储, 没有每条记录的dict
+- 文件中缺少的字段与APP中Gson解析一致: 数值为0, 布尔值为False, 其他为None(Gson不使用Kotlin的默认参数)
+- 嵌套的列表(Video.danmakuList / commentList, Comment.replyList)同样转换为模型
+
+ModelStore把数据文件保存为二进制快照(pickle), 以源文件的内容哈希(与assets.AssetIndex相同的sha1)为键:
+- 快照中每条记录是字段值的tuple(行), 由pickle在C层直接还原, 不需要逐条调用构造函数
+- 冷启动时只计算文件哈希并读取快照, 不重新解析JSON; 源文件内容变化后哈希不同, 重新解析并写出新快照
+- 返回的ModelList按需把行构造为模型(首次访问时构造并缓存), 按ID查找只构造被查找的记录
+- 快照目录为AUTOTEST_CACHE, 默认为AutoTest/.snapshots; 目录不可写时只在内存中缓存
+- 模型定义变化时修改SNAPSHOT_VERSION, 旧快照自动失效
+- 进程内共享一个实例(get_store), 同一文件的mtime和大小不变时不重新计算哈希
+
+store = get_store()
+videos = store.load('videos.json')          # ModelList: videos[0] -> Video(video_id='vid001', ...)
+store.get('videos.json', 'vid001').like_count
+store.load('user.json').vip_level           # user.json顶层为对象, 返回单个User
+"""
+import contextlib
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+from collections.abc import Sequence
+
+from .assets import ASSETS_DIR, CHUNK_SIZE, ID_FIELDS, iter_records
+
+SNAPSHOT_VERSION = 1
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshots')
+
+# Gson对缺少的基本类型字段使用的默认值
+_DEFAULTS = {'int': 0, 'float': 0.0, 'bool': False}
+
+
+def _snake(name):
+    return re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', name).lower()
+
+
+class Model:
+    """
+    模型的基类: FIELDS为(JSON字段名, 类型), 类型为int/float/bool/str/list或嵌套模型的类名(该模型的列表),
+    int?为可以是null的数值(Kotlin的Long?)
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    # 嵌套模型字段: (位置, 模型类名)
+    NESTED = ()
+
+    @classmethod
+    def row_from_json(cls, record):
+        """JSON记录(dict) -> 行: 字段值的tuple, 嵌套的模型列表为行的列表"""
+        row = []
+        for key, kind in cls.FIELDS:
+            value = record.get(key)
+            if value is None:
+                value = _DEFAULTS.get(kind)
+            elif kind in MODELS_BY_NAME:
+                value = [MODELS_BY_NAME[kind].row_from_json(item) for item in value]
+            row.append(value)
+        return tuple(row)
+
+    @classmethod
+    def from_row(cls, row):
+        """由行构造"""
+        if cls.NESTED:
+            row = list(row)
+            for index, kind in cls.NESTED:
+                if row[index] is not None:
+                    row[index] = [MODELS_BY_NAME[kind].from_row(item) for item in row[index]]
+        return cls(*row)
+
+    @classmethod
+    def from_json(cls, record):
+        """由JSON记录(dict)构造; 已经是模型时原样返回"""
+        if isinstance(record, Model):
+            return record
+        return cls.from_row(cls.row_from_json(record))
+
+    def to_json(self):
+        """转换回与源文件相同字段名的dict"""
+        record = {}
+        for (key, kind), attribute in zip(self.FIELDS, self.__slots__):
+            value = getattr(self, attribute)
+            if kind in MODELS_BY_NAME and value is not None:
+                value = [item.to_json() for item in value]
+            record[key] = value
+        return record
+
+    def values(self):
+        return tuple(getattr(self, attribute) for attribute in self.__slots__)
+
+    def __reduce__(self):
+        return self.__class__, self.values()
+
+    def __eq__(self, other):
+        return self.__class__ is other.__class__ and self.values() == other.values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f'{attribute}={getattr(self, attribute)!r}' for attribute in self.__slots__)
+        return f'{self.__class__.__name__}({fields})'
+
+
+def _model(name, doc, fields):
+    """按JSON字段列表生成模型类(与collections.namedtuple类似)"""
+    fields = tuple(tuple(field.split(':')) for field in fields.split())
+    slots = tuple(_snake(key) for key, _ in fields)
+    # 与namedtuple/dataclasses相同, 生成逐个赋值的__init__, 比循环setter快数倍
+    arguments = ', '.join(slots)
+    body = '\n'.join(f'    self.{attribute} = {attribute}' for attribute in slots)
+    namespace = {}
+    exec(f'def __init__(self, {arguments}):\n{body}\n', namespace)
+    nested = tuple((index, kind) for index, (_, kind) in enumerate(fields) if kind[0].isupper())
+    return type(name, (Model,), {'__slots__': slots, '__doc__': doc, 'FIELDS': fields, 'NESTED': nested,
+                                 '__module__': __name__, '__init__': namespace['__init__']})
+
+
+Danmaku = _model('Danmaku', '弹幕 (model/Danmaku.kt), type为SCROLL/TOP/BOTTOM', """
+    danmakuId:str videoId:str content:str senderId:str senderName:str sendTime:int videoTime:float color:str
+    fontSize:int type:str""")
+
+Comment = _model('Comment', '评论 (model/Comment.kt), reply_list为回复(Comment)', """
+    commentId:str videoId:str content:str authorId:str authorName:str publishTime:int likeCount:int
+    parentCommentId:str replyList:Comment isLiked:bool""")
+
+Video = _model('Video', '视频 (model/Video.kt)', """
+    videoId:str title:str coverImage:str videoPath:str upMasterId:str upMasterName:str isLiked:bool isFavorited:bool
+    isShared:bool likeCount:int dislikeCount:int coinCount:int favoriteCount:int shareCount:int viewCount:int
+    commentCount:int onlineViewers:int tags:list danmakuList:Danmaku commentList:Comment createdTime:int
+    lastUpdateTime:int category:str ranking:int episodeInfo:str""")
+
+WatchHistory = _model('WatchHistory', '观看历史 (model/WatchHistory.kt)', """
+    historyId:str videoId:str videoTitle:str upMasterId:str upMasterName:str watchTime:int watchProgress:float
+    watchDuration:int lastWatchPosition:int isFinished:bool""")
+
+UPMaster = _model('UPMaster', 'UP主 (model/UPMaster.kt), video_list为视频ID列表', """
+    upMasterId:str name:str avatarUrl:str description:str isFollowed:bool fansCount:int videoCount:int videoList:list
+    followTime:int? lastUpdateTime:int""")
+
+LiveStream = _model('LiveStream', '直播 (model/LiveStream.kt)', """
+    liveId:str title:str coverImage:str upMasterId:str upMasterName:str upMasterAvatar:str viewerCount:int tags:list
+    isLive:bool category:str startTime:int lastUpdateTime:int""")
+
+User = _model('User', '当前用户 (model/User.kt)', """
+    userId:str name:str avatarUrl:str level:int bCoins:float hardCoins:int isVip:bool vipLevel:int vipExpireDate:str
+    dynamicCount:int followingCount:int fansCount:int space:str offlineCacheCount:int historyCount:int
+    collectionCount:int watchLaterCount:int lastUpdateTime:int""")
+
+Product = _model('Product', '会员购商品 (model/Product.kt)', """
+    productId:str name:str imageUrl:str price:float originalPrice:float salesCount:int description:str tag:str
+    isFavorite:bool lastUpdateTime:int""")
+
+MODELS_BY_NAME = {cls.__name__: cls for cls in (Danmaku, Comment, Video, WatchHistory, UPMaster, LiveStream, User,
+                                                Product)}
+
+# 数据文件 -> 模型
+MODELS = {
+    'videos.json': Video,
+    'comments.json': Comment,
+    'danmaku.json': Danmaku,
+    'watch_history.json': WatchHistory,
+    'upmasters.json': UPMaster,
+    'livestreams.json': LiveStream,
+    'user.json': User,
+    'products.json': Product,
+}
+
+
+def file_digest(path, chunk_size=CHUNK_SIZE):
+    """文件内容的sha1(与assets.AssetIndex的条目哈希相同)"""
+    hasher = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ModelList(Sequence):
+    """数据文件的模型列表: 保存行, 首次访问某条记录时构造模型并缓存, 之后返回同一对象"""
+
+    __slots__ = ('model', 'rows', '_models')
+
+    def __init__(self, model, rows):
+        self.model = model
+        self.rows = rows
+        self._models = [None] * len(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.rows)))]
+        model = self._models[index]
+        if model is None:
+            model = self._models[index] = self.model.from_row(self.rows[index])
+        return model
+
+    def __iter__(self):
+        for index in range(len(self.rows)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, ModelList):
+            return self.model is other.model and self.rows == other.rows
+        return isinstance(other, (list, tuple)) and list(self) == list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'<ModelList {self.model.__name__} x{len(self.rows)}>'
+
+
+def parse(name, path):
+    """解析数据文件为行: 顶层为数组时返回行的列表, 为对象时(user.json)返回单个行"""
+    cls = MODELS[name]
+    with open(path, 'rb') as f:
+        is_array = f.read(64).decode('utf-8', 'ignore').lstrip('\ufeff \t\n\r').startswith('[')
+    rows = [cls.row_from_json(record) for record in iter_records(path) if isinstance(record, dict)]
+    if is_array:
+        return rows
+    return rows[0] if rows else None
+
+
+def _wrap(name, rows):
+    if rows is None:
+        return None
+    if isinstance(rows, list):
+        return ModelList(MODELS[name], rows)
+    return MODELS[name].from_row(rows)
+
+
+class ModelStore:
+    """按内容哈希缓存二进制快照的模型加载器"""
+
+    def __init__(self, directory=ASSETS_DIR, cache_dir=None):
+        self.directory = directory
+        self.cache_dir = cache_dir or os.environ.get('AUTOTEST_CACHE') or CACHE_DIR
+        # 文件名 -> (mtime和大小, 内容哈希, 模型, ID -> 位置)
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self.parses = 0
+        self.snapshot_hits = 0
+
+    def _snapshot_path(self, name, digest):
+        return os.path.join(self.cache_dir, f'{os.path.splitext(name)[0]}-{digest}-v{SNAPSHOT_VERSION}.pickle')
+
+    def _read_snapshot(self, name, digest):
+        try:
+            with open(self._snapshot_path(name, digest), 'rb') as f:
+                version, saved_digest, rows = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError, TypeError):
+            return None
+        if version != SNAPSHOT_VERSION or saved_digest != digest:
+            return None
+        return rows
+
+    def _write_snapshot(self, name, digest, rows):
+        """写出快照(先写临时文件再替换, 并发写出时不会读到不完整的快照), 同时删除该文件的旧快照"""
+        prefix = f'{os.path.splitext(name)[0]}-'
+        path = self._snapshot_path(name, digest)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((SNAPSHOT_VERSION, digest, rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary, path)
+            except BaseException:
+                # 写出失败时不留下临时文件
+                with contextlib.suppress(OSError):
+                    os.remove(temporary)
+                raise
+            for existing in os.listdir(self.cache_dir):
+                if (existing.startswith(prefix) and existing.endswith('.pickle')
+                        and existing[len(prefix):].count('-') == 1 and existing != os.path.basename(path)):
+                    os.remove(os.path.join(self.cache_dir, existing))
+        except (OSError, pickle.PicklingError, RecursionError):
+            # 快照目录不可写或数据无法序列化时只在内存中缓存
+            pass
+
+    def load(self, name):
+        """数据文件对应的模型(列表, user.json为单个模型), 文件不存在时返回None"""
+        if name not in MODELS:
+            raise KeyError(f'没有对应的模型: {name}')
+        path = os.path.join(self.directory, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._loaded.get(name)
+        if cached is not None and cached[0] == stamp:
+            return cached[2]
+        with self._lock:
+            cached = self._loaded.get(name)
+            if cached is not None and cached[0] == stamp:
+                return cached[2]
+            digest = file_digest(path)
+            if cached is not None and cached[1] == digest:
+                models = cached[2]
+            else:
+                rows = self._read_snapshot(name, digest)
+                if rows is not None:
+                    self.snapshot_hits += 1
+                else:
+                    rows = parse(name, path)
+                    self.parses += 1
+                    self._write_snapshot(name, digest, rows)
+                models = _wrap(name, rows)
+            self._loaded[name] = (stamp, digest, models, None)
+            return models
+
+    def get(self, name, item_id, default=None):
+        """按ID(assets.ID_FIELDS)查找模型, 只构造找到的记录"""
+        models = self.load(name)
+        field = ID_FIELDS.get(name)
+        if not isinstance(models, ModelList) or field is None:
+            return default
+        with self._lock:
+            stamp, digest, models, by_id = self._loaded[name]
+            if by_id is None:
+                position = models.model.__slots__.index(_snake(field))
+                by_id = {row[position]: index for index, row in enumerate(models.rows)}
+                self._loaded[name] = (stamp, digest, models, by_id)
+        index = by_id.get(item_id)
+        return default if index is None else models[index]
+
+    def clear(self):
+        with self._lock:
+            self._loaded.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """获取进程内共享的模型加载器"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ModelStore()
+        return _store
@@ -0,0 +1,218 @@
+"""
+assets数据的期望值(oracle)
+
+大多数检验只确认日志标记出现过; 日志参数中带有APP显示的数值时, 可以与assets数据计算出的期望值比较:
+- 期望值表由 upmasters.json / livestreams.json / comments.json / videos.json / user.json 预先计算为按键索引的dict,
+  检验时只做一次查表
+- 期望值表随源文件一起失效(源文件内容哈希变化时重新计算, 见assets.AssetIndex), 进程内共享一个实例(get_oracle)
+- 各表按记录逐条累积(Table), build()一遍读取源文件同时计算多个表; 超大的源文件由AssetIndex流式读取, 只保留用到的字段
+- 数值按APP的显示格式(见counts.py)比较: formatted(表名, 格式)把整张表的数值一次批量格式化, 随期望值表一起缓存
+
+oracle = get_oracle()
+oracle.expect('upmaster_fans', '逍遥散人')             # 234500
+oracle.expect('recommended_live_viewers', 1)           # 直播推荐页第一个直播的观看人数
+oracle.expect('home_video_top_comment_likes', 1)       # 首页第一条视频点赞数最高的评论的点赞数
+oracle.table('comment_index').top_liked('vid001', 3)      # 点赞数最高的3条一级评论(见comments.py)
+oracle.expect('comment_index', 'vid001', lookup='newest_id')   # 最新一级评论的ID
+oracle.expect('history_days', 'hist016')               # 观看日期相对今天的天数, -1为昨天(见history.py)
+oracle.expect('danmaku_timeline', 'vid001').visible(37.5)   # 播放到37.5秒时屏幕上的弹幕(见danmaku.py)
+oracle.formatted('live_viewers', 'viewers')['live002']    # '5.2万人'
+oracle.build()                                         # 一遍读取源文件, 预先计算全部期望值表
+
+检验规格中通过verify使用(见checkspec.py):
+    "verify": [
+      {"value": "fans_count", "oracle": "upmaster_fans", "key": {"capture": "uploader"}, "format": "count",
+       "expected": "expected_fans", "fail": "粉丝数与UP主数据不一致 (期望:{expected_fans}, 实际:{fans_count})"}
+    ]
+"""
+import collections
+import functools
+import threading
+
+from . import comments, danmaku, history
+from .assets import get_index
+from .counts import STYLES, format_count, format_counts
+
+# 与RecommendPresenter.getRecommendedVideos()一致的首页视频顺序
+HOME_VIDEOS = ('vid001', 'vid003', 'vid011', 'vid012')
+# 与LivePresenter.getRecommendedLiveStreams()一致的直播推荐顺序
+RECOMMENDED_LIVES = ('live002', 'live003', 'live004', 'live005')
+
+
+def _upmaster_fans(table, source, up):
+    # UPLOADER_PAGE_ENTERED的参数是UP主名称, 同时支持按ID查找
+    table[up.get('name')] = up.get('fansCount')
+    table[up.get('upMasterId')] = up.get('fansCount')
+
+
+def _live_viewers(table, source, stream):
+    table[stream.get('liveId')] = stream.get('viewerCount')
+
+
+def _recommended_live_viewers(viewers, source, stream):
+    if stream.get('liveId') in RECOMMENDED_LIVES:
+        viewers[stream.get('liveId')] = stream.get('viewerCount')
+
+
+def _recommended_positions(viewers):
+    present = [live_id for live_id in RECOMMENDED_LIVES if live_id in viewers]
+    return {position: viewers[live_id] for position, live_id in enumerate(present, 1)}
+
+
+def _top_comment_likes(table, source, comment):
+    """各视频一级评论(评论页显示的列表)中最高的点赞数"""
+    if comment.get('parentCommentId') is not None:
+        return
+    video_id = comment.get('videoId')
+    likes = comment.get('likeCount', 0)
+    if likes > table.get(video_id, -1):
+        table[video_id] = likes
+
+
+def _home_video_top_comment_likes(state, source, record):
+    known, top = state
+    if source == 'videos.json':
+        if record.get('videoId') in HOME_VIDEOS:
+            known.add(record.get('videoId'))
+    elif record.get('videoId') in HOME_VIDEOS:
+        _top_comment_likes(top, source, record)
+
+
+def _home_video_positions(state):
+    known, top = state
+    present = [video_id for video_id in HOME_VIDEOS if video_id in known]
+    return {position: top.get(video_id) for position, video_id in enumerate(present, 1)}
+
+
+def _user(table, source, user):
+    if isinstance(user, dict):
+        table.update(user)
+
+
+def _danmaku_count(table, source, record):
+    table[record.get('videoId')] = table.get(record.get('videoId'), 0) + 1
+
+
+def _same(table):
+    return table
+
+
+# 期望值表按记录逐条累积(fold): 源文件, 用到的字段(None为全部), 初始状态, 累积函数add(state, source, record), 结束函数
+# 同一批计算的多个表共用一次源文件读取, 大文件流式读取时每个文件只读一遍
+Table = collections.namedtuple('Table', 'sources fields start add finish')
+
+TABLES = {
+    'upmaster_fans': Table(('upmasters.json',), ('name', 'upMasterId', 'fansCount'), dict, _upmaster_fans, _same),
+    'live_viewers': Table(('livestreams.json',), ('liveId', 'viewerCount'), dict, _live_viewers, _same),
+    'recommended_live_viewers': Table(('livestreams.json',), ('liveId', 'viewerCount'), dict,
+                                      _recommended_live_viewers, _recommended_positions),
+    'top_comment_likes': Table(('comments.json',), ('videoId', 'parentCommentId', 'likeCount'), dict,
+                               _top_comment_likes, _same),
+    'home_video_top_comment_likes': Table(('videos.json', 'comments.json'),
+                                          ('videoId', 'parentCommentId', 'likeCount'),
+                                          lambda: (set(), {}), _home_video_top_comment_likes, _home_video_positions),
+    'user': Table(('user.json',), None, dict, _user, _same),
+    # comments.CommentIndex, 按评论ID查找; 各视频最新一级评论的ID用expect(..., lookup='newest_id')
+    'comment_index': Table(('comments.json',), comments.FIELDS, comments.CommentIndex, comments.add, _same),
+    # history.HistoryDays, 按记录ID查找相对今天的天数
+    'history_days': Table(('watch_history.json',), history.FIELDS, history.HistoryDays, history.add, _same),
+    'danmaku_count': Table(('danmaku.json',), ('videoId',), dict, _danmaku_count, _same),
+    # 视频ID -> danmaku.VideoTimeline
+    'danmaku_timeline': Table(('danmaku.json',), danmaku.FIELDS, dict, danmaku.add, danmaku.finish),
+}
+
+FORMATS = {style: functools.partial(format_count, style=style) for style in STYLES}
+
+
+class Oracle:
+    """由assets数据计算的期望值表"""
+
+    def __init__(self, index=None):
+        self.index = index or get_index()
+        self._tables = {}
+        self._formatted = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _digests(self, name):
+        entries = [self.index.entry(source) for source in TABLES[name].sources]
+        if any(entry is None for entry in entries):
+            return None
+        return tuple(entry.digest for entry in entries)
+
+    def table(self, name):
+        """期望值表(dict), 源文件不存在时返回None"""
+        digests = self._digests(name)
+        if digests is None:
+            return None
+        cached = self._tables.get(name)
+        if cached is not None and cached[0] == digests:
+            return cached[1]
+        self.build((name,))
+        cached = self._tables.get(name)
+        return None if cached is None else cached[1]
+
+    def build(self, names=None):
+        """
+        计算过期的期望值表(默认全部): 每个源文件只读一遍, 每条记录交给所有用到该文件的表,
+        读取时只保留这些表用到的字段的并集
+        """
+        with self._lock:
+            pending = {}
+            for name in TABLES if names is None else names:
+                digests = self._digests(name)
+                cached = self._tables.get(name)
+                if digests is not None and (cached is None or cached[0] != digests):
+                    pending[name] = digests
+            states = {name: TABLES[name].start() for name in pending}
+            sources = {}
+            for name in pending:
+                for source in TABLES[name].sources:
+                    sources.setdefault(source, []).append(name)
+            for source, users in sources.items():
+                fields = [TABLES[name].fields for name in users]
+                projection = None if None in fields else tuple(sorted(set().union(*fields)))
+                folds = [(TABLES[name].add, states[name]) for name in users]
+                for record in self.index.records(source, projection):
+                    for add, state in folds:
+                        add(state, source, record)
+            for name, digests in pending.items():
+                self._tables[name] = (digests, TABLES[name].finish(states[name]))
+                self.builds += 1
+            return list(pending)
+
+    def expect(self, name, key=None, default=None, lookup='get'):
+        """期望值, 没有对应的数据时返回default; lookup为期望值表上按键查找的方法(如CommentIndex.newest_id)"""
+        table = self.table(name)
+        if table is None:
+            return default
+        value = getattr(table, lookup)(key)
+        return default if value is None else value
+
+    def formatted(self, name, style='count'):
+        """期望值表中的数值按APP的显示格式(counts.STYLES)批量格式化后的表(键与期望值表相同, 只含整数值);
+        源文件不存在或期望值表不是dict(如comment_index)时返回None
+        """
+        table = self.table(name)
+        if not isinstance(table, dict):
+            return None
+        cached = self._formatted.get((name, style))
+        if cached is not None and cached[0] is table:
+            return cached[1]
+        keys = [key for key, value in table.items() if isinstance(value, int) and not isinstance(value, bool)]
+        texts = dict(zip(keys, format_counts([table[key] for key in keys], style)))
+        self._formatted[(name, style)] = (table, texts)
+        return texts
+
+
+_oracle = None
+_oracle_lock = threading.Lock()
+
+
+def get_oracle():
+    """获取进程内共享的oracle(基于共享的assets索引)"""
+    global _oracle
+    with _oracle_lock:
+        if _oracle is None:
+            _oracle = Oracle()
+        return _oracle
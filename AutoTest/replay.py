@@ -0,0 +1,253 @@
+"""
+logcat日志回放
+
+ReplayClient 以录制好的logcat输出文件代替真实的adb, 用于在没有模拟器的环境下批量回归检验逻辑:
+- 每个录制文件(.log/.txt/.logcat)相当于一台设备, serial为文件名(不含扩展名)
+- logcat -c 为空操作(录制文件即一次检验开始后的日志), logcat -d 返回录制的全部日志
+- 持续输出的logcat按录制顺序输出, speed>0时按原始时间间隔(除以speed)回放, speed=0时一次性输出
+
+通过运行时选择: AUTOTEST_BACKEND=replay, AUTOTEST_REPLAY=录制文件或目录, AUTOTEST_REPLAY_SPEED=回放倍速(默认0)。
+回放时运行时默认使用batch模式, 不再等待人工按回车。
+
+大批量回归时可直接使用 replay_captures(), 每个录制文件只扫描一次即可得到所有相关规格的结论。
+文件名以 eval_N 开头(如 eval_5-0001.log)的录制只按指令N的规格检验, 其余录制按全部规格检验。
+
+用法: python -m AutoTest.replay 录制文件或目录... [--tasks 1-30] [-v]
+"""
+import argparse
+import collections
+import datetime
+import os
+import re
+import sys
+import threading
+import time
+
+from .adb import DEFAULT_TIMEOUT, AdbError
+from .checkspec import CheckEngine, load_specs
+from .fakeadb import parse_logcat_args
+from .logcat import parse_raw_line
+
+CAPTURE_SUFFIXES = ('.log', '.txt', '.logcat')
+
+ReplayResult = collections.namedtuple('ReplayResult', 'capture verdicts')
+
+
+def find_captures(source):
+    """录制文件路径列表, source可以是文件或目录(递归查找)"""
+    if os.path.isfile(source):
+        return [source]
+    if not os.path.isdir(source):
+        raise AdbError(f"找不到录制的日志: {source}")
+    paths = []
+    for root, _, files in os.walk(source):
+        paths.extend(os.path.join(root, name) for name in files if name.endswith(CAPTURE_SUFFIXES))
+    return sorted(paths)
+
+
+def capture_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def capture_task(name):
+    """录制文件名对应的指令编号, 如 eval_5-0001 -> 5; 无法识别时返回None"""
+    match = re.match(r'eval_(\d+)(?![0-9])', name)
+    return int(match.group(1)) if match else None
+
+
+def read_capture(path):
+    """录制文件的日志行(原始字节, 不含换行符)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return [line.rstrip(b'\r') for line in data.split(b'\n') if line.strip()]
+
+
+def line_time(line):
+    """日志行(原始字节)的时间戳(秒), 无法识别时返回None"""
+    event = parse_raw_line(line)
+    if event is None:
+        return None
+    if event.timestamp is not None:
+        return event.timestamp
+    # threadtime格式不含年份, 只用于计算相邻日志的时间间隔
+    stamp = line.lstrip()[:18].decode('ascii', errors='ignore')
+    try:
+        return datetime.datetime.strptime(f'2000-{stamp}', '%Y-%m-%d %H:%M:%S.%f').timestamp()
+    except ValueError:
+        return None
+
+
+def filter_lines(lines, tags):
+    """按logcat -s的标签过滤日志行, tags为None时不过滤"""
+    if tags is None:
+        return lines
+    selected = []
+    for line in lines:
+        event = parse_raw_line(line)
+        if event is not None and event.tag in tags:
+            selected.append(line)
+    return selected
+
+
+class ReplayStream:
+    """回放一段录制日志的输出流, 接口与adb.AdbStream一致"""
+
+    def __init__(self, lines, speed=0):
+        self._lines = lines
+        self._speed = speed
+        self._index = 0
+        self._closed = threading.Event()
+        self._started = time.monotonic()
+        self._offsets = self._schedule(lines, speed) if speed > 0 else None
+
+    @staticmethod
+    def _schedule(lines, speed):
+        """每行日志相对回放开始的输出时间, 无时间戳的行与上一行同时输出"""
+        offsets = []
+        first = previous = None
+        for line in lines:
+            stamp = line_time(line)
+            if stamp is not None and first is None:
+                first = stamp
+            if stamp is not None:
+                previous = max((stamp - first) / speed, previous or 0)
+            offsets.append(previous or 0)
+        return offsets
+
+    def read(self, size=65536):
+        if self._closed.is_set() or self._index >= len(self._lines):
+            return b''
+        end = len(self._lines)
+        if self._offsets is not None:
+            delay = self._offsets[self._index] - (time.monotonic() - self._started)
+            if delay > 0 and self._closed.wait(delay):
+                return b''
+            elapsed = time.monotonic() - self._started
+            end = self._index
+            while end < len(self._lines) and self._offsets[end] <= elapsed:
+                end += 1
+        chunk = b''.join(line + b'\n' for line in self._lines[self._index:end])
+        self._index = end
+        return chunk
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        self._closed.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayClient:
+    """以录制的logcat日志代替adb的客户端"""
+
+    kind = 'replay'
+
+    def __init__(self, source, speed=0):
+        self.source = source
+        self.speed = speed
+        self.captures = {capture_name(path): path for path in find_captures(source)}
+        if not self.captures:
+            raise AdbError(f"没有找到录制的日志: {source}")
+        self._lines = {}
+        self._lock = threading.Lock()
+
+    def describe(self):
+        return f"日志回放: {self.source}"
+
+    def version(self):
+        return 'replay'
+
+    def devices(self):
+        return [(serial, 'device') for serial in self.captures]
+
+    def _capture_lines(self, serial):
+        if serial is None:
+            if len(self.captures) != 1:
+                raise AdbError("录制的日志不止一个, 请指定设备(录制文件名)")
+            serial = next(iter(self.captures))
+        if serial not in self.captures:
+            raise AdbError(f"找不到录制的日志: {serial}")
+        with self._lock:
+            if serial not in self._lines:
+                self._lines[serial] = read_capture(self.captures[serial])
+            return self._lines[serial]
+
+    @staticmethod
+    def _logcat_args(command):
+        args = command.split()
+        if not args or args[0] != 'logcat':
+            raise AdbError(f"回放模式不支持的命令: {command}")
+        return parse_logcat_args(args[1:])
+
+    def run(self, serial, command, timeout=DEFAULT_TIMEOUT):
+        options, tags = self._logcat_args(command)
+        lines = self._capture_lines(serial)
+        if options['clear']:
+            return b''
+        return b''.join(line + b'\n' for line in filter_lines(lines, tags))
+
+    def open_stream(self, serial, command):
+        _, tags = self._logcat_args(command)
+        return ReplayStream(filter_lines(self._capture_lines(serial), tags), self.speed)
+
+    def close(self):
+        pass
+
+
+def replay_captures(paths, specs=None):
+    """
+    逐个检验录制文件, 依次产出ReplayResult
+    每个录制文件只扫描一次; 文件名对应指令的录制只计算该指令的规格
+    """
+    specs = load_specs() if specs is None else list(specs)
+    by_task = {spec.task: spec for spec in specs}
+    for path in paths:
+        name = capture_name(path)
+        task = capture_task(name)
+        engine = CheckEngine([by_task[task]] if task in by_task else specs)
+        with open(path, 'rb') as f:
+            engine.feed_text(f.read())
+        yield ReplayResult(name, engine.verdicts())
+
+
+def main(argv=None):
+    from .scheduler import parse_tasks
+
+    parser = argparse.ArgumentParser(description='回放录制的logcat日志并批量检验')
+    parser.add_argument('sources', nargs='+', help='录制文件或目录')
+    parser.add_argument('--tasks', help='只检验指定的指令, 如 1-5,8')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出每个未通过的检验')
+    args = parser.parse_args(argv)
+
+    specs = load_specs()
+    if args.tasks:
+        tasks = set(parse_tasks(args.tasks))
+        specs = [spec for spec in specs if spec.task in tasks]
+    paths = [path for source in args.sources for path in find_captures(source)]
+
+    totals = collections.Counter()
+    passed = collections.Counter()
+    start = time.perf_counter()
+    for result in replay_captures(paths, specs):
+        for verdict in result.verdicts:
+            totals[verdict.spec.task] += 1
+            passed[verdict.spec.task] += verdict.passed
+            if args.verbose and not verdict.passed:
+                print(f"{result.capture}: 指令{verdict.spec.task} 未通过 - {verdict.failure.fail}")
+    elapsed = time.perf_counter() - start
+
+    for task in sorted(totals):
+        print(f"指令{task:>2}: {passed[task]}/{totals[task]} 通过")
+    rate = len(paths) / elapsed if elapsed > 0 else float('inf')
+    print(f"共回放{len(paths)}个录制, 耗时{elapsed:.2f}秒 ({rate:.0f}个/秒)")
+    return 0 if sum(passed.values()) == sum(totals.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+检验运行时
+
+统一管理adb客户端的选择与复用, 所有eval_N.py都通过这里访问设备日志:
+- 默认优先使用AdbWireClient直连adb server(连接池常驻于进程内, 多次检验共享)
+- adb server不可达时回退到AdbSubprocessClient(原有的subprocess调用方式)
+
+- 回放录制的日志时使用ReplayClient(见replay.py), 不需要adb和设备
+
+可通过环境变量AUTOTEST_BACKEND指定: auto(默认) / wire / subprocess / replay
+
+检验的等待方式由AUTOTEST_MODE指定:
+- interactive(默认): 等待人工按回车后一次性读取日志
+- follow: 跟随logcat输出流, 所需日志标记全部出现时立即给出结果, 最长等待AUTOTEST_TIMEOUT秒(默认60)
+- batch: 不等待人工确认, 直接一次性读取日志(回放录制的日志时默认使用)
+
+每次检验只读取本次检验开始之后的日志, 起点的记录方式由AUTOTEST_WATERMARK指定:
+- sentinel(默认): 用 log -t BilibiliAutoTest 写入一行带随机标识的起点标记, 只读取该行之后的日志
+- time: 记录设备时钟, 读取时用 logcat -T 限定起始时间(同一毫秒内更早的日志可能被包含)
+- clear: 原有方式, 检验开始时 logcat -c 清除整个日志缓冲区(回放录制的日志时默认使用, 回放中为空操作)
+sentinel和time不清除日志缓冲区, 同一台设备上可以同时进行多个检验, 也不影响其他工具读取日志。
+
+各阶段耗时通过spans模块记录(logcat_clear / logcat_dump / decode / scan / follow)。
+"""
+import os
+import re
+import threading
+import uuid
+
+from .adb import (
+    DEFAULT_TIMEOUT,
+    AdbError,
+    AdbSubprocessClient,
+    AdbWireClient,
+    find_adb,
+)
+from .logcat import LogcatFollower, after_line
+from .markers import LOG_TAG, SESSION_MARKER
+from .spans import span
+
+CLEAR_COMMAND = 'logcat -c'
+DUMP_COMMAND = f'logcat -d -s {LOG_TAG}:D'
+FOLLOW_COMMAND = f'logcat -v epoch -s {LOG_TAG}:D'
+CLOCK_COMMAND = 'date +%s.%N'
+APP_PACKAGE = 'com.example.bilibili'
+BUILD_COMMAND = f'dumpsys package {APP_PACKAGE}'
+PROMPT = "\n完成上述操作后，按回车键继续验证..."
+DEFAULT_FOLLOW_TIMEOUT = 60
+MODES = ('interactive', 'follow', 'batch')
+WATERMARKS = ('sentinel', 'time', 'clear')
+
+
+def parse_apk_build(output):
+    """从dumpsys package的输出中取出versionName+versionCode"""
+    output = output.decode('utf-8', errors='ignore')
+    name = re.search(r'versionName=(\S+)', output)
+    code = re.search(r'versionCode=(\d+)', output)
+    if name is None and code is None:
+        return None
+    return '+'.join(match.group(1) for match in (name, code) if match is not None)
+
+
+class Device:
+    """一台被检验的设备(serial为None时表示adb默认设备)"""
+
+    def __init__(self, runtime, serial=None):
+        self.runtime = runtime
+        self.serial = serial
+
+    @property
+    def client(self):
+        return self.runtime.client
+
+    def describe(self):
+        if self.serial:
+            return f"{self.client.describe()} (设备: {self.serial})"
+        return self.client.describe()
+
+    def clear_logcat(self):
+        """清除设备上的logcat日志"""
+        with span('logcat_clear'):
+            self.client.run(self.serial, CLEAR_COMMAND)
+
+    def write_sentinel(self):
+        """写入一行会话起点标记, 返回该行中的唯一标识(bytes)"""
+        token = f'{SESSION_MARKER}: {uuid.uuid4().hex}'
+        with span('logcat_mark'):
+            self.client.run(self.serial, f'log -t {LOG_TAG} {token}')
+        return token.encode('ascii')
+
+    def clock(self):
+        """设备当前时间(epoch秒)"""
+        with span('logcat_mark'):
+            output = self.client.run(self.serial, CLOCK_COMMAND).decode('ascii', errors='ignore').strip()
+        seconds, _, fraction = output.partition('.')
+        # 不支持%N的date会原样输出, 此时只保留秒
+        fraction = fraction[:3] if fraction.isdigit() else ''
+        try:
+            return float(f'{seconds}.{fraction or 0}')
+        except ValueError:
+            raise AdbError(f"无法读取设备时间: {output}")
+
+    def apk_build(self):
+        """设备上安装的APP版本(versionName+versionCode), 未安装或无法读取时返回None"""
+        return parse_apk_build(self.client.run(self.serial, BUILD_COMMAND))
+
+    def dump_logcat(self, timeout=DEFAULT_TIMEOUT, decode=True, since=None):
+        """读取BilibiliAutoTest标签下的全部日志(since为起始epoch秒), decode=False时返回原始字节"""
+        command = DUMP_COMMAND if since is None else f'{DUMP_COMMAND} -T {since:.3f}'
+        with span('logcat_dump'):
+            output = self.client.run(self.serial, command, timeout=timeout)
+        if not decode:
+            return output
+        with span('decode'):
+            return output.decode('utf-8', errors='ignore')
+
+    def follow_logcat(self, since=None, after=None):
+        """开始跟随BilibiliAutoTest标签的日志输出流, 可限定起始时间或起点标记"""
+        command = FOLLOW_COMMAND if since is None else f'{FOLLOW_COMMAND} -T {since:.3f}'
+        return LogcatFollower(self.client.open_stream(self.serial, command), after=after)
+
+    def start_session(self):
+        """开始一次检验: 记录日志起点(或清除旧日志), follow模式下同时开始跟随日志流"""
+        return Session(self)
+
+
+class Session:
+    """一次检验过程中的日志采集, 只包含检验开始之后的日志"""
+
+    def __init__(self, device):
+        self.device = device
+        self.since = None
+        self.sentinel = None
+        watermark = device.runtime.watermark
+        if watermark == 'sentinel':
+            self.sentinel = device.write_sentinel()
+        elif watermark == 'time':
+            self.since = device.clock()
+        else:
+            device.clear_logcat()
+        self._follower = None
+        if device.runtime.mode == 'follow':
+            self._follower = device.follow_logcat(self.since, self.sentinel)
+
+    def collect(self, expected=()):
+        """
+        等待操作完成并返回日志内容
+        interactive模式下等待人工确认; follow模式下expected中的标记全部出现即返回, 超时后按已收到的日志返回
+        """
+        if self._follower is None:
+            data = self._dump()
+        else:
+            data = self._follow(lambda follower, timeout: follower.wait_for(expected, timeout))
+        with span('decode'):
+            return data.decode('utf-8', errors='ignore')
+
+    def evaluate(self, engine):
+        """
+        等待操作完成, 将日志交给检验引擎(checkspec.CheckEngine), 返回原始日志字节
+        follow模式下引擎中的规格全部满足即返回; 日志全程不整体解码
+        """
+        if self._follower is None:
+            data = self._dump()
+            with span('scan'):
+                engine.feed_text(data)
+            return data
+        return self._follow(lambda follower, timeout: follower.follow(engine.feed_events, timeout))
+
+    def _dump(self):
+        if self.device.runtime.mode == 'interactive':
+            input(PROMPT)
+        print("\n正在检查日志...")
+        data = self.device.dump_logcat(decode=False, since=self.since)
+        return data if self.sentinel is None else after_line(data, self.sentinel)
+
+    def _follow(self, wait):
+        timeout = self.device.runtime.timeout
+        print(f"\n正在等待日志标记(最长{timeout}秒)...")
+        try:
+            with span('follow'):
+                finished = wait(self._follower, timeout)
+            if not finished:
+                print("未等到全部日志标记, 按已收到的日志进行验证")
+            return self._follower.data()
+        finally:
+            self._follower.close()
+
+
+class Runtime:
+    """进程内共享的检验运行时, 持有adb客户端"""
+
+    def __init__(self, client, mode=None, timeout=None, watermark=None):
+        self.client = client
+        replay = client.kind == 'replay'
+        self.mode = mode or os.environ.get('AUTOTEST_MODE', 'batch' if replay else 'interactive')
+        if self.mode not in MODES:
+            raise AdbError(f"未知的AUTOTEST_MODE: {self.mode}")
+        # 录制的日志中没有起点标记, 回放时默认按整个录制检验
+        self.watermark = watermark or os.environ.get('AUTOTEST_WATERMARK', 'clear' if replay else 'sentinel')
+        if self.watermark not in WATERMARKS:
+            raise AdbError(f"未知的AUTOTEST_WATERMARK: {self.watermark}")
+        if timeout is None:
+            timeout = float(os.environ.get('AUTOTEST_TIMEOUT', DEFAULT_FOLLOW_TIMEOUT))
+        self.timeout = timeout
+
+    def device(self, serial=None):
+        return Device(self, serial or os.environ.get('ANDROID_SERIAL') or None)
+
+    def close(self):
+        self.client.close()
+
+
+def create_client(backend=None):
+    """按配置创建adb客户端, auto模式下adb server不可达时回退到subprocess"""
+    backend = backend or os.environ.get('AUTOTEST_BACKEND', 'auto')
+    if backend not in ('auto', 'wire', 'subprocess', 'replay'):
+        raise AdbError(f"未知的AUTOTEST_BACKEND: {backend}")
+
+    if backend == 'replay':
+        from .replay import ReplayClient
+
+        source = os.environ.get('AUTOTEST_REPLAY')
+        if not source:
+            raise AdbError("回放模式需要通过AUTOTEST_REPLAY指定录制的日志")
+        return ReplayClient(source, speed=float(os.environ.get('AUTOTEST_REPLAY_SPEED', 0)))
+
+    if backend in ('auto', 'wire'):
+        client = AdbWireClient()
+        try:
+            client.version()
+            return client
+        except AdbError:
+            client.close()
+            if backend == 'wire':
+                raise
+
+    adb_cmd = find_adb()
+    if not adb_cmd:
+        raise AdbError("找不到adb命令")
+    return AdbSubprocessClient(adb_cmd)
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime():
+    """获取进程内共享的运行时(首次调用时创建)"""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = Runtime(create_client())
+        return _runtime
+
+
+def set_runtime(runtime):
+    """替换进程内共享的运行时(基准测试或指定客户端时使用), 返回原运行时"""
+    global _runtime
+    with _runtime_lock:
+        previous, _runtime = _runtime, runtime
+        return previous
+
+
+def connect_device(serial=None):
+    """获取待检验设备, 找不到可用的adb时返回None"""
+    try:
+        return get_runtime().device(serial)
+    except AdbError:
+        return None
@@ -0,0 +1,181 @@
+"""
+多设备并行检验调度
+
+将"检验任务 × 设备"矩阵分配到多台设备上并行执行:
+- 每台设备由一个工作线程独占(按serial租用), 同一设备上的检验依次执行, 不同设备之间并发
+- 运行时不清除日志缓冲区时(AUTOTEST_WATERMARK=sentinel/time), 每台设备可以有per_device个工作线程, 同一设备上的检验也并发执行
+- 未指定设备的任务放入共享队列, 由空闲设备领取
+- 每个检验的结果、耗时、各步骤耗时和输出汇总为一个结果列表
+
+并行检验要求运行时处于follow或batch模式(不能等待人工按回车)。
+"""
+import collections
+import importlib
+import io
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from .runtime import get_runtime, set_runtime
+from .spans import recording
+
+TASK_COUNT = 30
+
+EvalResult = collections.namedtuple('EvalResult', 'task serial passed elapsed started output error failure steps hits')
+
+
+def discover_tasks():
+    """已有检验脚本(eval_N.py)的指令编号, 只列出文件而不导入"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    matches = (re.fullmatch(r'eval_(\d+)\.py', name) for name in os.listdir(directory))
+    return sorted(int(match.group(1)) for match in matches if match)
+
+
+def load_task(task):
+    """加载指令task对应的检验函数(eval_N.py中的CheckXxx)"""
+    module = importlib.import_module(f'{__package__}.eval_{task}')
+    for name in dir(module):
+        if name.startswith('Check') and callable(getattr(module, name)):
+            return getattr(module, name)
+    raise LookupError(f"eval_{task}.py中没有检验函数")
+
+
+def parse_tasks(text):
+    """解析指令编号列表, 如 '1-5,8' -> [1, 2, 3, 4, 5, 8]"""
+    tasks = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        if not (first.isdigit() and (not sep or last.isdigit())):
+            raise ValueError(f"无法识别的指令编号: {part}")
+        tasks.extend(range(int(first), int(last if sep else first) + 1))
+    return list(dict.fromkeys(tasks))
+
+
+def online_devices(runtime=None):
+    """当前在线的设备serial列表"""
+    runtime = runtime or get_runtime()
+    return [serial for serial, state in runtime.client.devices() if state == 'device']
+
+
+class _ThreadOutput(io.TextIOBase):
+    """按线程分流的stdout: 检验线程的输出写入各自的缓冲区, 其他线程照常输出"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        if getattr(self.local, 'buffer', None) is None:
+            self.stream.flush()
+
+
+class Scheduler:
+    """并行检验调度器"""
+
+    def __init__(self, serials=None, runtime=None, capture_output=True, collector=None, per_device=1):
+        # 检验函数通过get_runtime()访问设备, 指定的runtime需要设置为进程内共享的运行时
+        if runtime is not None:
+            set_runtime(runtime)
+        self.runtime = runtime or get_runtime()
+        if self.runtime.mode == 'interactive':
+            raise ValueError("并行检验不能等待人工确认, 请设置AUTOTEST_MODE=follow或回放录制的日志")
+        self.serials = list(serials) if serials else online_devices(self.runtime)
+        if not self.serials:
+            raise ValueError("没有可用的设备")
+        if per_device > 1 and self.runtime.watermark == 'clear':
+            raise ValueError("每次检验都会清除日志缓冲区, 同一设备上不能同时进行多个检验")
+        self.per_device = per_device
+        self.capture_output = capture_output
+        # spans.SpanCollector, 指定时汇总每个检验各阶段的耗时
+        self.collector = collector
+        self._results = []
+        self._lock = threading.Lock()
+
+    def run(self, jobs, on_result=None):
+        """
+        执行检验任务
+        jobs为(task, serial)列表, serial为None表示可在任意设备上执行; on_result在每个检验完成时回调
+        """
+        own_queues = {serial: collections.deque() for serial in self.serials}
+        shared = queue.SimpleQueue()
+        for task, serial in jobs:
+            if serial is None:
+                shared.put(task)
+            elif serial in own_queues:
+                own_queues[serial].append(task)
+            else:
+                raise ValueError(f"设备不在本次调度范围内: {serial}")
+
+        self._results = []
+        output = _ThreadOutput(sys.stdout) if self.capture_output else None
+        original_stdout = sys.stdout
+        if output is not None:
+            sys.stdout = output
+        try:
+            workers = [threading.Thread(target=self._work,
+                                        args=(serial, own_queues[serial], shared, output, on_result),
+                                        name=f'eval-{serial}-{index}')
+                       for serial in self.serials for index in range(self.per_device)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            sys.stdout = original_stdout
+        return sorted(self._results, key=lambda result: (result.task, result.serial))
+
+    def run_matrix(self, tasks=None, on_result=None):
+        """在每台设备上执行每个检验任务"""
+        tasks = tasks or range(1, TASK_COUNT + 1)
+        return self.run([(task, serial) for task in tasks for serial in self.serials], on_result)
+
+    def run_spread(self, tasks=None, on_result=None):
+        """每个检验任务只执行一次, 分配给空闲的设备"""
+        tasks = tasks or range(1, TASK_COUNT + 1)
+        return self.run([(task, None) for task in tasks], on_result)
+
+    def _work(self, serial, own, shared, output, on_result):
+        while True:
+            # per_device > 1时同一设备的多个线程共享own, 判断非空后仍可能被其他线程取空
+            try:
+                task = own.popleft()
+            except IndexError:
+                try:
+                    task = shared.get_nowait()
+                except queue.Empty:
+                    return
+            result = self._evaluate(task, serial, output)
+            with self._lock:
+                self._results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    def _evaluate(self, task, serial, output):
+        buffer = io.StringIO()
+        if output is not None:
+            output.local.buffer = buffer
+        started = time.time()
+        start = time.perf_counter()
+        passed = False
+        with recording(task, serial, self.collector) as record:
+            try:
+                passed = bool(load_task(task)(serial))
+            except Exception as e:
+                record['error'] = f"{type(e).__name__}: {e}"
+            finally:
+                if output is not None:
+                    output.local.buffer = None
+        return EvalResult(task, serial, passed, time.perf_counter() - start, started, buffer.getvalue(),
+                          record['error'], record['failure'], record['steps'], record['hits'])
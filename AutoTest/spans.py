@@ -0,0 +1,191 @@
+"""
+检验各阶段的耗时记录(span)
+
+检验代码在各阶段外包一层 span('名称'), 例如:
+    with span('logcat_dump'):
+        output = client.run(serial, DUMP_COMMAND)
+
+- 只有在当前线程(或asyncio任务)处于 recording() 中时才计时, 否则span返回一个共享的空上下文, 开销只有一次上下文变量查找
+- span可以嵌套, 各自独立计时(如collect包含logcat_dump、decode和scan), 名称不带层级
+- recording()结束时, 如指定了SpanCollector, 本次检验的全部span按指令和设备汇总
+- SpanCollector计算p50/p95/p99, 可导出为JSON或Prometheus文本格式, regressions()用于比较两次导出的结果
+
+各阶段名称:
+    connect      获取设备(首次时包括创建adb客户端)    find_adb     查找adb命令
+    clear        开始检验(记录起点, 开始跟随日志流)   logcat_clear logcat -c
+    logcat_mark  写入起点标记或读取设备时间
+    collect      等待操作完成并检验日志              logcat_dump  logcat -d 读取日志
+    decode       日志解码                          scan         日志标记匹配
+    follow       跟随日志流直到标记全部出现           verdict      计算结论并输出
+    assets       与assets数据比对                      oracle       与assets期望值比较
+"""
+import collections
+import contextlib
+import contextvars
+import json
+import threading
+import time
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+SpanStats = collections.namedtuple('SpanStats', 'count total p50 p95 p99 max')
+
+
+# 每个线程和每个asyncio任务各自的记录(新线程从空上下文开始, asyncio任务继承创建时的上下文)
+_record = contextvars.ContextVar('autotest_span_record', default=None)
+
+
+class _Span:
+    __slots__ = ('record', 'name', 'start')
+
+    def __init__(self, record, name):
+        self.record = record
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record['steps'].append((self.name, time.perf_counter() - self.start))
+
+
+class _Disabled:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_DISABLED = _Disabled()
+
+
+def span(name):
+    """计时一个检验阶段, 当前线程或任务没有在记录时不做任何事"""
+    record = _record.get()
+    if record is None:
+        return _DISABLED
+    return _Span(record, name)
+
+
+@contextlib.contextmanager
+def recording(task=None, serial=None, collector=None):
+    """
+    在当前线程(或asyncio任务)记录一次检验的各阶段耗时和结论详情
+    产出记录(dict: steps为按结束顺序排列的(阶段, 秒)列表, 以及failure / error / values / hits)
+    """
+    record = {'steps': [], 'failure': None, 'error': None, 'values': {}, 'hits': None}
+    token = _record.set(record)
+    try:
+        yield record
+    finally:
+        _record.reset(token)
+        if collector is not None:
+            collector.add(task, serial, record['steps'])
+
+
+def note(**details):
+    """向当前线程或任务的记录中补充检验结论的详情(failure / error / values / hits)"""
+    record = _record.get()
+    if record is not None:
+        record.update(details)
+
+
+def percentile(values, q):
+    """已排序数值的分位数(线性插值)"""
+    if not values:
+        return None
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(durations):
+    durations = sorted(durations)
+    return SpanStats(len(durations), sum(durations),
+                     *(percentile(durations, q) for q in QUANTILES), durations[-1])
+
+
+class SpanCollector:
+    """按指令和设备汇总各阶段的耗时"""
+
+    def __init__(self):
+        self._durations = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, task, serial, steps):
+        with self._lock:
+            for name, elapsed in steps:
+                self._durations[(task, serial, name)].append(elapsed)
+
+    def stats(self, by='task'):
+        """
+        各阶段的统计, by为'task'/'device'/None(不分组)
+        返回 {分组: {阶段: SpanStats}}, 不分组时分组为None
+        """
+        grouped = collections.defaultdict(lambda: collections.defaultdict(list))
+        with self._lock:
+            for (task, serial, name), durations in self._durations.items():
+                key = {'task': task, 'device': serial}.get(by) if by else None
+                grouped[key][name].extend(durations)
+        return {key: {name: summarize(durations) for name, durations in names.items()}
+                for key, names in grouped.items()}
+
+    def to_json(self):
+        def export(stats):
+            return {str(key): {name: dict(values._asdict()) for name, values in names.items()}
+                    for key, names in sorted(stats.items(), key=lambda item: str(item[0]))}
+
+        return {
+            'overall': export(self.stats(None)).get('None', {}),
+            'by_task': export(self.stats('task')),
+            'by_device': export(self.stats('device')),
+        }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus文本格式, 按指令和按设备各一个summary"""
+        lines = []
+        for by, label in (('task', 'task'), ('device', 'serial')):
+            metric = f'autotest_{by}_span_seconds'
+            lines.append(f'# HELP {metric} Duration of evaluation phases per {by}')
+            lines.append(f'# TYPE {metric} summary')
+            for key, names in sorted(self.stats(by).items(), key=lambda item: str(item[0])):
+                for name, values in sorted(names.items()):
+                    labels = f'{label}="{_escape(key)}",span="{_escape(name)}"'
+                    for q, value in zip(QUANTILES, (values.p50, values.p95, values.p99)):
+                        lines.append(f'{metric}{{{labels},quantile="{q}"}} {value:.6f}')
+                    lines.append(f'{metric}_sum{{{labels}}} {values.total:.6f}')
+                    lines.append(f'{metric}_count{{{labels}}} {values.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def regressions(baseline, current, quantile='p95', tolerance=0.2, minimum=0.001):
+    """
+    比较两次导出的JSON(to_json)中的整体耗时, 返回变慢超过tolerance的阶段列表[(阶段, 原耗时, 现耗时)]
+    两次都低于minimum秒的阶段不参与比较, 避免计时噪声
+    """
+    slower = []
+    for name, stats in current.get('overall', {}).items():
+        before = baseline.get('overall', {}).get(name)
+        if before is None:
+            continue
+        old, new = before[quantile], stats[quantile]
+        if max(old, new) >= minimum and new > old * (1 + tolerance):
+            slower.append((name, old, new))
+    return slower
@@ -0,0 +1,297 @@
+"""
+检验结果存储
+
+ResultStore 将每个检验结果追加写入本地SQLite数据库(WAL模式), 供长期统计通过率和耗时:
+- results表: 指令、设备、APP版本、开始时间、总耗时、结论、失败原因/错误、各步骤耗时和各步骤标记是否出现(JSON),
+  按(指令, 时间)、(设备, 时间)和时间建立索引
+- rollup表: 分别按指令、设备和APP版本, 每天每个耗时分桶汇总的检验数与通过数, 与results在同一事务中更新
+- summary()统计通过率和耗时分位数: 整天的部分来自rollup, 起止时间不在整天边界时两端不足一天的部分查询results,
+  耗时只与统计的天数和不足一天的部分有关, 与results的总行数无关; 分位数取所在分桶的中值, 误差在分桶宽度10%以内
+  (指定了指令/设备/APP版本过滤条件时直接按索引查询results)
+- add()只把结果放入队列, 由后台线程批量写入(每批一个事务), 调度器的工作线程不会因为写入而互相等待;
+  WAL模式下读取不阻塞写入, 多个进程写同一个数据库时各自的批量事务依次提交(busy_timeout)
+
+用法:
+    python -m AutoTest run --tasks 1-30 --store results.db
+    python -m AutoTest stats results.db --by task --since 2026-10-01
+"""
+import collections
+import contextlib
+import datetime
+import json
+import math
+import sqlite3
+import threading
+
+from .spans import QUANTILES
+
+BUCKET_RATIO = 1.1
+MIN_ELAPSED = 1e-6
+BUSY_TIMEOUT = 30
+DAY = 86400
+# 分组 -> results表中的列
+GROUPS = {'task': 'task', 'device': 'serial', 'build': 'build', None: "''"}
+
+Summary = collections.namedtuple('Summary', 'count passed rate p50 p95 p99')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    task INTEGER NOT NULL,
+    serial TEXT,
+    build TEXT,
+    started REAL NOT NULL,
+    elapsed REAL NOT NULL,
+    passed INTEGER NOT NULL,
+    failure TEXT,
+    error TEXT,
+    bucket INTEGER NOT NULL,
+    steps TEXT,
+    hits TEXT
+);
+CREATE INDEX IF NOT EXISTS results_task ON results (task, started);
+CREATE INDEX IF NOT EXISTS results_serial ON results (serial, started);
+CREATE INDEX IF NOT EXISTS results_started ON results (started);
+CREATE TABLE IF NOT EXISTS rollup (
+    dimension TEXT NOT NULL,
+    key NOT NULL,
+    day INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key, day, bucket)
+) WITHOUT ROWID;
+"""
+
+INSERT_RESULT = ('INSERT INTO results (task, serial, build, started, elapsed, passed, failure, error, bucket, steps, hits) '
+                 'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+UPSERT_ROLLUP = ('INSERT INTO rollup VALUES (?, ?, ?, ?, ?, ?) '
+                 'ON CONFLICT (dimension, key, day, bucket) '
+                 'DO UPDATE SET count = count + excluded.count, passed = passed + excluded.passed')
+
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def latency_bucket(elapsed):
+    """耗时所在的分桶(按BUCKET_RATIO等比划分)"""
+    return math.floor(math.log(max(elapsed, MIN_ELAPSED), BUCKET_RATIO))
+
+
+def bucket_value(bucket):
+    return BUCKET_RATIO ** (bucket + 0.5)
+
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class ResultStore:
+    """追加写入的检验结果库, 写入在后台线程中批量进行"""
+
+    def __init__(self, path, batch_size=1000, flush_interval=0.2):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        with contextlib.closing(connect(path)) as connection, connection:
+            connection.executescript(SCHEMA)
+        self._pending = collections.deque()
+        self._busy = False
+        self._wakeup = threading.Event()
+        self._idle = threading.Condition()
+        self._closed = False
+        self._error = None
+        self._writer = threading.Thread(target=self._write_loop, name='result-store-writer', daemon=True)
+        self._writer.start()
+
+    def add(self, result, build=None):
+        """加入一个检验结果(scheduler.EvalResult), 不等待写入"""
+        # deque.append是原子操作, 调用方之间不需要额外的锁
+        self._pending.append((result, build))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """等待已加入的结果全部写入"""
+        self._wakeup.set()
+        with self._idle:
+            while (self._pending or self._busy) and self._error is None:
+                self._idle.wait(0.1)
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        self.flush()
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_loop(self):
+        connection = connect(self.path)
+        try:
+            while True:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                while self._pending:
+                    # 先标记为忙再取出, flush()不会在一批结果取出后、写入前返回
+                    with self._idle:
+                        self._busy = True
+                    batch = []
+                    while self._pending and len(batch) < self.batch_size:
+                        batch.append(self._pending.popleft())
+                    try:
+                        self._write(connection, batch)
+                    except sqlite3.Error as e:
+                        self._error = e
+                    with self._idle:
+                        self._busy = False
+                        self._idle.notify_all()
+                if self._closed:
+                    return
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _write(connection, batch):
+        rows = []
+        counts = {}
+        for result, build in batch:
+            bucket = latency_bucket(result.elapsed)
+            passed = int(bool(result.passed))
+            rows.append((result.task, result.serial, build, result.started, result.elapsed, passed,
+                         result.failure, result.error, bucket, _encode(result.steps or []),
+                         None if result.hits is None else _encode(result.hits)))
+            day = int(result.started // DAY)
+            for key in (('task', result.task, day, bucket), ('device', result.serial or '', day, bucket),
+                        ('build', build or '', day, bucket), ('all', '', day, bucket)):
+                total = counts.get(key)
+                if total is None:
+                    counts[key] = [1, passed]
+                else:
+                    total[0] += 1
+                    total[1] += passed
+        with connection:
+            connection.executemany(INSERT_RESULT, rows)
+            connection.executemany(UPSERT_ROLLUP, [(*key, *total) for key, total in counts.items()])
+
+    def summary(self, by='task', since=None, until=None, task=None, serial=None, build=None):
+        """
+        按指令/设备/APP版本(by='task'/'device'/'build', None为不分组)汇总通过率和耗时分位数
+        since / until 为epoch秒, 返回 {分组: Summary}
+        """
+        column = GROUPS[by]
+        buckets = collections.defaultdict(collections.Counter)
+        passes = collections.Counter()
+
+        def add(rows):
+            for key, bucket, count, passed in rows:
+                # rollup中没有设备或APP版本的结果记为''
+                key = '' if key is None else key
+                buckets[key][bucket] += count
+                passes[key] += passed
+
+        connection = connect(self.path)
+        try:
+            if task is not None or serial is not None or build is not None:
+                add(_detail(connection, column, since, until, task=task, serial=serial, build=build))
+            else:
+                # 整天的部分查询rollup, 两端不足一天的部分查询results
+                first = None if since is None else math.ceil(since / DAY)
+                last = None if until is None else math.floor(until / DAY)
+                if first is not None and last is not None and first >= last:
+                    add(_detail(connection, column, since, until))
+                else:
+                    clauses = ['dimension = ?']
+                    params = [by or 'all']
+                    if first is not None:
+                        clauses.append('day >= ?')
+                        params.append(first)
+                        if since < first * DAY:
+                            add(_detail(connection, column, since, first * DAY))
+                    if last is not None:
+                        clauses.append('day < ?')
+                        params.append(last)
+                        if until > last * DAY:
+                            add(_detail(connection, column, last * DAY, until))
+                    add(connection.execute(
+                        f'SELECT key, bucket, SUM(count), SUM(passed) FROM rollup WHERE {" AND ".join(clauses)} '
+                        f'GROUP BY key, bucket', params))
+        finally:
+            connection.close()
+        return {(key if key != '' else None) if by else None: _summarize(sorted(counts.items()), passes[key])
+                for key, counts in buckets.items()}
+
+    def results(self, since=None, until=None, task=None, serial=None, build=None, limit=1000):
+        """按条件查询最近的检验结果(新的在前), 返回dict列表"""
+        where, params = _conditions(since=since, until=until, task=task, serial=serial, build=build)
+        connection = connect(self.path)
+        connection.row_factory = sqlite3.Row
+        try:
+            rows = connection.execute(f'SELECT * FROM results {where} ORDER BY started DESC LIMIT ?',
+                                      (*params, limit)).fetchall()
+        finally:
+            connection.close()
+        records = []
+        for row in rows:
+            record = dict(row)
+            record['passed'] = bool(record['passed'])
+            record['steps'] = json.loads(record['steps'] or '[]')
+            record['hits'] = None if record['hits'] is None else json.loads(record['hits'])
+            records.append(record)
+        return records
+
+
+def _conditions(since=None, until=None, task=None, serial=None, build=None):
+    clauses = []
+    params = []
+    if since is not None:
+        clauses.append('started >= ?')
+        params.append(since)
+    if until is not None:
+        clauses.append('started < ?')
+        params.append(until)
+    for column, value in (('task', task), ('serial', serial), ('build', build)):
+        if value is not None:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def _detail(connection, column, since=None, until=None, **filters):
+    """在results上按分组和耗时分桶统计"""
+    where, params = _conditions(since, until, **filters)
+    return connection.execute(f'SELECT {column}, bucket, COUNT(*), SUM(passed) FROM results {where} '
+                              f'GROUP BY {column}, bucket', params)
+
+
+def _summarize(buckets, passed):
+    """由按分桶排序的[(分桶, 检验数)]和通过数计算Summary"""
+    count = sum(bucket_count for _, bucket_count in buckets)
+    quantiles = []
+    for q in QUANTILES:
+        rank = max(1, math.ceil(q * count))
+        seen = 0
+        for bucket, bucket_count in buckets:
+            seen += bucket_count
+            if seen >= rank:
+                quantiles.append(bucket_value(bucket))
+                break
+    return Summary(count, passed, passed / count if count else None, *quantiles)
+
+
+def parse_time(text):
+    """命令行中的时间: epoch秒, 或ISO格式的日期/时间(本地时区)"""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    return datetime.datetime.fromisoformat(text).timestamp()
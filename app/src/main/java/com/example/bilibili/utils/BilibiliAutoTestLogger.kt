@@ -426,9 +426,14 @@ object BilibiliAutoTestLogger {
     /**
      * 指令28: 历史记录删除成功
      * @param remainingCount 删除后剩余数量
+     * @param historyId 被删除的历史记录ID
      */
-    fun logHistoryItemDeleted(remainingCount: Int) {
-        Log.d(TAG, "HISTORY_ITEM_DELETED: count=$remainingCount")
+    fun logHistoryItemDeleted(remainingCount: Int, historyId: String? = null) {
+        if (historyId != null) {
+            Log.d(TAG, "HISTORY_ITEM_DELETED: count=$remainingCount id=$historyId")
+        } else {
+            Log.d(TAG, "HISTORY_ITEM_DELETED: count=$remainingCount")
+        }
     }
 
     /**
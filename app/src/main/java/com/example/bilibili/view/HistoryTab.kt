@@ -257,13 +257,14 @@ fun HistoryList(
             videoTitle = historyToDelete!!.history.videoTitle,
             onConfirm = {
                 BilibiliAutoTestLogger.logDeleteButtonClicked()
-                presenter.deleteHistoryItem(historyToDelete!!.history.historyId)
+                val deletedId = historyToDelete!!.history.historyId
+                presenter.deleteHistoryItem(deletedId)
                 showDeleteDialog = false
                 historyToDelete = null
                 onDeleteItem() // 通知父组件刷新列表
-                // 删除后重新获取列表并记录剩余数量
+                // 删除后重新获取列表并记录剩余数量和被删除的记录ID
                 val remainingCount = presenter.getHistoryItems().size
-                BilibiliAutoTestLogger.logHistoryItemDeleted(remainingCount)
+                BilibiliAutoTestLogger.logHistoryItemDeleted(remainingCount, deletedId)
             },
             onDismiss = {
                 showDeleteDialog = false